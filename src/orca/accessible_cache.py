@@ -0,0 +1,194 @@
+# Orca
+#
+# Copyright 2026 Orca Team.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., Franklin Street, Fifth Floor,
+# Boston MA  02110-1301 USA.
+
+"""Caches the properties of accessible objects, such as the role and the
+state set, which are otherwise obtained from the application each time
+they are asked for. Cached values are discarded when events indicating
+they have changed are received."""
+
+__id__        = "$Id$"
+__version__   = "$Revision$"
+__date__      = "$Date$"
+__copyright__ = "Copyright (c) 2026 Orca Team."
+__license__   = "LGPL"
+
+ROLE = "role"
+STATE = "state"
+NAME = "name"
+DESCRIPTION = "description"
+PARENT = "parent"
+INDEX = "index"
+CHILD_COUNT = "childCount"
+TEXT = "text"
+
+# The properties which only change along with object:text-changed or
+# object:children-changed events from the object itself, which Orca always
+# receives even if it then ignores them, and which can thus be kept until
+# such an event is received. The others are only kept while one event is
+# processed, because Orca does not listen for all of the events indicating
+# they have changed (e.g. accessible-role and accessible-parent changes),
+# because applications do not reliably emit them (e.g. name changes), or
+# because the event comes from another object (e.g. the index in parent,
+# which changes when the parent loses a child).
+#
+_PERSISTENT = [TEXT]
+_TRANSIENT = [ROLE, STATE, NAME, DESCRIPTION, PARENT, INDEX, CHILD_COUNT]
+
+# The property changed by each object:property-change event.
+#
+_PROPERTY_CHANGES = {
+    "object:property-change:accessible-name": NAME,
+    "object:property-change:accessible-description": DESCRIPTION,
+}
+
+# The number of objects whose values for a property are kept. When there
+# are more, the values for that property are discarded. Values are keyed by
+# the objects themselves, rather than by their hashes, so that an object
+# cannot be freed and another one given its hash while its values are kept.
+#
+MAX_OBJECTS = 10000
+
+_cache = dict((p, {}) for p in _PERSISTENT + _TRANSIENT)
+_hits = dict((p, 0) for p in _cache)
+_misses = dict((p, 0) for p in _cache)
+
+def _get(prop, obj, getter):
+    values = _cache[prop]
+    try:
+        value = values[obj]
+    except KeyError:
+        pass
+    else:
+        _hits[prop] += 1
+        return value
+
+    # Exceptions, e.g. for dead objects, are passed on to the caller and
+    # nothing is cached.
+    value = getter(obj)
+    _misses[prop] += 1
+    if len(values) >= MAX_OBJECTS:
+        values.clear()
+    values[obj] = value
+    return value
+
+def getRole(obj):
+    """Returns the role of obj, as obj.getRole() would."""
+
+    return _get(ROLE, obj, lambda x: x.getRole())
+
+def getState(obj):
+    """Returns the state set of obj, as obj.getState() would. Callers must
+    not modify it."""
+
+    return _get(STATE, obj, lambda x: x.getState())
+
+def getName(obj):
+    """Returns the name of obj, as obj.name would."""
+
+    return _get(NAME, obj, lambda x: x.name)
+
+def getDescription(obj):
+    """Returns the description of obj, as obj.description would."""
+
+    return _get(DESCRIPTION, obj, lambda x: x.description)
+
+def getParent(obj):
+    """Returns the parent of obj, as obj.parent would."""
+
+    return _get(PARENT, obj, lambda x: x.parent)
+
+def getIndexInParent(obj):
+    """Returns the index of obj in its parent, as obj.getIndexInParent()
+    would."""
+
+    return _get(INDEX, obj, lambda x: x.getIndexInParent())
+
+def getChildCount(obj):
+    """Returns the number of children of obj, as obj.childCount would."""
+
+    return _get(CHILD_COUNT, obj, lambda x: x.childCount)
+
+def getText(obj, getter):
+    """Returns the value getter(obj) returns for the text of obj, e.g. a
+    snapshot of it, keeping it until the text or the children of obj
+    change."""
+
+    return _get(TEXT, obj, getter)
+
+def invalidate(obj, properties=None):
+    """Discards the cached values of obj for the given properties, or for
+    all properties if none are given."""
+
+    for prop in properties or _cache.keys():
+        _cache[prop].pop(obj, None)
+
+def clear(properties=None):
+    """Discards all cached values for the given properties, or for all
+    properties if none are given."""
+
+    for prop in properties or _cache.keys():
+        _cache[prop].clear()
+
+def clearTransient():
+    """Discards the values which are only kept while one event is processed.
+    Called before and after each event is processed."""
+
+    for prop in _TRANSIENT:
+        _cache[prop].clear()
+
+def onEvent(event):
+    """Discards the cached values which event indicates have changed. This
+    must be called for every event received, including those which are
+    then ignored."""
+
+    eType = event.type
+    if eType.startswith("object:state-changed"):
+        invalidate(event.source, [STATE])
+    elif eType.startswith("object:property-change"):
+        prop = _PROPERTY_CHANGES.get(eType.rstrip(":"))
+        if prop:
+            invalidate(event.source, [prop])
+    elif eType.startswith("object:text-changed"):
+        invalidate(event.source, [TEXT])
+    elif eType.startswith("object:children-changed"):
+        # The indices of all the children of the source may have changed;
+        # which objects those are is not known without asking for them.
+        # Its text has an embedded object character for each child.
+        _cache[INDEX].clear()
+        invalidate(event.source, [CHILD_COUNT, TEXT])
+        if event.any_data:
+            invalidate(event.any_data, [PARENT])
+
+def getStatistics():
+    """Returns a dictionary with the number of hits and misses, and the
+    number of objects cached, for each property."""
+
+    result = {}
+    for prop, values in _cache.items():
+        result[prop] = {"hits": _hits[prop],
+                        "misses": _misses[prop],
+                        "objects": len(values)}
+    return result
+
+def resetStatistics():
+    """Resets the hit and miss counts to zero."""
+
+    for prop in _cache:
+        _hits[prop] = 0
+        _misses[prop] = 0
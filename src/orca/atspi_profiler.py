@@ -0,0 +1,291 @@
+# Orca
+#
+# Copyright 2026 Orca Team.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., Franklin Street, Fifth Floor,
+# Boston MA  02110-1301 USA.
+
+"""Counts and times the calls Orca makes to the accessible, text,
+component, table and collection interfaces, each of which is usually a
+round trip to the application. Calls are counted per method and per Orca
+function making them, both in total and for each key press, from the key
+press until the next one. For key presses, the time until the last speech
+output is also recorded, so that the cost of a keystroke can be compared
+with how long the user waited for it to be presented."""
+
+__id__        = "$Id$"
+__version__   = "$Revision$"
+__date__      = "$Date$"
+__copyright__ = "Copyright (c) 2026 Orca Team."
+__license__   = "LGPL"
+
+import collections
+import json
+import sys
+import time
+
+from . import debug
+from . import settings
+
+# The number of key presses whose profiles are kept.
+#
+MAX_INPUT_EVENTS = 1000
+
+# The modules whose frames are skipped when finding the Orca function
+# which made a call, because they only pass calls on.
+#
+_PASS_THROUGH = [__name__, "orca.accessible_cache"]
+
+class _Counts:
+    """The number of calls, and the time taken by them, for each key."""
+
+    def __init__(self):
+        self._counts = collections.defaultdict(lambda: [0, 0.0])
+
+    def add(self, key, duration):
+        entry = self._counts[key]
+        entry[0] += 1
+        entry[1] += duration
+
+    def ranked(self, limit=None):
+        """Returns a list of [key, count, time] sorted by decreasing count."""
+
+        items = sorted(self._counts.items(), key=lambda x: (-x[1][0], x[0]))
+        return [[key, count, duration]
+                for key, (count, duration) in items[:limit]]
+
+class Profile:
+    """The calls made while handling one key press, or in total."""
+
+    def __init__(self, description):
+        self.description = description
+        self.startTime = time.time()
+        self.lastOutputTime = None
+        self.calls = 0
+        self.duration = 0.0
+        self.methods = _Counts()
+        self.callers = _Counts()
+
+    def add(self, method, caller, duration):
+        self.calls += 1
+        self.duration += duration
+        self.methods.add(method, duration)
+        self.callers.add(caller, duration)
+
+    def getLatency(self):
+        """Returns the time from the start of the profile to the last speech
+        output during it, or None if nothing was spoken."""
+
+        if self.lastOutputTime is None:
+            return None
+        return self.lastOutputTime - self.startTime
+
+    def toDict(self, limit=None):
+        return {"event": self.description,
+                "calls": self.calls,
+                "callTime": self.duration,
+                "latency": self.getLatency(),
+                "methods": self.methods.ranked(limit),
+                "callers": self.callers.ranked(limit)}
+
+_installed = []
+_depth = 0
+_total = Profile("total")
+_current = None
+_lastRawEvent = None
+_inputEvents = collections.deque(maxlen=MAX_INPUT_EVENTS)
+
+def _isPassThrough(frame):
+    name = frame.f_globals.get("__name__", "")
+    return name in _PASS_THROUGH or name.startswith("pyatspi")
+
+def _getCaller(frame):
+    while frame and _isPassThrough(frame):
+        frame = frame.f_back
+    if not frame:
+        return "unknown"
+
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "").rsplit(".", 1)[-1]
+    return "%s.%s" % (module, getattr(code, "co_qualname", code.co_name))
+
+def _record(method, duration):
+    caller = _getCaller(sys._getframe(2))
+    _total.add(method, caller, duration)
+    if _current:
+        _current.add(method, caller, duration)
+
+def _wrapFunction(method, function):
+    def wrapper(*args, **kwargs):
+        global _depth
+
+        # Only the outermost call is counted, because pyatspi implements
+        # some methods, e.g. __getitem__, using others.
+        if _depth:
+            return function(*args, **kwargs)
+
+        _depth += 1
+        startTime = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _depth -= 1
+            _record(method, time.perf_counter() - startTime)
+
+    wrapper.__name__ = getattr(function, "__name__", method)
+    wrapper.__doc__ = getattr(function, "__doc__", None)
+    return wrapper
+
+def _instrument(cls, label):
+    names = [name for name in cls.__dict__ \
+             if not name.startswith("_") or name in ["__getitem__", "__len__"]]
+
+    for name in names:
+        attr = cls.__dict__[name]
+        method = "%s.%s" % (label, name)
+        if isinstance(attr, property):
+            fget = attr.fget and _wrapFunction(method, attr.fget)
+            wrapped = property(fget, attr.fset, attr.fdel, attr.__doc__)
+        elif isinstance(attr, (staticmethod, classmethod)) or not callable(attr):
+            continue
+        else:
+            wrapped = _wrapFunction(method, attr)
+
+        try:
+            setattr(cls, name, wrapped)
+        except (AttributeError, TypeError):
+            continue
+        _installed.append((cls, name, attr))
+
+def isActive():
+    """Returns True if the calls are being profiled."""
+
+    return bool(_installed)
+
+def install():
+    """Starts profiling the calls, if that is not already being done."""
+
+    if _installed:
+        return
+
+    import pyatspi
+
+    classes = [(pyatspi.Accessible, "Accessible"),
+               (pyatspi.Text, "Text"),
+               (pyatspi.Component, "Component"),
+               (pyatspi.Table, "Table"),
+               (pyatspi.Collection, "Collection")]
+    for cls, label in classes:
+        _instrument(cls, label)
+
+    msg = "ATSPI PROFILER: Profiling %d methods" % len(_installed)
+    debug.println(debug.LEVEL_INFO, msg, True)
+
+def uninstall():
+    """Stops profiling the calls, restoring the original methods."""
+
+    while _installed:
+        cls, name, attr = _installed.pop()
+        setattr(cls, name, attr)
+
+def _finishInputEvent():
+    if not _current:
+        return
+
+    msg = "ATSPI PROFILER: %s made %d calls taking %.4fs" \
+        % (_current.description, _current.calls, _current.duration)
+    latency = _current.getLatency()
+    if latency is not None:
+        msg += "; last output after %.4fs" % latency
+    debug.println(debug.LEVEL_INFO, msg, True)
+
+    if _current.calls > settings.atspiCallBudget:
+        msg = "ATSPI PROFILER: %s exceeded the budget of %d calls. Top callers: %s" \
+            % (_current.description, settings.atspiCallBudget,
+               ", ".join("%s (%d)" % (x[0], x[1]) for x in _current.callers.ranked(5)))
+        debug.println(debug.LEVEL_INFO, msg, True)
+
+def startInputEvent(event):
+    """Starts the profile of a key press, ending the previous one.
+
+    Arguments:
+    - event: the AT-SPI keyboard event
+    """
+
+    global _current, _lastRawEvent
+
+    if not _installed:
+        return
+
+    # The same event is sometimes received more than once.
+    key = event.id, event.hw_code, event.timestamp
+    if key == _lastRawEvent:
+        return
+    _lastRawEvent = key
+
+    _finishInputEvent()
+    _current = Profile("'%s' (modifiers=%s)" % (event.event_string, event.modifiers))
+    _inputEvents.append(_current)
+
+def outputPresented():
+    """Records that speech was output for the current key press."""
+
+    if _current:
+        _current.lastOutputTime = time.time()
+
+def getReport(limit=None):
+    """Returns a dictionary with the totals and the profile of each key
+    press, with the methods and callers of each ranked by number of calls.
+
+    Arguments:
+    - limit: the number of methods and callers to include in each ranking,
+      or None for all
+    """
+
+    return {"total": _total.toDict(limit),
+            "inputEvents": [x.toDict(limit) for x in _inputEvents]}
+
+def toJSON(limit=None):
+    """Returns the report from getReport() as a JSON string."""
+
+    return json.dumps(getReport(limit), indent=2)
+
+def dump(filename):
+    """Writes the report from getReport() as JSON to filename."""
+
+    with open(filename, "w") as f:
+        f.write(toJSON())
+
+def printReport(level=debug.LEVEL_INFO, limit=20):
+    """Prints the total counts for the most called methods and the Orca
+    functions making the most calls as tables to the debug output."""
+
+    lines = ["ATSPI PROFILER: %d calls taking %.4fs in total"
+             % (_total.calls, _total.duration)]
+    for title, ranking in [("METHOD", _total.methods.ranked(limit)),
+                           ("CALLER", _total.callers.ranked(limit))]:
+        lines.append("%-60s %8s %10s" % (title, "CALLS", "TIME"))
+        for key, count, duration in ranking:
+            lines.append("%-60s %8d %10.4f" % (key, count, duration))
+    debug.println(level, "\n".join(lines), True)
+
+def reset():
+    """Discards all the counts recorded so far."""
+
+    global _total, _current
+
+    _total = Profile("total")
+    _current = None
+    _inputEvents.clear()
@@ -27,8 +27,10 @@ __date__      = "$Date$"
 __copyright__ = "Copyright (c) 2010-2011 Consorcio Fernando de los Rios."
 __license__   = "LGPL"
 
-from json import load, dump
+from copy import deepcopy
+from json import dumps, loads
 import os
+import tempfile
 from orca import settings, acss
 
 class Backend:
@@ -43,6 +45,67 @@ class Backend:
         self.settingsFile = os.path.join(prefsDir, "user-settings.conf")
         self.appPrefsDir = os.path.join(prefsDir, "app-settings")
 
+        # The parsed contents of the settings files, keyed by path. Each is
+        # stored along with the modification time, size and inode of the file
+        # when it was read so that changes made by other means (e.g. another
+        # instance of Orca, or a text editor) are noticed. They are shared
+        # with the callers which only read them; see _loadForUpdate().
+        self._documents = {}
+
+    @staticmethod
+    def _getSignature(fileName):
+        try:
+            info = os.stat(fileName)
+        except OSError:
+            return None
+
+        return info.st_mtime_ns, info.st_size, info.st_ino
+
+    def _load(self, fileName):
+        """ Returns the parsed contents of fileName, reading the file only
+            if it has changed since it was last read. The result is cached
+            and must not be modified. Raises OSError if the file cannot be
+            read and ValueError if it is not valid JSON. """
+        signature = self._getSignature(fileName)
+        cached = self._documents.get(fileName)
+        if signature is not None and cached and cached[0] == signature:
+            return cached[1]
+
+        with open(fileName, 'r') as settingsFile:
+            prefs = loads(settingsFile.read())
+
+        self._documents[fileName] = signature, prefs
+        return prefs
+
+    def _loadForUpdate(self, fileName):
+        """ Returns a copy of the parsed contents of fileName which the
+            caller may modify, e.g. before saving it. """
+        return deepcopy(self._load(fileName))
+
+    def _save(self, fileName, prefs):
+        """ Writes prefs to fileName, replacing the file atomically so that
+            it is never left partially written, and updates the cache. """
+        dirName = os.path.dirname(fileName)
+        contents = dumps(prefs, indent=4)
+        fd, tempName = tempfile.mkstemp(dir=dirName, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, 'w') as settingsFile:
+                settingsFile.write(contents)
+                settingsFile.flush()
+                os.fsync(settingsFile.fileno())
+            if os.path.exists(fileName):
+                os.chmod(tempName, os.stat(fileName).st_mode & 0o777)
+            else:
+                os.chmod(tempName, 0o644)
+            os.replace(tempName, fileName)
+        except:
+            self._documents.pop(fileName, None)
+            if os.path.exists(tempName):
+                os.remove(tempName)
+            raise
+
+        self._documents[fileName] = self._getSignature(fileName), loads(contents)
+
     def saveDefaultSettings(self, general, pronunciations, keybindings):
         """ Save default settings for all the properties from
             orca.settings. """
@@ -61,33 +124,31 @@ class Backend:
         self.pronunciations = pronunciations
         self.keybindings = keybindings
 
-        settingsFile = open(self.settingsFile, 'w')
-        dump(prefs, settingsFile, indent=4)
-        settingsFile.close()
+        self._save(self.settingsFile, prefs)
 
     def getAppSettings(self, appName):
+        """ Returns the settings of appName, which must not be modified. """
         fileName = os.path.join(self.appPrefsDir, "%s.conf" % appName)
         if os.path.exists(fileName):
-            settingsFile = open(fileName, 'r')
-            prefs = load(settingsFile)
-            settingsFile.close()
+            prefs = self._load(fileName)
         else:
             prefs = {}
 
         return prefs
 
     def saveAppSettings(self, appName, profile, general, pronunciations, keybindings):
-        prefs = self.getAppSettings(appName)
+        fileName = os.path.join(self.appPrefsDir, "%s.conf" % appName)
+        if os.path.exists(fileName):
+            prefs = self._loadForUpdate(fileName)
+        else:
+            prefs = {}
         profiles = prefs.get('profiles', {})
         profiles[profile] = {'general': general,
                              'pronunciations': pronunciations,
                              'keybindings': keybindings}
         prefs['profiles'] = profiles
 
-        fileName = os.path.join(self.appPrefsDir, "%s.conf" % appName)
-        settingsFile = open(fileName, 'w')
-        dump(prefs, settingsFile, indent=4)
-        settingsFile.close()
+        self._save(fileName, prefs)
 
     def saveProfileSettings(self, profile, general,
                                   pronunciations, keybindings):
@@ -99,18 +160,14 @@ class Backend:
         general['pronunciations'] = pronunciations
         general['keybindings'] = keybindings
 
-        with open(self.settingsFile, 'r+') as settingsFile:
-            prefs = load(settingsFile)
-            prefs['profiles'][profile] = general
-            settingsFile.seek(0)
-            settingsFile.truncate()
-            dump(prefs, settingsFile, indent=4)
+        prefs = self._loadForUpdate(self.settingsFile)
+        prefs['profiles'][profile] = general
+        self._save(self.settingsFile, prefs)
 
     def _getSettings(self):
         """ Load from config file all settings """
-        settingsFile = open(self.settingsFile)
         try:
-            prefs = load(settingsFile)
+            prefs = self._load(self.settingsFile)
         except ValueError:
             return
         self.general = prefs['general'].copy()
@@ -126,8 +183,8 @@ class Backend:
         profileSettings = self.profiles[profile].copy()
         for key, value in profileSettings.items():
             if key == 'voices':
-                for voiceType, voiceDef in value.items():
-                    value[voiceType] = acss.ACSS(voiceDef)
+                value = {voiceType: acss.ACSS(voiceDef)
+                         for voiceType, voiceDef in value.items()}
             if key not in ['startingProfile', 'activeProfile']:
                 generalSettings[key] = value
         try:
@@ -143,7 +200,7 @@ class Backend:
         pronunciations = self.pronunciations.copy()
         profileSettings = self.profiles[profile].copy()
         if 'pronunciations' in profileSettings:
-            pronunciations = profileSettings['pronunciations']
+            pronunciations = profileSettings['pronunciations'].copy()
         return pronunciations
 
     def getKeybindings(self, profile='default'):
@@ -153,7 +210,7 @@ class Backend:
         keybindings = self.keybindings.copy()
         profileSettings = self.profiles[profile].copy()
         if 'keybindings' in profileSettings:
-            keybindings = profileSettings['keybindings']
+            keybindings = profileSettings['keybindings'].copy()
         return keybindings
 
     def isFirstStart(self):
@@ -164,12 +221,9 @@ class Backend:
     def _setProfileKey(self, key, value):
         self.general[key] = value
 
-        with open(self.settingsFile, 'r+') as settingsFile:
-            prefs = load(settingsFile)
-            prefs['general'][key] = value
-            settingsFile.seek(0)
-            settingsFile.truncate()
-            dump(prefs, settingsFile, indent=4)
+        prefs = self._loadForUpdate(self.settingsFile)
+        prefs['general'][key] = value
+        self._save(self.settingsFile, prefs)
 
     def setFirstStart(self, value=False):
         """Set firstStart. This user-configurable settting is primarily
@@ -58,6 +58,12 @@ RIGHT_CLICK_REVIEW_ITEM = _("Performs right click on current flat review item.")
 # and the cursor will be positioned at the point where the speech was interrupted.
 SAY_ALL = _("Speaks entire document.")
 
+# Translators: Orca collects the output of a command run in a terminal and,
+# when there is a lot of it, presents only the last few lines. This command
+# presents the last lines the terminal has output, skipping whatever output
+# has not yet been presented.
+PRESENT_NEWEST_TERMINAL_OUTPUT = _("Presents the newest output in the terminal.")
+
 # Translators: the 'flat review' feature of Orca allows the user to explore the
 # text in a window in a 2D fashion. That is, Orca treats all the text from all
 # objects in a window (e.g., buttons, labels, etc.) as a sequence of words in a
@@ -484,6 +490,11 @@ CYCLE_KEY_ECHO = _("Cycles to the next key echo level.")
 # information that Orca generates at run time.
 CYCLE_DEBUG_LEVEL = _("Cycles the debug level at run time.")
 
+# Translators: this is a debug message that Orca users will not normally see. It
+# describes a debug routine that saves the performance measurements Orca has
+# collected (e.g. how long it takes to process events) to a file.
+DUMP_PERFORMANCE_METRICS = _("Saves the performance metrics to a file.")
+
 # Translators: this command announces information regarding the relationship of
 # the given bookmark to the current position. Note that in this context, the
 # "bookmark" is storing the location of an accessible object, typically on a web
@@ -137,6 +137,9 @@ keymap = (
     ("", defaultModifierMask, NO_MODIFIER_MASK,
     "cycleDebugLevelHandler"),
 
+    ("", defaultModifierMask, NO_MODIFIER_MASK,
+    "dumpPerformanceMetricsHandler"),
+
     ("", defaultModifierMask, NO_MODIFIER_MASK,
     "decreaseSpeechRateHandler"),
 
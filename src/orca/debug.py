@@ -194,6 +194,17 @@ def printStack(level):
         traceback.print_stack(None, 100, debugFile)
         println(level)
 
+def isEnabled(level):
+    """Returns True if output at the given level would be printed. Callers
+    can use this to avoid building expensive debug messages (e.g. ones
+    which convert accessibles to strings) that would just be discarded.
+
+    Arguments:
+    - level: the accepted debug level
+    """
+
+    return level >= debugLevel
+
 def println(level, text="", timestamp=False):
     """Prints the text to stderr unless debug is enabled.
 
@@ -202,10 +213,13 @@ def println(level, text="", timestamp=False):
 
     Arguments:
     - level: the accepted debug level
-    - text: the text to print (default is a blank line)
+    - text: the text to print (default is a blank line), or a callable
+      returning that text which is only called if the text is printed
     """
 
     if level >= debugLevel:
+        if callable(text):
+            text = text()
         text = text.replace("\ufffc", "[OBJ]")
         if timestamp:
             text = "%s - %s" % (time.strftime("%H:%M:%S"), text)
@@ -228,6 +242,26 @@ def println(level, text="", timestamp=False):
                 text = "Exception when trying to write text"
                 sys.stderr.writelines([text, "\n"])
 
+def printMessage(level, text, *args, timestamp=False):
+    """Prints the text formatted with args. Unlike println with a message
+    built by the caller, the formatting (and hence the str() of any args,
+    which for accessibles means a round trip to the application) is only
+    done if the text will be printed.
+
+    Arguments:
+    - level: the accepted debug level
+    - text: the text to print, possibly containing %-style format specifiers
+    - args: the values for the format specifiers in text
+    - timestamp: if True, prefix the output with the current time
+    """
+
+    if level < debugLevel:
+        return
+
+    if args:
+        text = text % args
+    println(level, text, timestamp)
+
 def printResult(level, result=None):
     """Prints the return result, along with information about the
     method, arguments, and any errors encountered."""
@@ -267,6 +301,8 @@ def printObjectEvent(level, event, sourceInfo=None, timestamp=False):
         return
 
     level = max(level, eventDebugLevel)
+    if level < debugLevel:
+        return
 
     text = "OBJECT EVENT: %s (%d, %d, %s)" \
            % (event.type, event.detail1, event.detail2, event.any_data)
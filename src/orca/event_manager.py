@@ -25,20 +25,396 @@ __copyright__ = "Copyright (c) 2011. Orca Team."
 __license__   = "LGPL"
 
 from gi.repository import GLib
+import collections
 import pyatspi
 import queue
 import threading
 import time
 
+from . import accessible_cache
+from . import atspi_profiler
 from . import debug
 from . import input_event
 from . import messages
+from . import metrics
 from . import orca_state
 from . import script_manager
 from . import settings
 
 _scriptManager = script_manager.getManager()
 
+class _CoalescedEvent:
+    """Stands in for a burst of contiguous text insertions in the same
+    object, which scripts then see as a single insertion."""
+
+    def __init__(self, event):
+        self.type = event.type
+        self.source = event.source
+        self.detail1 = event.detail1
+        self.detail2 = event.detail2
+        self.any_data = event.any_data
+        self.host_application = event.host_application
+        self.count = 1
+
+    def __str__(self):
+        return "%s (%s, %s, %s) for %s in %s [%i events coalesced]" % \
+            (self.type, self.detail1, self.detail2, self.any_data,
+             self.source, self.host_application, self.count)
+
+    def merge(self, event):
+        """Appends the text inserted by event, which must immediately
+        follow the text already inserted, to this event."""
+
+        self.any_data += event.any_data
+        self.detail2 += event.detail2
+        self.count += 1
+
+
+class _EventQueue:
+    """The queue of events waiting to be processed. Events are placed in one
+    of several lanes, each a FIFO, which are served in strict priority order
+    except that an event which has waited more than settings.eventLaneMaxWait
+    seconds is served ahead of newer events in higher-priority lanes. The
+    queue also coalesces object events whose presentation would be redundant
+    and limits the number of pending object events from each application
+    so that a single flooding application cannot bury everything else."""
+
+    LANE_INPUT = 0
+    LANE_FOCUS = 1
+    LANE_BACKGROUND = 2
+    LANES = [LANE_INPUT, LANE_FOCUS, LANE_BACKGROUND]
+
+    # Only the most recent of these events in a given object matters.
+    # Compare Script.skipObjectEvent(), which would discard the older
+    # ones once we got around to them anyway.
+    SUPERSEDED = ["object:text-caret-moved",
+                  "object:text-selection-changed",
+                  "object:selection-changed",
+                  "object:active-descendant-changed",
+                  "object:property-change:accessible-name",
+                  "object:property-change:accessible-description",
+                  "object:property-change:accessible-value",
+                  "object:value-changed",
+                  "object:visible-data-changed",
+                  "object:bounds-changed"]
+
+    # These are duplicates of a pending event if they match it in all of
+    # source, type, and detail1 (state-changed) or any_data (children-changed).
+    DUPLICATED = ["object:state-changed", "object:children-changed"]
+
+    MERGED = ["object:text-changed:insert"]
+
+    # The addition of a child undoes its pending removal, and vice versa.
+    OPPOSITES = {":add": ":remove", ":remove": ":add"}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lanes = [collections.deque() for lane in self.LANES]
+        self._byApp = {}
+        self._latest = {}
+        self._lastForSource = {}
+        self._size = 0
+        self._pendingByApp = collections.Counter()
+        self.counts = collections.Counter()
+
+    def qsize(self):
+        return self._size
+
+    def empty(self):
+        return self._size == 0
+
+    def full(self):
+        return False
+
+    def statistics(self):
+        """Returns a dictionary describing what the queue has done."""
+
+        stats = dict(self.counts)
+        stats["pending"] = self._size
+        stats["pendingByApp"] = {}
+        for appKey, entries in self._byApp.items():
+            app = entries[0][1]
+            stats["pendingByApp"][str(app)] = self._pendingByApp[appKey]
+        return stats
+
+    @staticmethod
+    def _key(obj):
+        try:
+            return hash(obj)
+        except:
+            return id(obj)
+
+    def _discard(self, entry):
+        """Removes the pending entry from the queue and its indices. The
+        entry itself remains in the deques, but is skipped once empty."""
+
+        event, app = entry[0], entry[1]
+        self._size -= 1
+        sourceKey = self._key(event.source)
+        key = (sourceKey, event.type)
+        if self._latest.get(key) is entry:
+            del self._latest[key]
+        if self._lastForSource.get(sourceKey) is entry:
+            del self._lastForSource[sourceKey]
+
+        entry[0] = None
+        appKey = self._key(app)
+        self._pendingByApp[appKey] -= 1
+        entries = self._byApp.get(appKey)
+        while entries and entries[0][0] is None:
+            entries.popleft()
+        if not entries:
+            self._byApp.pop(appKey, None)
+            del self._pendingByApp[appKey]
+
+    def _find(self, event):
+        """Returns the (existing, action) for event, where existing is the
+        pending entry event should be coalesced with, and action is one of
+        'merge', 'supersede', 'duplicate', or None."""
+
+        if not settings.coalesceEvents:
+            return None, None
+
+        eType = event.type
+        key = (self._key(event.source), eType)
+        entry = self._latest.get(key)
+        if not entry or entry[0] is None:
+            return None, None
+
+        pending = entry[0]
+        if list(filter(eType.startswith, self.SUPERSEDED)):
+            return entry, 'supersede'
+
+        if list(filter(eType.startswith, self.DUPLICATED)):
+            if eType.startswith("object:state-changed"):
+                same = pending.detail1 == event.detail1
+            else:
+                same = pending.any_data == event.any_data
+            if same:
+                return entry, 'duplicate'
+            return None, None
+
+        if list(filter(eType.startswith, self.MERGED)) \
+           and self._lastForSource.get(key[0]) is entry \
+           and isinstance(pending.any_data, str) \
+           and isinstance(event.any_data, str) \
+           and event.detail1 == pending.detail1 + pending.detail2:
+            return entry, 'merge'
+
+        return None, None
+
+    def put(self, event, app=None, lane=LANE_BACKGROUND):
+        """Adds event to the given lane of the queue, coalescing it with a
+        pending event if appropriate. Returns the pending event which now
+        represents event, or None if event was discarded."""
+
+        with self._lock:
+            if app is None:
+                return self._append(event, None, lane)
+
+            existing, action = self._find(event)
+            if action == 'duplicate':
+                self.counts["duplicate"] += 1
+                return existing[0]
+
+            if action == 'merge':
+                pending = existing[0]
+                if not isinstance(pending, _CoalescedEvent):
+                    pending = _CoalescedEvent(pending)
+                    existing[0] = pending
+                pending.merge(event)
+                self.counts["merged"] += 1
+                return pending
+
+            if action == 'supersede':
+                self._discard(existing)
+                self.counts["superseded"] += 1
+
+            # Input and focus events are never dropped, lest we lose track
+            # of the focus; only background events make way for them.
+            appKey = self._key(app)
+            limit = settings.eventQueueMaxPerApp
+            if limit and self._pendingByApp[appKey] >= limit \
+               and lane == self.LANE_BACKGROUND:
+                self.counts["dropped"] += 1
+                oldest = None
+                if settings.eventQueueOverflowPolicy \
+                   == settings.EVENT_OVERFLOW_DROP_OLDEST:
+                    oldest = self._oldestBackgroundEntry(appKey)
+                if not oldest:
+                    return None
+                self._discard(oldest)
+
+            return self._append(event, app, lane)
+
+    def _oldestBackgroundEntry(self, appKey):
+        for entry in self._byApp.get(appKey, []):
+            if entry[0] is not None and entry[2] == self.LANE_BACKGROUND:
+                return entry
+        return None
+
+    def _append(self, event, app, lane):
+        entry = [event, app, lane, time.time()]
+        self._lanes[lane].append(entry)
+        self._size += 1
+        self.counts["queued"] += 1
+        if app is not None:
+            appKey = self._key(app)
+            sourceKey = self._key(event.source)
+            self._byApp.setdefault(appKey, collections.deque()).append(entry)
+            self._pendingByApp[appKey] += 1
+            self._resetOpposite(sourceKey, event)
+            self._latest[(sourceKey, event.type)] = entry
+            self._lastForSource[sourceKey] = entry
+        return event
+
+    def _resetOpposite(self, sourceKey, event):
+        """Stops a pending children-changed event for the same child but of
+        the opposite kind from being found as the latest of its type, so that
+        e.g. add, remove, add is not treated as add, remove."""
+
+        if not event.type.startswith("object:children-changed"):
+            return
+
+        for kind, opposite in self.OPPOSITES.items():
+            if kind in event.type:
+                key = (sourceKey, event.type.replace(kind, opposite))
+                entry = self._latest.get(key)
+                if entry and entry[0] is not None \
+                   and entry[0].any_data == event.any_data:
+                    del self._latest[key]
+                return
+
+    def get_nowait(self):
+        """Removes and returns the next event to process. Raises queue.Empty
+        if there is none."""
+
+        with self._lock:
+            heads = []
+            for lane in self._lanes:
+                while lane and lane[0][0] is None:
+                    lane.popleft()
+                if lane:
+                    heads.append(lane[0])
+
+            if not heads:
+                raise queue.Empty
+
+            # Strict priority, unless something has waited too long.
+            entry = heads[0]
+            overdue = time.time() - settings.eventLaneMaxWait
+            stale = [x for x in heads[1:] if x[3] < overdue and x[3] < entry[3]]
+            if stale:
+                entry = min(stale, key=lambda x: x[3])
+                self.counts["aged"] += 1
+
+            self._lanes[entry[2]].popleft()
+            event = entry[0]
+            metrics.record(metrics.QUEUE_WAIT, str(event.type), time.time() - entry[3])
+            if entry[1] is None:
+                entry[0] = None
+                self._size -= 1
+            else:
+                self._discard(entry)
+            return event
+
+    def hasPending(self, obj, eventTypes):
+        """Returns True if an event from obj of one of eventTypes, which
+        must be full event types, is pending."""
+
+        with self._lock:
+            sourceKey = self._key(obj)
+            for eType in eventTypes:
+                entry = self._latest.get((sourceKey, eType))
+                if entry and entry[0] is not None:
+                    return True
+            return False
+
+    def cancel(self, app, eventTypes):
+        """Discards the pending background events from app whose type
+        starts with any of eventTypes. Returns the number discarded."""
+
+        with self._lock:
+            entries = self._byApp.get(self._key(app))
+            if not entries:
+                return 0
+
+            cancelled = [x for x in entries if x[0] is not None
+                         and x[2] == self.LANE_BACKGROUND
+                         and list(filter(x[0].type.startswith, eventTypes))]
+            for entry in cancelled:
+                self._discard(entry)
+
+            self.counts["cancelled"] += len(cancelled)
+            return len(cancelled)
+
+
+class _EventInfo:
+    """Details about an event being considered for ignoring. Each one is
+    only requested from the application the first time it is needed."""
+
+    def __init__(self, event):
+        self._event = event
+        self._source = None
+        self._child = None
+        self._toolkit = None
+
+    def _getSource(self):
+        if self._source is None:
+            source = self._event.source
+            self._source = source.getState(), accessible_cache.getRole(source)
+        return self._source
+
+    def _getChild(self):
+        if self._child is None:
+            child = self._event.any_data
+            self._child = child.getState(), accessible_cache.getRole(child)
+        return self._child
+
+    @property
+    def state(self):
+        return self._getSource()[0]
+
+    @property
+    def role(self):
+        return self._getSource()[1]
+
+    @property
+    def childState(self):
+        return self._getChild()[0]
+
+    @property
+    def childRole(self):
+        return self._getChild()[1]
+
+    @property
+    def toolkit(self):
+        if self._toolkit is None:
+            self._toolkit = self._event.host_application.toolkitName
+        return self._toolkit
+
+
+class _IgnoreRule:
+    """A reason for EventManager._ignore() to ignore an event. See
+    EventManager.addIgnoreRule()."""
+
+    def __init__(self, eventType, predicate, reason, roles=None, toolkits=None):
+        self.eventType = eventType
+        self.predicate = predicate
+        self.reason = reason
+        self.roles = roles
+        self.toolkits = toolkits
+
+    def applies(self, event, info):
+        """Returns True if event should be ignored according to this rule."""
+
+        if self.toolkits is not None and info.toolkit not in self.toolkits:
+            return False
+        if self.roles is not None and info.role not in self.roles:
+            return False
+        return self.predicate is None or self.predicate(event, info)
+
+
 class EventManager:
 
     EMBEDDED_OBJECT_CHARACTER = '\ufffc'
@@ -53,7 +429,7 @@ class EventManager:
         self._active = False
         self._enqueueCount = 0
         self._dequeueCount = 0
-        self._eventQueue     = queue.Queue(0)
+        self._eventQueue     = _EventQueue()
         self._gidleId        = 0
         self._gidleLock      = threading.Lock()
         self._gilSleepTime = 0.00001
@@ -61,6 +437,18 @@ class EventManager:
         self._ignoredEvents = ['object:bounds-changed',
                                'object:state-changed:defunct',
                                'object:property-change:accessible-parent']
+        self._ignoreRules = []
+        self._compiledIgnoreRules = {}
+        self._addDefaultIgnoreRules()
+        self._focusEvents = ['focus:',
+                             'window:',
+                             'object:state-changed:focused',
+                             'object:state-changed:active',
+                             'object:active-descendant-changed']
+        self._focusedObjectEvents = ['object:text-caret-moved',
+                                     'object:text-selection-changed',
+                                     'object:selection-changed',
+                                     'object:text-changed']
         debug.println(debug.LEVEL_INFO, 'Event manager initialized', True)
 
     def activate(self):
@@ -90,142 +478,228 @@ class EventManager:
         for eventType in eventTypeList:
             if not eventType in self._ignoredEvents:
                 self._ignoredEvents.append(eventType)
+        self._compiledIgnoreRules = {}
 
     def unignoreEventTypes(self, eventTypeList):
         for eventType in eventTypeList:
             if eventType in self._ignoredEvents:
                 self._ignoredEvents.remove(eventType)
+        self._compiledIgnoreRules = {}
 
-    def _ignore(self, event):
-        """Returns True if this event should be ignored."""
+    def addIgnoreRule(self, eventType, predicate, reason, roles=None, toolkits=None):
+        """Adds a rule for ignoring events. Returns the new rule, which can
+        be passed to removeIgnoreRule.
 
-        debug.println(debug.LEVEL_INFO, '')
-        msg = 'EVENT MANAGER: %s for %s in %s (%s, %s, %s)' % \
-              (event.type, event.source, event.host_application,
-               event.detail1,event.detail2, event.any_data)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        Arguments:
+        - eventType: the rule applies to events whose type starts with this
+        - predicate: a function taking the event and an object providing the
+          state and role of its source (and of the child/descendant in its
+          any_data), returning True if the event should be ignored. None
+          means the event should always be ignored if the rule applies.
+          The state and role are only requested from the application if
+          the predicate asks for them.
+        - reason: the reason for ignoring the event, for debugging
+        - roles: if not None, the rule only applies if the event source
+          has one of these roles
+        - toolkits: if not None, the rule only applies if the event comes
+          from an application with one of these toolkit names
+        """
 
-        if not self._active:
-            msg = 'EVENT MANAGER: Ignoring because event manager is not active'
-            debug.println(debug.LEVEL_INFO, msg, True)
-            return True
+        rule = _IgnoreRule(eventType, predicate, reason, roles, toolkits)
+        self._ignoreRules.append(rule)
+        self._compiledIgnoreRules = {}
+        return rule
 
-        if list(filter(event.type.startswith, self._ignoredEvents)):
-            msg = 'EVENT MANAGER: Ignoring because event type is ignored'
-            debug.println(debug.LEVEL_INFO, msg, True)
-            return True
+    def removeIgnoreRule(self, rule):
+        """Removes a rule previously added with addIgnoreRule."""
 
-        if event.type.startswith('window'):
-            msg = 'EVENT MANAGER: Not ignoring because event type is never ignored'
-            debug.println(debug.LEVEL_INFO, msg, True)
-            return False
+        if rule in self._ignoreRules:
+            self._ignoreRules.remove(rule)
+        self._compiledIgnoreRules = {}
 
-        script = orca_state.activeScript
-        if event.type.startswith('object:children-changed:add'):
-            if not script:
-                msg = 'EVENT MANAGER: Ignoring because there is no active script'
-                debug.println(debug.LEVEL_INFO, msg, True)
-                return True
-            if script.app != event.host_application:
-                msg = 'EVENT MANAGER: Ignoring because event is not from active app'
-                debug.println(debug.LEVEL_INFO, msg, True)
-                return True
+    def _addDefaultIgnoreRules(self):
+        EOC = self.EMBEDDED_OBJECT_CHARACTER
+        addRule = self.addIgnoreRule
+
+        addRule('object:children-changed:add',
+                lambda e, info: not orca_state.activeScript,
+                'there is no active script')
+        addRule('object:children-changed:add',
+                lambda e, info: orca_state.activeScript.app != e.host_application,
+                'event is not from active app')
 
         # This should ultimately be changed as there are valid reasons
         # to handle these events at the application level.
-        if event.type.startswith('object:children-changed:remove') \
-           and event.source != self._desktop:
-            msg = 'EVENT MANAGER: Ignoring because event type is ignored'
-            debug.println(debug.LEVEL_INFO, msg, True)
-            return True
+        addRule('object:children-changed:remove',
+                lambda e, info: e.source != self._desktop,
+                'event type is ignored')
+
+        # We should also get children-changed events telling us the same thing.
+        # Getting a bunch of both can result in a flood that grinds us to a halt.
+        addRule('object:text-changed',
+                lambda e, info: e.type.endswith('system') and e.any_data == EOC,
+                'changed text is embedded object')
+
+        # The remaining rules need to ask the application about the event
+        # source, so we check that it's not defunct first.
+        sourceTypes = ['object:children-changed:add',
+                       'object:state-changed:sensitive',
+                       'object:state-changed:showing',
+                       'object:active-descendant-changed']
+        for eventType in sourceTypes:
+            addRule(eventType,
+                    lambda e, info: info.state.contains(pyatspi.STATE_DEFUNCT),
+                    'event is from defunct source')
+
+        addRule('object:children-changed:add', None, 'of event source role',
+                roles=[pyatspi.ROLE_MENU,
+                       pyatspi.ROLE_MENU_ITEM])
+        addRule('object:state-changed:sensitive', None, 'of event source role',
+                roles=[pyatspi.ROLE_MENU_ITEM,
+                       pyatspi.ROLE_CHECK_MENU_ITEM,
+                       pyatspi.ROLE_RADIO_MENU_ITEM])
+
+        showingRoles = [pyatspi.ROLE_ALERT,
+                        pyatspi.ROLE_ANIMATION,
+                        pyatspi.ROLE_INFO_BAR,
+                        pyatspi.ROLE_NOTIFICATION,
+                        pyatspi.ROLE_PANEL,
+                        pyatspi.ROLE_STATUS_BAR,
+                        pyatspi.ROLE_TOOL_TIP]
+        addRule('object:state-changed:showing',
+                lambda e, info: info.role not in showingRoles,
+                'of event source role')
+
+        for eventType in ['object:children-changed:add',
+                          'object:active-descendant-changed']:
+            addRule(eventType,
+                    lambda e, info: not e.any_data,
+                    'event any_data lacks child/descendant')
+            addRule(eventType,
+                    lambda e, info: info.childState.contains(pyatspi.STATE_DEFUNCT),
+                    'event any_data contains defunct child/descendant')
 
-        if event.type.startswith('object:text-changed') and event.type.endswith('system'):
-            # We should also get children-changed events telling us the same thing.
-            # Getting a bunch of both can result in a flood that grinds us to a halt.
-            if event.any_data == self.EMBEDDED_OBJECT_CHARACTER:
-                msg = 'EVENT MANAGER: Ignoring because changed text is embedded object'
-                debug.println(debug.LEVEL_INFO, msg, True)
-                return True
+            # This should be safe. We do not have a reason to present a newly-added,
+            # but not focused image. We do not need to update live regions for images.
+            # This is very likely a completely and utterly useless event for us. The
+            # reason for ignoring it here rather than quickly processing it is the
+            # potential for event floods like we're seeing from matrix.org.
+            addRule(eventType,
+                    lambda e, info: info.childRole == pyatspi.ROLE_IMAGE,
+                    'of event any_data role')
+
+    def _getIgnoreRules(self, eventType):
+        """Returns True if events of eventType are always ignored; otherwise
+        the list of rules which apply to events of eventType. The result is
+        computed once per distinct event type."""
+
+        rules = self._compiledIgnoreRules.get(eventType)
+        if rules is not None:
+            return rules
+
+        if list(filter(eventType.startswith, self._ignoredEvents)):
+            rules = True
+        elif eventType.startswith('window'):
+            rules = []
+        else:
+            rules = [r for r in self._ignoreRules if eventType.startswith(r.eventType)]
+
+        self._compiledIgnoreRules[eventType] = rules
+        return rules
+
+    def getQueueStatistics(self):
+        """Returns a dictionary with the number of events queued, merged,
+        superseded, dropped as duplicates, and dropped due to overflow,
+        along with the number still pending overall and per app."""
+
+        return self._eventQueue.statistics()
+
+    def _refreshFlatReview(self, obj):
+        script = orca_state.activeScript
+        context = getattr(script, "flatReviewContext", None)
+        if not context:
+            return
 
         try:
-            # TODO - JD: For now we won't ask for the name. Simply asking for the name should
-            # not break anything, and should be a reliable way to quickly identify defunct
-            # objects. But apparently the mere act of asking for the name causes Orca to stop
-            # presenting Eclipse (and possibly other) applications. This might be an AT-SPI2
-            # issue, but until we know for certain....
-            #name = event.source.name
-            state = event.source.getState()
-            role = event.source.getRole()
+            context.refresh(obj)
         except:
-            msg = 'ERROR: Event is from potentially-defunct source'
-            debug.println(debug.LEVEL_INFO, msg, True)
-            return True
-        if state.contains(pyatspi.STATE_DEFUNCT):
-            msg = 'ERROR: Event is from defunct source'
-            debug.println(debug.LEVEL_INFO, msg, True)
-            return True
+            debug.printException(debug.LEVEL_WARNING)
 
+    def hasPendingEvents(self, obj, eventTypes):
+        """Returns True if an event from obj of one of eventTypes, e.g.
+        "object:text-changed:insert", is waiting to be processed."""
 
-        if event.type.startswith('object:children-changed:add'):
-            if role in [pyatspi.ROLE_MENU,
-                        pyatspi.ROLE_MENU_ITEM]:
-                msg = 'EVENT MANAGER: Ignoring event type due to role'
-                debug.println(debug.LEVEL_INFO, msg, True)
-                return True
+        return self._eventQueue.hasPending(obj, eventTypes)
 
-        if event.type.startswith('object:state-changed:sensitive'):
-            if role in [pyatspi.ROLE_MENU_ITEM,
-                        pyatspi.ROLE_CHECK_MENU_ITEM,
-                        pyatspi.ROLE_RADIO_MENU_ITEM]:
-                msg = 'EVENT MANAGER: Ignoring event type due to role'
-                debug.println(debug.LEVEL_INFO, msg, True)
-                return True
+    def _ignore(self, event):
+        """Returns True if this event should be ignored."""
 
-        if event.type.startswith('object:state-changed:showing'):
-            if role not in [pyatspi.ROLE_ALERT,
-                            pyatspi.ROLE_ANIMATION,
-                            pyatspi.ROLE_INFO_BAR,
-                            pyatspi.ROLE_NOTIFICATION,
-                            pyatspi.ROLE_PANEL,
-                            pyatspi.ROLE_STATUS_BAR,
-                            pyatspi.ROLE_TOOL_TIP]:
-                msg = 'EVENT MANAGER: Ignoring event type due to role'
-                debug.println(debug.LEVEL_INFO, msg, True)
-                return True
+        debug.println(debug.LEVEL_INFO, '')
+        debug.printMessage(debug.LEVEL_INFO,
+                           'EVENT MANAGER: %s for %s in %s (%s, %s, %s)',
+                           event.type, event.source, event.host_application,
+                           event.detail1, event.detail2, event.any_data,
+                           timestamp=True)
 
-        if event.type.startswith('object:children-changed:add') \
-           or event.type.startswith('object:active-descendant-changed'):
-            if not event.any_data:
-                msg = 'ERROR: Event any_data lacks child/descendant'
-                debug.println(debug.LEVEL_INFO, msg, True)
-                return True
+        if not self._active:
+            msg = 'EVENT MANAGER: Ignoring because event manager is not active'
+            debug.println(debug.LEVEL_INFO, msg, True)
+            return True
+
+        rules = self._getIgnoreRules(event.type)
+        if rules is True:
+            msg = 'EVENT MANAGER: Ignoring because event type is ignored'
+            debug.println(debug.LEVEL_INFO, msg, True)
+            return True
+
+        info = _EventInfo(event)
+        for rule in rules:
             try:
-                state = event.any_data.getState()
-                role = event.any_data.getRole()
+                ignore = rule.applies(event, info)
             except:
-                msg = 'ERROR: Event any_data contains potentially-defunct child/descendant'
-                debug.println(debug.LEVEL_INFO, msg, True)
-                return True
-            if state.contains(pyatspi.STATE_DEFUNCT):
-                msg = 'ERROR: Event any_data contains defunct child/descendant'
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   'ERROR: Exception checking if %s; event is from '
+                                   'potentially-defunct source', rule.reason,
+                                   timestamp=True)
                 return True
-
-            # This should be safe. We do not have a reason to present a newly-added,
-            # but not focused image. We do not need to update live regions for images.
-            # This is very likely a completely and utterly useless event for us. The
-            # reason for ignoring it here rather than quickly processing it is the
-            # potential for event floods like we're seeing from matrix.org.
-            if role == pyatspi.ROLE_IMAGE:
-                msg = 'EVENT MANAGER: Ignoring event type due to role'
-                debug.println(debug.LEVEL_INFO, msg, True)
+            if ignore:
+                debug.printMessage(debug.LEVEL_INFO,
+                                   'EVENT MANAGER: Ignoring because %s',
+                                   rule.reason, timestamp=True)
                 return True
 
         msg = 'EVENT MANAGER: Not ignoring due to lack of cause'
         debug.println(debug.LEVEL_INFO, msg, True)
         return False
 
-    def _addToQueue(self, event, asyncMode):
+    def _getLane(self, event):
+        """Returns the lane of the event queue in which event should wait."""
+
+        if isinstance(event, (input_event.KeyboardEvent,
+                              input_event.BrailleEvent,
+                              input_event.MouseButtonEvent)):
+            return _EventQueue.LANE_INPUT
+
+        if list(filter(event.type.startswith, self._focusEvents)):
+            return _EventQueue.LANE_FOCUS
+
+        # Caret, selection and text changes in the focused object are usually
+        # the result of something the user just did, so they shouldn't wait.
+        # Text changes must be in the same lane as the caret changes, or the
+        # caret would be processed before the text it moved past (e.g. when
+        # typing), and the echo could wait for the background lane.
+        if list(filter(event.type.startswith, self._focusedObjectEvents)) \
+           and event.source == orca_state.locusOfFocus:
+            return _EventQueue.LANE_FOCUS
+
+        return _EventQueue.LANE_BACKGROUND
+
+    def _addToQueue(self, event, asyncMode, app=None):
+        """Adds event to the queue. Object events must specify the app they
+        came from so that they can be coalesced and flood controlled per app.
+        Returns the pending event which now represents event, which might be
+        an older one it was coalesced with, or None if event was discarded."""
+
         debugging = debug.debugEventQueue
         if debugging:
             debug.println(debug.LEVEL_ALL, "           acquiring lock...")
@@ -237,10 +711,20 @@ class EventManager:
             debug.println(debug.LEVEL_ALL, "           (full=%s)" \
                           % self._eventQueue.full())
 
-        self._eventQueue.put(event)
+        queued = self._eventQueue.put(event, app, self._getLane(event))
+        metrics.record(metrics.QUEUE_DEPTH, "all", self._eventQueue.qsize())
         if debugging:
             debug.println(debug.LEVEL_ALL, "           ...put complete")
 
+        if queued is None:
+            debug.printMessage(debug.LEVEL_INFO,
+                               "EVENT MANAGER: Dropping %s: queue for app is full",
+                               event.type, timestamp=True)
+        elif queued is not event:
+            debug.printMessage(debug.LEVEL_INFO,
+                               "EVENT MANAGER: Coalesced %s with %s",
+                               event.type, queued, timestamp=True)
+
         if asyncMode and not self._gidleId:
             if self._gilSleepTime:
                 time.sleep(self._gilSleepTime)
@@ -252,9 +736,14 @@ class EventManager:
         if debug.debugEventQueue:
             debug.println(debug.LEVEL_ALL, "           ...released")
 
+        return queued
+
     def _queuePrintln(self, e, isEnqueue=True):
         """Convenience method to output queue-related debugging info."""
 
+        if not debug.isEnabled(debug.LEVEL_INFO):
+            return
+
         if isinstance(e, input_event.KeyboardEvent):
             data = "'%s' (%d)" % (e.event_string, e.hw_code)
         elif isinstance(e, input_event.BrailleEvent):
@@ -289,11 +778,25 @@ class EventManager:
         inputEvents = (input_event.KeyboardEvent, input_event.BrailleEvent)
         isObjectEvent = not isinstance(e, inputEvents)
 
+        # Cached values must be discarded even for events which are ignored,
+        # or which the script does not handle. The same goes for the text of
+        # a flat review snapshot.
+        if isObjectEvent:
+            try:
+                accessible_cache.onEvent(e)
+            except:
+                debug.printMessage(debug.LEVEL_INFO,
+                                   'ERROR: Exception invalidating cache: %s', e,
+                                   timestamp=True)
+            if e.type.startswith("object:text-changed"):
+                self._refreshFlatReview(e.source)
+
         try:
             ignore = isObjectEvent and self._ignore(e)
         except:
-            msg = 'ERROR: Exception evaluating event: %s' % e
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Exception evaluating event: %s', e,
+                               timestamp=True)
             ignore = True
         if ignore:
             if debug.debugEventQueue:
@@ -303,8 +806,19 @@ class EventManager:
         self._queuePrintln(e)
 
         asyncMode = self._asyncMode
+        app = script = None
         if isObjectEvent:
-            app = e.source.getApplication()
+            try:
+                app = e.source.getApplication()
+            except:
+                # We no longer check every event source for being defunct in
+                # _ignore(), so this is where we find out about those.
+                debug.printMessage(debug.LEVEL_INFO,
+                                   'ERROR: Could not get application for %s', e.source,
+                                   timestamp=True)
+                if debug.debugEventQueue:
+                    self._enqueueCount -= 1
+                return
             try:
                 toolkitName = app.toolkitName
             except:
@@ -313,9 +827,10 @@ class EventManager:
                or isinstance(e, input_event.MouseButtonEvent):
                 asyncMode = False
             script = _scriptManager.getScript(app, e.source)
-            script.eventCache[e.type] = (e, time.time())
 
-        self._addToQueue(e, asyncMode)
+        queued = self._addToQueue(e, asyncMode, app)
+        if script and queued:
+            script.eventCache[e.type] = (queued, time.time())
         if not asyncMode:
             self._dequeue()
 
@@ -336,28 +851,42 @@ class EventManager:
         try:
             event = self._eventQueue.get_nowait()
             self._queuePrintln(event, isEnqueue=False)
+            previousScript = orca_state.activeScript
             inputEvents = (input_event.KeyboardEvent, input_event.BrailleEvent)
+            accessible_cache.clearTransient()
+            startTime = time.time()
             if isinstance(event, inputEvents):
                 self._processInputEvent(event)
+                metrics.record(metrics.EVENT_TIME, event.__class__.__name__,
+                               time.time() - startTime)
             else:
                 debug.objEvent = event
                 debugging = not debug.eventDebugFilter \
                             or debug.eventDebugFilter.match(event.type)
                 if debugging:
-                    startTime = time.time()
                     debug.println(debug.eventDebugLevel,
                                   "\nvvvvv PROCESS OBJECT EVENT %s vvvvv" \
                                   % event.type)
                 self._processObjectEvent(event)
+                duration = time.time() - startTime
+                metrics.record(metrics.EVENT_TIME, event.type, duration)
                 if debugging:
                     debug.println(debug.eventDebugLevel,
-                                  "TOTAL PROCESSING TIME: %.4f" \
-                                  % (time.time() - startTime))
+                                  "TOTAL PROCESSING TIME: %.4f" % duration)
                     debug.println(debug.eventDebugLevel,
                                   "^^^^^ PROCESS OBJECT EVENT %s ^^^^^\n" \
                                   % event.type)
                 debug.objEvent = None
 
+            # Timers and idle handlers run between events; they should not
+            # be given the values obtained while this one was processed.
+            accessible_cache.clearTransient()
+
+            activeScript = orca_state.activeScript
+            if previousScript and activeScript != previousScript \
+               and (not activeScript or activeScript.app != previousScript.app):
+                self._cancelEventsFor(previousScript)
+
             # [[[TODO: HACK - it would seem logical to only do this if we
             # discover the queue is empty, but this inroduces a hang for
             # some reason if done inside an acquire/release block for a
@@ -394,6 +923,17 @@ class EventManager:
 
         return rerun
 
+    def _cancelEventsFor(self, script):
+        """Discards pending events from the app of script, which is no longer
+        active, that would only be of interest if that app had focus."""
+
+        cancelled = self._eventQueue.cancel(
+            script.app, settings.eventTypesCancelledOnFocusChange)
+        if cancelled:
+            debug.printMessage(debug.LEVEL_INFO,
+                               'EVENT MANAGER: Cancelled %i events from %s',
+                               cancelled, script.app, timestamp=True)
+
     def _registerListener(self, eventType):
         """Tells this module to listen for the given event type.
 
@@ -564,12 +1104,13 @@ class EventManager:
                 "object:text-changed",
             ]
             check = not list(filter(lambda x: event.type.startswith(x), skipCheck))
-            msg = 'EVENT MANAGER: Getting script for %s (check: %s)' % (app, check)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'EVENT MANAGER: Getting script for %s (check: %s)',
+                               app, check, timestamp=True)
             script = _scriptManager.getScript(app, event.source, sanityCheck=check)
 
-        msg = 'EVENT MANAGER: Script is %s' % script
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO, 'EVENT MANAGER: Script is %s',
+                           script, timestamp=True)
         return script
 
     def _isActivatableEvent(self, event, script=None):
@@ -586,7 +1127,7 @@ class EventManager:
 
         role = state = None
         try:
-            role = event.source.getRole()
+            role = accessible_cache.getRole(event.source)
         except (LookupError, RuntimeError):
             return False, "Error getting event.source's role"
         try:
@@ -656,7 +1197,7 @@ class EventManager:
 
         if eType.startswith("object:state-changed:active"):
             try:
-                role = event.source.getRole()
+                role = accessible_cache.getRole(event.source)
             except:
                 pass
             else:
@@ -670,10 +1211,11 @@ class EventManager:
            and orca_state.activeScript \
            and orca_state.activeScript.flatReviewContext \
            and orca_state.activeScript.app == event.host_application:
+            orca_state.activeScript.flatReviewContext.cancel()
             orca_state.activeScript.flatReviewContext = None
 
         try:
-            state = event.source.getState()
+            state = accessible_cache.getState(event.source)
         except (LookupError, RuntimeError):
             msg = 'ERROR: Could not process event: %s' % eType
             debug.println(debug.LEVEL_WARNING, msg, True)
@@ -685,16 +1227,18 @@ class EventManager:
             return
 
         if state and state.contains(pyatspi.STATE_DEFUNCT):
-            msg = 'EVENT MANAGER: Ignoring defunct object: %s' % event.source
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'EVENT MANAGER: Ignoring defunct object: %s',
+                               event.source, timestamp=True)
             if eType.startswith("window:deactivate"):
                 orca_state.locusOfFocus = None
                 orca_state.activeWindow = None
             return
 
         if state and state.contains(pyatspi.STATE_ICONIFIED):
-            msg = 'EVENT MANAGER: Ignoring iconified object: %s' % event.source
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'EVENT MANAGER: Ignoring iconified object: %s',
+                               event.source, timestamp=True)
             return
 
         if not debug.eventDebugFilter or debug.eventDebugFilter.match(eType) \
@@ -703,8 +1247,9 @@ class EventManager:
 
         script = self._getScriptForEvent(event)
         if not script:
-            msg = 'ERROR: Could not get script for %s' % event
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Could not get script for %s', event,
+                               timestamp=True)
             return
 
         setNewActiveScript, reason = self._isActivatableEvent(event, script)
@@ -712,27 +1257,34 @@ class EventManager:
             try:
                 app = event.host_application or event.source.getApplication()
             except:
-                msg = 'ERROR: Could not get application for %s' % event.source
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   'ERROR: Could not get application for %s',
+                                   event.source, timestamp=True)
                 return
             try:
                 _scriptManager.setActiveScript(script, reason)
             except:
-                msg = 'ERROR: Could not set active script for %s' % event.source
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   'ERROR: Could not set active script for %s',
+                                   event.source, timestamp=True)
                 return
 
+        startTime = time.time()
         try:
             script.processObjectEvent(event)
         except:
             msg = 'ERROR: Could not process %s' % event.type
             debug.println(debug.LEVEL_INFO, msg, True)
             debug.printException(debug.LEVEL_INFO)
+        metrics.record(metrics.SCRIPT_TIME, script.name, time.time() - startTime)
 
     def _processKeyboardEvent(self, event):
+        if event.type == pyatspi.KEY_PRESSED_EVENT:
+            atspi_profiler.startInputEvent(event)
+
         keyboardEvent = input_event.KeyboardEvent(event)
         if not keyboardEvent.is_duplicate:
-            debug.println(debug.LEVEL_INFO, "\n%s" % keyboardEvent)
+            debug.printMessage(debug.LEVEL_INFO, "\n%s", keyboardEvent)
 
         rv = keyboardEvent.process()
 
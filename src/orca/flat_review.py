@@ -27,8 +27,13 @@ __copyright__ = "Copyright (c) 2005-2008 Sun Microsystems Inc." \
                 "Copyright (c) 2016 Igalia, S.L."
 __license__   = "LGPL"
 
+import bisect
+import itertools
 import pyatspi
 import re
+import time
+
+from gi.repository import GLib
 
 from . import braille
 from . import debug
@@ -88,11 +93,17 @@ class Word:
         self.width = width
         self.height = height
         self.chars = []
+        self._chars = None
 
     def __getattribute__(self, attr):
         if attr != "chars":
             return super().__getattribute__(attr)
 
+        # In a snapshot, the characters and their extents are only obtained
+        # the first time they are needed.
+        if self._chars is not None:
+            return self._chars
+
         # TODO - JD: For now, don't fake character and word extents.
         # The main goal is to improve reviewability.
         extents = self.x, self.y, self.width, self.height
@@ -109,6 +120,9 @@ class Word:
                 extents = text.getRangeExtents(start, start+1, pyatspi.DESKTOP_COORDS)
             chars.append(Char(self, i, start, char, *extents))
 
+        if self.zone.isSnapshot:
+            self._chars = chars
+
         return chars
 
     def getRelativeOffset(self, offset):
@@ -145,6 +159,18 @@ class Zone:
         self.height = height
         self.role = role or accessible.getRole()
         self._words = []
+        self.isSnapshot = False
+        self.parent = None
+        self.parentRole = None
+        self._hasParentInfo = False
+
+    def setParentInfo(self, parent, parentRole):
+        """Sets the parent of the accessible and its role, so that they need
+        not be obtained when comparing zones."""
+
+        self.parent = parent
+        self.parentRole = parentRole
+        self._hasParentInfo = True
 
     def __getattribute__(self, attr):
         """To ensure we update the content."""
@@ -213,6 +239,11 @@ class Zone:
         if pyatspi.ROLE_SCROLL_BAR in [self.role, zone.role]:
             return self.accessible == zone.accessible
 
+        if self._hasParentInfo and zone._hasParentInfo:
+            if pyatspi.ROLE_MENU_BAR in [self.parentRole, zone.parentRole]:
+                return self.parent == zone.parent
+            return self._extentsAreOnSameLine(zone)
+
         try:
             thisParentRole = self.accessible.parent.getRole()
             zoneParentRole = zone.accessible.parent.getRole()
@@ -245,12 +276,16 @@ class Zone:
 class TextZone(Zone):
     """A Zone whose purpose is to display text of an object."""
 
-    def __init__(self, accessible, startOffset, string, x, y, width, height, role=None):
+    def __init__(self, accessible, startOffset, string, x, y, width, height, role=None,
+                 snapshot=False):
         super().__init__(accessible, string, x, y, width, height, role)
 
         self.startOffset = startOffset
         self.endOffset = self.startOffset + len(string)
         self._itext = self.accessible.queryText()
+        self.isSnapshot = snapshot
+        self._materialized = False
+        self._stale = False
 
     def __getattribute__(self, attr):
         """To ensure we update the content."""
@@ -258,7 +293,19 @@ class TextZone(Zone):
         if not attr in ["words", "string"]:
             return super().__getattribute__(attr)
 
-        string = self._itext.getText(self.startOffset, self.endOffset)
+        # A snapshot zone keeps the string it was created with and obtains
+        # its words once, unless its text is known to have changed.
+        if self.isSnapshot:
+            if self._stale:
+                self.revalidate()
+            elif attr == "words" and not self._materialized:
+                self._materialize(self._string)
+            return super().__getattribute__(attr)
+
+        self._materialize(self._itext.getText(self.startOffset, self.endOffset))
+        return super().__getattribute__(attr)
+
+    def _materialize(self, string):
         words = []
         for i, word in enumerate(re.finditer(self.WORDS_RE, string)):
             start, end = map(lambda x: x + self.startOffset, word.span())
@@ -267,7 +314,30 @@ class TextZone(Zone):
 
         self._string = string
         self._words = words
-        return super().__getattribute__(attr)
+        self._materialized = True
+
+    def invalidate(self):
+        """Indicates the text of a snapshot zone may have changed."""
+
+        self._stale = True
+
+    def revalidate(self):
+        """Updates the string and words of this zone if its text has changed.
+        Returns True if the text changed."""
+
+        self._stale = False
+        try:
+            string = self._itext.getText(self.startOffset, self.endOffset)
+        except:
+            msg = "FLAT REVIEW: Exception getting text of %s" % self.accessible
+            debug.println(debug.LEVEL_INFO, msg, True)
+            return False
+
+        if string == self._string and self._materialized:
+            return False
+
+        self._materialize(string)
+        return True
 
     def hasCaret(self):
         """Returns True if this Zone contains the caret."""
@@ -437,6 +507,271 @@ class Line:
 
         return self.brailleRegions
 
+class ZoneCollector:
+    """Collects the zones for a Context. The work is divided into jobs, one
+    for each child subtree of the first descendant of the root which has
+    several children, or for each visible row of such a table, which can be
+    run all at once, or one after another from the main loop so that Orca
+    remains responsive while a large window is examined. Subtrees which are
+    not on screen are pruned by getOnScreenObjects before their descendants
+    are examined.
+
+    Note that the jobs are not run in separate threads because AT-SPI calls
+    must be made from the main thread."""
+
+    # The longest time, in seconds, to spend running jobs before returning
+    # to the main loop when collecting in the background.
+    TIME_SLICE = 0.05
+
+    def __init__(self, context, root, boundingbox):
+        self.context = context
+        self.root = root
+        self.boundingbox = boundingbox
+        self._ancestors = []
+        self.jobs, self._isSplit = self._getJobs()
+        self.results = []
+        self.cancelled = False
+        self._sourceId = 0
+        self._callback = None
+        self._progressCallback = None
+
+    def _getJobs(self):
+        """Returns the jobs, each a function which returns the objects whose
+        zones are to be collected, and whether they divide the root (rather
+        than examining it as a whole). The containers the root was divided
+        beneath are stored in _ancestors."""
+
+        utilities = self.context.script.utilities
+        whole = [lambda: utilities.getOnScreenObjects(self.root, self.boundingbox)]
+        obj = self.root
+        while True:
+            try:
+                role = obj.getRole()
+                interfaces = pyatspi.listInterfaces(obj)
+                parentRole = obj.parent.getRole() if obj.parent else None
+                children = [x for x in obj]
+            except:
+                return whole, False
+
+            # Objects which getOnScreenObjects treats specially are examined
+            # as a whole, as are those which are themselves presented.
+            special = [pyatspi.ROLE_COMBO_BOX,
+                       pyatspi.ROLE_MENU_BAR,
+                       pyatspi.ROLE_PAGE_TAB,
+                       pyatspi.ROLE_INVALID]
+            if role in special or parentRole == pyatspi.ROLE_MENU_BAR \
+               or "Text" in interfaces or not children \
+               or not utilities.isOnScreen(obj, self.boundingbox):
+                return whole, False
+
+            self._ancestors.append(obj)
+            if "Table" in interfaces:
+                jobs = "Selection" in interfaces and self._getTableJobs(obj)
+                return (jobs, True) if jobs else (whole, False)
+
+            if len(children) > 1:
+                return [self._getSubtreeJob(x) for x in children], True
+
+            obj = children[0]
+
+    def _getSubtreeJob(self, obj):
+        utilities = self.context.script.utilities
+        return lambda: utilities.getOnScreenObjects(obj, self.boundingbox)
+
+    def _getTableJobs(self, table):
+        """Returns jobs for the column headers, each visible row, and any
+        other objects presented with the table, or [] if it has no visible
+        rows, as getOnScreenObjects would then examine its children."""
+
+        utilities = self.context.script.utilities
+        rows, columns = utilities.getVisibleTableRowsAndColumns(table)
+        if not (rows and columns):
+            return []
+
+        def _getRowJob(row):
+            return lambda: utilities.getVisibleTableCellsInRow(table, row, columns)
+
+        jobs = [lambda: utilities.getTableColumnHeaders(table, columns)]
+        jobs.extend(map(_getRowJob, rows))
+        jobs.append(lambda: utilities.getOnScreenTableExtras(table))
+        return jobs
+
+    def isDone(self):
+        return len(self.results) == len(self.jobs)
+
+    def _runJob(self):
+        job = self.jobs[len(self.results)]
+        result = []
+        for obj in job():
+            zones = self.context.getZonesFromAccessible(obj, self.boundingbox)
+            if zones:
+                result.append((obj, zones))
+
+        self.results.append(result)
+
+    def run(self):
+        """Runs the remaining jobs, stopping any background collection."""
+
+        self._removeSource()
+        while not (self.isDone() or self.cancelled):
+            self._runJob()
+
+    def start(self, callback, progressCallback=None):
+        """Runs the jobs from the main loop. When they are finished, calls
+        callback with this collector. While they are being run, calls
+        progressCallback with the number of jobs done and the total."""
+
+        self._callback = callback
+        self._progressCallback = progressCallback
+        self._sourceId = GLib.idle_add(self._step)
+
+    def _step(self):
+        start = time.time()
+        while not (self.isDone() or self.cancelled):
+            self._runJob()
+            if time.time() - start > self.TIME_SLICE:
+                break
+
+        msg = "FLAT REVIEW: Collected zones for %i of %i subtrees of %s" \
+              % (len(self.results), len(self.jobs), self.root)
+        debug.println(debug.LEVEL_INFO, msg, True)
+
+        if self.cancelled:
+            self._sourceId = 0
+            return False
+
+        if not self.isDone():
+            if self._progressCallback:
+                self._progressCallback(len(self.results), len(self.jobs))
+            return True
+
+        self._sourceId = 0
+        if self._callback:
+            self._callback(self)
+        return False
+
+    def _removeSource(self):
+        if self._sourceId:
+            GLib.source_remove(self._sourceId)
+            self._sourceId = 0
+
+    def cancel(self):
+        """Stops collecting. The zones collected so far are discarded."""
+
+        self._removeSource()
+        self.cancelled = True
+        self.results = []
+
+    def getObjectsAndZones(self):
+        """Returns a list of (accessible, zones) pairs, in document order."""
+
+        result = [x for jobResult in self.results for x in jobResult]
+        if result or not self._isSplit:
+            return result
+
+        # If none of the descendants is presentable, the innermost of the
+        # containers the root was divided beneath which is not just a
+        # container might be, as with getOnScreenObjects.
+        containers = [pyatspi.ROLE_FILLER,
+                      pyatspi.ROLE_LIST_BOX,
+                      pyatspi.ROLE_PANEL,
+                      pyatspi.ROLE_SCROLL_PANE,
+                      pyatspi.ROLE_VIEWPORT]
+        for obj in reversed(self._ancestors):
+            try:
+                role = obj.getRole()
+            except:
+                return []
+
+            if role in containers:
+                continue
+
+            zones = self.context.getZonesFromAccessible(obj, self.boundingbox)
+            if zones:
+                return [(obj, zones)]
+            return []
+
+        return []
+
+
+class ZoneIndex:
+    """A spatial index of the zones of a Context, built once the zones have
+    been clustered into lines. Finding the line at a y-coordinate and the
+    zones of a line which extend past an x-coordinate are binary searches."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self._tops = []
+        self._bottoms = []
+        self._maxBottoms = []
+        self._maxRights = []
+
+        maxBottom = None
+        for line in lines:
+            top = min(z.y for z in line.zones)
+            bottom = max(z.y + z.height for z in line.zones)
+            maxBottom = bottom if maxBottom is None else max(maxBottom, bottom)
+            self._tops.append(top)
+            self._bottoms.append(bottom)
+            self._maxBottoms.append(maxBottom)
+            rights = [z.x + z.width for z in line.zones]
+            self._maxRights.append(list(itertools.accumulate(rights, max)))
+
+        self._sorted = self._tops == sorted(self._tops)
+
+    def getLineIndexAt(self, y):
+        """Returns the index of a line which contains y, or -1."""
+
+        if not self._sorted:
+            candidates = range(len(self.lines))
+        else:
+            end = bisect.bisect_right(self._tops, y)
+            candidates = range(end - 1, -1, -1)
+
+        for i in candidates:
+            if self._sorted and self._maxBottoms[i] < y:
+                break
+            if self._tops[i] <= y <= self._bottoms[i]:
+                return i
+
+        return -1
+
+    def getZoneIndexAt(self, lineIndex, x):
+        """Returns the index of the zone in the line which contains x, or -1."""
+
+        zones = self.lines[lineIndex].zones
+        for i in range(self.firstZoneEndingAfter(lineIndex, x), len(zones)):
+            zone = zones[i]
+            if zone.x > x:
+                break
+            if zone.x <= x <= zone.x + zone.width:
+                return i
+
+        return -1
+
+    def firstZoneEndingAfter(self, lineIndex, x):
+        """Returns the index of the first zone in the line whose right edge
+        is at or after x, or the number of zones if there is none."""
+
+        return bisect.bisect_left(self._maxRights[lineIndex], x)
+
+    @staticmethod
+    def firstItemEndingAfter(items, x):
+        """Returns the index of the first of items (e.g. Words) whose right
+        edge is at or after x, or len(items) if there is none."""
+
+        rights = list(itertools.accumulate([i.x + i.width for i in items], max))
+        return bisect.bisect_left(rights, x)
+
+    @staticmethod
+    def firstItemStartingAfter(items, x):
+        """Returns the index of the first of items (e.g. Chars) whose left
+        edge is at or after x, or len(items) if there is none."""
+
+        lefts = list(itertools.accumulate([i.x for i in items], max))
+        return bisect.bisect_left(lefts, x)
+
+
 class Context:
     """Contains the flat review regions for the current top-level object."""
 
@@ -451,12 +786,21 @@ class Context:
     WRAP_TOP_BOTTOM = 1 << 1
     WRAP_ALL        = (WRAP_LINE | WRAP_TOP_BOTTOM)
 
-    def __init__(self, script):
-        """Create a new Context for script."""
+    def __init__(self, script, wait=True):
+        """Create a new Context for script.
+
+        Arguments:
+        - script: the script associated with this context
+        - wait: if False, the zones are not collected until collect() or
+          waitForZones() is called.
+        """
 
         self.script = script
-        self.zones = []
-        self.lines = []
+        self._zones = []
+        self._lines = []
+        self._index = ZoneIndex([])
+        self._refreshAll = False
+        self._refreshKeys = set()
         self.lineIndex = 0
         self.zoneIndex = 0
         self.wordIndex = 0
@@ -467,6 +811,7 @@ class Context:
         self.focusObj = orca_state.locusOfFocus
         self.topLevel = script.utilities.topLevelObject(self.focusObj)
         self.bounds = 0, 0, 0, 0
+        self.isSnapshot = settings.flatReviewSnapshot
 
         try:
             component = self.topLevel.queryComponent()
@@ -482,13 +827,75 @@ class Context:
             container = self.focusObj
 
         self.container = container or self.topLevel
+        self.collector = ZoneCollector(self, self.container, self.bounds)
+        if wait:
+            self.waitForZones()
+
+    # The zones, lines and index are only complete once the collector has
+    # finished, so any access to them first finishes its remaining jobs.
+
+    @property
+    def zones(self):
+        self.waitForZones()
+        self._applyRefresh()
+        return self._zones
+
+    @property
+    def lines(self):
+        self.waitForZones()
+        self._applyRefresh()
+        return self._lines
 
-        self.zones, self.focusZone = self.getShowingZones(self.container)
-        self.lines = self.clusterZonesByLine(self.zones)
-        if not (self.lines and self.focusZone):
+    @property
+    def index(self):
+        self.waitForZones()
+        return self._index
+
+    def isCollecting(self):
+        """Returns True if the zones have not yet been collected."""
+
+        return self.collector is not None
+
+    def collect(self, callback, progressCallback=None):
+        """Collects the zones from the main loop, so that Orca remains
+        responsive, and then calls callback with this context."""
+
+        if not self.isCollecting():
+            callback(self)
             return
 
-        for i, line in enumerate(self.lines):
+        def _onFinished(collector):
+            self._setZones(collector)
+            callback(self)
+
+        self.collector.start(_onFinished, progressCallback)
+
+    def waitForZones(self):
+        """Collects any zones which have not yet been collected."""
+
+        if not self.isCollecting():
+            return
+
+        self.collector.run()
+        self._setZones(self.collector)
+
+    def cancel(self):
+        """Stops the collection of zones, e.g. when flat review is exited
+        before it is finished."""
+
+        if self.isCollecting():
+            self.collector.cancel()
+            self.collector = None
+
+    def _setZones(self, collector):
+        self.collector = None
+        self._zones, self.focusZone = self._getZonesAndFocusZone(collector)
+        self._lines = self.clusterZonesByLine(self._zones)
+        self._index = ZoneIndex(self._lines)
+        if not (self._lines and self.focusZone):
+            return
+
+        for i, line in enumerate(self._lines):
             if self.focusZone in line.zones:
                 self.lineIndex = i
                 self.zoneIndex = line.zones.index(self.focusZone)
@@ -502,6 +909,43 @@ class Context:
               (self.lineIndex, self.zoneIndex, self.wordIndex, self.charIndex)
         debug.println(debug.LEVEL_INFO, msg, True)
 
+    def refresh(self, accessible=None):
+        """Causes the text of the zones for accessible, or of all the zones
+        if accessible is None, to be updated the next time it is needed.
+        Only needed for snapshot contexts, whose zones otherwise retain the
+        text they were created with. This is called for each text change,
+        so the zones are only found when the context is next used."""
+
+        if not self.isSnapshot:
+            return
+
+        if accessible is None:
+            self._refreshAll = True
+        else:
+            self._refreshKeys.add(hash(accessible))
+
+    def _applyRefresh(self):
+        if not (self._refreshAll or self._refreshKeys):
+            return
+
+        refreshAll, keys = self._refreshAll, self._refreshKeys
+        self._refreshAll, self._refreshKeys = False, set()
+
+        zones = [z for z in self._zones if isinstance(z, TextZone)]
+        if not refreshAll:
+            zones = [z for z in zones if hash(z.accessible) in keys]
+
+        for zone in zones:
+            zone.invalidate()
+
+        if zones:
+            for line in self._lines:
+                line.brailleRegions = None
+
+        debug.printMessage(debug.LEVEL_INFO,
+                           "FLAT REVIEW: %i zones to be revalidated", len(zones),
+                           timestamp=True)
+
     def splitTextIntoZones(self, accessible, string, startOffset, cliprect):
         """Traverses the string, splitting it up into separate zones if the
         string contains the EMBEDDED_OBJECT_CHARACTER, which is used by apps
@@ -579,7 +1023,8 @@ class Context:
                                           clipping[0],
                                           clipping[1],
                                           clipping[2],
-                                          clipping[3]))
+                                          clipping[3],
+                                          snapshot=self.isSnapshot))
                     substringStartOffset = substringEndOffset + 1
                     substringEndOffset   = substringStartOffset
                     unicodeStartOffset   = i + 1
@@ -616,7 +1061,8 @@ class Context:
         if "EditableText" in pyatspi.listInterfaces(accessible) \
            and accessible.getState().contains(pyatspi.STATE_SINGLE_LINE):
             extents = accessible.queryComponent().getExtents(0)
-            return [TextZone(accessible, 0, text.getText(0, -1), *extents)]
+            return [TextZone(accessible, 0, text.getText(0, -1), *extents,
+                             snapshot=self.isSnapshot)]
 
         debug.println(debug.LEVEL_FINEST, "  looking at text:")
 
@@ -801,6 +1247,17 @@ class Context:
 
         self._insertStateZone(zones, accessible, extents)
 
+        # So that clustering the zones into lines requires no further calls
+        # to the application.
+        try:
+            parent = accessible.parent
+            parentRole = parent.getRole() if parent else None
+        except:
+            pass
+        else:
+            for zone in zones:
+                zone.setParentInfo(parent, parentRole)
+
         return zones
 
     def getShowingZones(self, root, boundingbox=None):
@@ -809,16 +1266,19 @@ class Context:
         if boundingbox is None:
             boundingbox = self.bounds
 
-        objs = self.script.utilities.getOnScreenObjects(root, boundingbox)
-        msg = "FLAT REVIEW: %i on-screen objects found for %s" % (len(objs), root)
+        collector = ZoneCollector(self, root, boundingbox)
+        collector.run()
+        return self._getZonesAndFocusZone(collector)
+
+    def _getZonesAndFocusZone(self, collector):
+        objectsAndZones = collector.getObjectsAndZones()
+        root = collector.root
+        msg = "FLAT REVIEW: %i on-screen objects with zones found for %s" \
+              % (len(objectsAndZones), root)
         debug.println(debug.LEVEL_INFO, msg, True)
 
         allZones, focusZone = [], None
-        for o in objs:
-            zones = self.getZonesFromAccessible(o, boundingbox)
-            if not zones:
-                continue
-
+        for o, zones in objectsAndZones:
             allZones.extend(zones)
             if not focusZone and zones and (o == self.focusObj or o in self.focusObj):
                 zones = list(filter(lambda z: z.hasCaret(), zones)) or zones
@@ -888,6 +1348,8 @@ class Context:
         - charIndex: index lines[lineIndex].zones[zoneIndex].words[wordIndex].chars
         """
 
+        # Finishing the collection later would reset these to the focus.
+        self.waitForZones()
         self.lineIndex = lineIndex
         self.zoneIndex = zoneIndex
         self.wordIndex = wordIndex
@@ -985,6 +1447,7 @@ class Context:
         Returns True if the locus of interest actually changed.
         """
 
+        self.waitForZones()
         if (flatReviewType == Context.LINE) or (flatReviewType == Context.ZONE):
             lineIndex = self.lineIndex
         elif flatReviewType == Context.WINDOW:
@@ -1024,6 +1487,7 @@ class Context:
         Returns True if the locus of interest actually changed.
         """
 
+        self.waitForZones()
         if (flatReviewType == Context.LINE) or (flatReviewType == Context.ZONE):
             lineIndex = self.lineIndex
         elif flatReviewType == Context.WINDOW:
@@ -1326,6 +1790,58 @@ class Context:
 
         return moved
 
+    def _goToCharAtOrAfter(self, x):
+        """Moves to the first character on the current line whose left edge
+        is at or after x, or to the last character on the line."""
+
+        line = self.lines[self.lineIndex]
+        zoneIndex = self.index.firstZoneEndingAfter(self.lineIndex, x)
+        for zoneIndex in range(zoneIndex, len(line.zones)):
+            zone = line.zones[zoneIndex]
+            words = zone.words
+            if not words:
+                if zone.x >= x:
+                    self.zoneIndex, self.wordIndex, self.charIndex = zoneIndex, 0, 0
+                    return
+                continue
+
+            wordIndex = ZoneIndex.firstItemEndingAfter(words, x)
+            for wordIndex in range(wordIndex, len(words)):
+                chars = words[wordIndex].chars
+                charIndex = ZoneIndex.firstItemStartingAfter(chars, x)
+                if charIndex < len(chars):
+                    self.zoneIndex, self.wordIndex, self.charIndex = \
+                        zoneIndex, wordIndex, charIndex
+                    return
+
+        self.zoneIndex = len(line.zones) - 1
+        words = line.zones[self.zoneIndex].words
+        self.wordIndex = max(0, len(words) - 1)
+        self.charIndex = max(0, len(words[-1].chars) - 1) if words else 0
+
+    def setCurrentToPoint(self, x, y):
+        """Moves to the character, or failing that the zone, containing the
+        point x, y. Returns True if there is such a zone."""
+
+        lineIndex = self.index.getLineIndexAt(y)
+        if lineIndex < 0:
+            return False
+
+        zoneIndex = self.index.getZoneIndexAt(lineIndex, x)
+        if zoneIndex < 0:
+            return False
+
+        wordIndex = charIndex = 0
+        words = self.lines[lineIndex].zones[zoneIndex].words
+        if words:
+            wordIndex = min(ZoneIndex.firstItemEndingAfter(words, x), len(words) - 1)
+            chars = words[wordIndex].chars
+            if chars:
+                charIndex = min(ZoneIndex.firstItemEndingAfter(chars, x), len(chars) - 1)
+
+        self.setCurrent(lineIndex, zoneIndex, wordIndex, charIndex)
+        return True
+
     def goAbove(self, flatReviewType=LINE, wrap=WRAP_ALL):
         """Moves this context's locus of interest to first char
         of the type that's closest to and above the current locus of
@@ -1339,6 +1855,7 @@ class Context:
         Returns: [string, startOffset, endOffset, x, y, width, height]
         """
 
+        self.waitForZones()
         moved = False
         if flatReviewType == Context.CHAR:
             # We want to shoot for the closest character, which we've
@@ -1354,13 +1871,7 @@ class Context:
 
             moved = self.goPrevious(Context.LINE, wrap)
             if moved:
-                while True:
-                    [string, bx, by, bwidth, bheight] = \
-                             self.getCurrent(Context.CHAR)
-                    if (bx + width) >= middleTargetX:
-                        break
-                    elif not self.goNext(Context.CHAR, Context.WRAP_NONE):
-                        break
+                self._goToCharAtOrAfter(middleTargetX - width)
 
             # Moving around might have reset the current targetCharInfo,
             # so we reset it to our saved value.
@@ -1386,6 +1897,7 @@ class Context:
         Returns: [string, startOffset, endOffset, x, y, width, height]
         """
 
+        self.waitForZones()
         moved = False
         if flatReviewType == Context.CHAR:
             # We want to shoot for the closest character, which we've
@@ -1401,13 +1913,7 @@ class Context:
 
             moved = self.goNext(Context.LINE, wrap)
             if moved:
-                while True:
-                    [string, bx, by, bwidth, bheight] = \
-                             self.getCurrent(Context.CHAR)
-                    if (bx + width) >= middleTargetX:
-                        break
-                    elif not self.goNext(Context.CHAR, Context.WRAP_NONE):
-                        break
+                self._goToCharAtOrAfter(middleTargetX - width)
 
             # Moving around might have reset the current targetCharInfo,
             # so we reset it to our saved value.
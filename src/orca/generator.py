@@ -27,30 +27,20 @@ __copyright__ = "Copyright (c) 2009 Sun Microsystems Inc." \
                 "Copyright (c) 2015-2016 Igalia, S.L."
 __license__   = "LGPL"
 
-import collections
+import ast
+import builtins
 import pyatspi
-import sys
 import time
-import traceback
 from gi.repository import Atspi, Atk
 
 from . import braille
 from . import debug
 from . import messages
+from . import metrics
 from . import object_properties
 from . import settings
 from . import settings_manager
 
-def _formatExceptionInfo(maxTBlevel=5):
-    cla, exc, trbk = sys.exc_info()
-    excName = cla.__name__
-    try:
-        excArgs = exc.args
-    except KeyError:
-        excArgs = "<no args>"
-    excTb = traceback.format_tb(trbk, maxTBlevel)
-    return (excName, excArgs, excTb)
-
 # [[[WDW - general note -- for all the _generate* methods, it would be great if
 # we could return an empty array if we can determine the method does not
 # apply to the object.  This would allow us to reduce the number of strings
@@ -62,6 +52,100 @@ METHOD_PREFIX = "_generate"
 
 _settingsManager = settings_manager.getManager()
 
+# Formatting strings compiled into code objects, keyed by the string. The
+# same string is shared by every script, role, and formatType using it, so
+# each one only needs to be parsed once per Orca session.
+#
+_compiledFormats = {}
+
+def _compileFormatting(formatting):
+    """Returns the code object for the formatting string, compiling it on
+    first use."""
+
+    code = _compiledFormats.get(formatting)
+    if code is None:
+        code = compile(formatting, '<formatting>', 'eval')
+        _compiledFormats[formatting] = code
+    return code
+
+# The _generate* methods of each generator class, keyed by the class. Each
+# maps the generator function name, e.g. 'roleName', to the method as found
+# in the class dictionary, ready to be bound to a generator instance.
+#
+_methodTables = {}
+
+# The (generator class, mode, formatting string) combinations which have
+# been verified, so that scripts sharing a formatting string only verify
+# it once.
+#
+_verifiedFormats = set()
+
+def _getMethodTable(generatorClass):
+    """Returns the table of _generate* methods for generatorClass, building
+    it on first use."""
+
+    table = _methodTables.get(generatorClass)
+    if table is not None:
+        return table
+
+    table = {}
+    for attrName in dir(generatorClass):
+        if not attrName.startswith(METHOD_PREFIX):
+            continue
+        method = getattr(generatorClass, attrName)
+        if not callable(method):
+            continue
+        for klass in generatorClass.__mro__:
+            if attrName in vars(klass):
+                name = method.__name__[len(METHOD_PREFIX):]
+                name = name[0].lower() + name[1:]
+                table[name] = vars(klass)[attrName]
+                break
+
+    _methodTables[generatorClass] = table
+    return table
+
+def _namesIn(formatting):
+    """Returns the names looked up by the formatting string."""
+
+    tree = ast.parse(formatting, mode='eval')
+    return set(x.id for x in ast.walk(tree) if isinstance(x, ast.Name))
+
+class _FormattingNamespace(dict):
+    """The local namespace a compiled formatting string is evaluated in.
+    Looking up the name of a generator function, e.g. 'roleName', calls
+    the corresponding _generate* method and remembers its result. Any
+    other name is left for the globals and builtins to resolve."""
+
+    def __init__(self, generator, obj, args, globalsDict):
+        dict.__init__(self)
+        self._generator = generator
+        self._obj = obj
+        self._args = args
+        self._globals = globalsDict
+
+    def __missing__(self, name):
+        methods = self._generator._methodsDict
+        if name in self._globals or name not in methods:
+            raise KeyError(name)
+
+        currentTime = time.time()
+        try:
+            value = methods[name](self._obj, **self._args)
+        except KeyError as error:
+            # A KeyError escaping from here would be mistaken by eval for
+            # an undefined name and silently fall through to the globals.
+            raise RuntimeError("%s: %s" % (name, error)) from error
+
+        self[name] = value
+        duration = time.time() - currentTime
+        metrics.record(metrics.GENERATOR_TIME,
+                       "%s.%s" % (self._generator._mode, name), duration)
+        debug.printMessage(debug.LEVEL_ALL,
+                           "           GENERATION TIME: %.4f  ---->  %s=%r",
+                           duration, name, value)
+        return value
+
 class Generator:
     """Takes accessible objects and generates a presentation for those
     objects.  See the generate method, which is the primary entry
@@ -77,11 +161,8 @@ class Generator:
         self._script = script
         self._activeProgressBars = {}
         self._methodsDict = {}
-        for method in \
-            [z for z in [getattr(self, y).__get__(self, self.__class__) for y in [x for x in dir(self) if x.startswith(METHOD_PREFIX)]] if isinstance(z, collections.Callable)]:
-            name = method.__name__[len(METHOD_PREFIX):]
-            name = name[0].lower() + name[1:]
-            self._methodsDict[name] = method
+        for name, method in _getMethodTable(self.__class__).items():
+            self._methodsDict[name] = method.__get__(self, self.__class__)
         self._verifyFormatting()
 
     def _addGlobals(self, globalsDict):
@@ -97,12 +178,7 @@ class Generator:
         # for verification and does not effect the function of
         # Orca at all.
 
-        # Populate the entire globals with empty arrays
-        # for the results of all the legal method names.
-        #
         globalsDict = {}
-        for key in self._methodsDict.keys():
-            globalsDict[key] = []
         self._addGlobals(globalsDict)
 
         for roleKey in self._script.formatting[self._mode]:
@@ -117,21 +193,22 @@ class Generator:
                         # It's legal to have an empty string.
                         #
                         continue
-                    while True:
-                        try:
-                            eval(evalString, globalsDict)
-                            break
-                        except NameError:
-                            info = _formatExceptionInfo()
-                            arg = info[1][0]
-                            arg = arg.replace("name '", "")
-                            arg = arg.replace("' is not defined", "")
-                            if arg not in self._methodsDict:
-                                debug.printException(debug.LEVEL_SEVERE)
-                            globalsDict[arg] = []
-                        except:
-                            debug.printException(debug.LEVEL_SEVERE)
-                            break
+                    verified = (self.__class__, self._mode, evalString)
+                    if verified in _verifiedFormats:
+                        continue
+                    _verifiedFormats.add(verified)
+                    try:
+                        _compileFormatting(evalString)
+                    except:
+                        debug.printException(debug.LEVEL_SEVERE)
+                        continue
+                    for name in _namesIn(evalString):
+                        if name in self._methodsDict or name in globalsDict \
+                           or hasattr(builtins, name):
+                            continue
+                        msg = "ERROR: Unknown name '%s' in %s formatting " \
+                              "for %s" % (name, self._mode, roleKey)
+                        debug.println(debug.LEVEL_SEVERE, msg, True)
 
     def _overrideRole(self, newRole, args):
         """Convenience method to allow you to temporarily override the role in
@@ -195,8 +272,9 @@ class Generator:
         try:
             globalsDict['role'] = args.get('role', obj.getRole())
         except:
-            msg = 'ERROR: Cannot generate presentation for: %s. Aborting' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Cannot generate presentation for: %s. Aborting',
+                               obj, timestamp=True)
             return result
         try:
             # We sometimes want to override the role.  We'll keep the
@@ -204,12 +282,11 @@ class Generator:
             #
             args['role'] = globalsDict['role']
 
-            # We loop through the format string, catching each error
-            # as we go.  Each error should always be a NameError,
-            # where the name is the name of one of our generator
-            # functions.  When we encounter this, we call the function
-            # and get its results, placing them in the globals for the
-            # the call to eval.
+            # The format string is compiled once and then evaluated
+            # against a namespace which calls each of our generator
+            # functions the first time its name is looked up. Because
+            # of short-circuiting, only the generators whose results
+            # are actually needed get called, and each at most once.
             #
             args['mode'] = self._mode
             if not args.get('formatType', None):
@@ -233,39 +310,27 @@ class Generator:
             else:
                 firstTimeCalled = False
 
-            msg = '%s GENERATOR: Starting generation for %s' % (self._mode.upper(), obj)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               '%s GENERATOR: Starting generation for %s',
+                               self._mode.upper(), obj, timestamp=True)
 
             assert(formatting)
-            while True:
-                currentTime = time.time()
-                try:
-                    result = eval(formatting, globalsDict)
-                    break
-                except NameError:
-                    result = []
-                    info = _formatExceptionInfo()
-                    arg = info[1][0]
-                    arg = arg.replace("name '", "")
-                    arg = arg.replace("' is not defined", "")
-                    if arg not in self._methodsDict:
-                        debug.printException(debug.LEVEL_SEVERE)
-                        break
-                    globalsDict[arg] = self._methodsDict[arg](obj, **args)
-                    duration = "%.4f" % (time.time() - currentTime)
-                    debug.println(debug.LEVEL_ALL,
-                                  "           GENERATION TIME: %s  ---->  %s=%s" \
-                                  % (duration, arg, repr(globalsDict[arg])))
+            code = _compileFormatting(formatting)
+            namespace = _FormattingNamespace(self, obj, args, globalsDict)
+            result = eval(code, globalsDict, namespace)
 
         except:
             debug.printException(debug.LEVEL_SEVERE)
             result = []
 
-        duration = "%.4f" % (time.time() - startTime)
-        debug.println(debug.LEVEL_ALL, "           COMPLETION TIME: %s" % duration)
-        debug.println(debug.LEVEL_ALL, "%s GENERATOR: Results:" % self._mode.upper(), True)
-        for element in result:
-            debug.println(debug.LEVEL_ALL, "           %s" % element)
+        metrics.record(metrics.GENERATOR_TIME, "%s.total" % self._mode,
+                       time.time() - startTime)
+        if debug.isEnabled(debug.LEVEL_ALL):
+            duration = "%.4f" % (time.time() - startTime)
+            debug.println(debug.LEVEL_ALL, "           COMPLETION TIME: %s" % duration)
+            debug.println(debug.LEVEL_ALL, "%s GENERATOR: Results:" % self._mode.upper(), True)
+            for element in result:
+                debug.println(debug.LEVEL_ALL, "           %s" % element)
 
         if args.get('isProgressBarUpdate') and result:
             self.setProgressBarUpdateTimeAndValue(obj)
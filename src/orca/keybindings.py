@@ -28,7 +28,6 @@ __license__   = "LGPL"
 
 from gi.repository import Gdk
 
-import functools
 import pyatspi
 
 from . import debug
@@ -234,6 +233,15 @@ class KeyBinding:
         modifier state.
         """
 
+        if self.resolveKeycode() == keycode:
+            result = modifiers & self.modifier_mask
+            return result == self.modifiers
+        else:
+            return False
+
+    def resolveKeycode(self):
+        """Returns the keycode of this binding's keysym."""
+
         # We lazily bind the keycode.  The primary reason for doing this
         # is so that atspi does not have to be initialized before setting
         # keybindings in the user's preferences file.
@@ -241,11 +249,7 @@ class KeyBinding:
         if not self.keycode:
             self.keycode = getKeycode(self.keysymstring)
 
-        if self.keycode == keycode:
-            result = modifiers & self.modifier_mask
-            return result == self.modifiers
-        else:
-            return False
+        return self.keycode
 
     def description(self):
         """Returns the description of this binding's functionality."""
@@ -272,6 +276,50 @@ class KeyBindings:
     def __init__(self):
         self.keyBindings = []
 
+        # The bindings grouped by keycode, and by keysym, modifiers, and
+        # click count, in the order they were added; plus the binding found
+        # for each keystroke looked up. These are built as needed and
+        # discarded whenever bindings are added or removed.
+        #
+        self._keycodeIndex = None
+        self._keysIndex = None
+        self._unresolved = []
+        self._matches = {}
+
+    def _invalidate(self):
+        self._keycodeIndex = None
+        self._keysIndex = None
+        self._unresolved = []
+        self._matches = {}
+
+    def _getKeycodeIndex(self):
+        # Keycodes which could not be resolved, e.g. because the keymap was
+        # not yet available, are tried again until they are.
+        #
+        if self._unresolved:
+            if [kb for kb in self._unresolved if kb.resolveKeycode()]:
+                self._invalidate()
+
+        if self._keycodeIndex is None:
+            self._keycodeIndex = {}
+            for keyBinding in self.keyBindings:
+                keycode = keyBinding.resolveKeycode()
+                if not keycode and keyBinding.keysymstring:
+                    self._unresolved.append(keyBinding)
+                self._keycodeIndex.setdefault(keycode, []).append(keyBinding)
+
+        return self._keycodeIndex
+
+    def _getKeysIndex(self):
+        if self._keysIndex is None:
+            self._keysIndex = {}
+            for keyBinding in self.keyBindings:
+                key = keyBinding.keysymstring, keyBinding.modifiers, \
+                      keyBinding.click_count
+                self._keysIndex.setdefault(key, []).append(keyBinding)
+
+        return self._keysIndex
+
     def __str__(self):
         result = "[\n"
         for keyBinding in self.keyBindings:
@@ -289,6 +337,7 @@ class KeyBindings:
         """
 
         self.keyBindings.append(keyBinding)
+        self._invalidate()
 
     def remove(self, keyBinding):
         """Removes the given KeyBinding instance from this set of keybindings.
@@ -300,15 +349,15 @@ class KeyBindings:
             pass
         else:
             del self.keyBindings[i]
+            self._invalidate()
 
     def removeByHandler(self, handler):
         """Removes the given KeyBinding instance from this set of keybindings.
         """
-        i = len(self.keyBindings)
-        while i > 0:
-            if self.keyBindings[i - 1].handler == handler:
-                del self.keyBindings[i - 1]
-            i = i - 1
+        bindings = [kb for kb in self.keyBindings if not kb.handler == handler]
+        if len(bindings) != len(self.keyBindings):
+            self.keyBindings = bindings
+            self._invalidate()
 
     def hasKeyBinding (self, newKeyBinding, typeOfSearch="strict"):
         """Return True if keyBinding is already in self.keyBindings.
@@ -324,7 +373,13 @@ class KeyBindings:
 
         hasIt = False
 
-        for keyBinding in self.keyBindings:
+        keyBindings = self.keyBindings
+        if typeOfSearch in ["strict", "keys", "keysNoMask"]:
+            key = newKeyBinding.keysymstring, newKeyBinding.modifiers, \
+                  newKeyBinding.click_count
+            keyBindings = self._getKeysIndex().get(key, [])
+
+        for keyBinding in keyBindings:
             if typeOfSearch == "strict":
                 if (keyBinding.handler.description \
                     == newKeyBinding.handler.description) \
@@ -387,33 +442,54 @@ class KeyBindings:
         given keycode and modifiers, or None if no match exists.
         """
 
-        candidates = []
         clickCount = keyboardEvent.getClickCount()
-        for keyBinding in self.keyBindings:
-            if keyBinding.matches(keyboardEvent.hw_code,
-                                  keyboardEvent.modifiers):
-                if keyBinding.modifier_mask == keyboardEvent.modifiers and \
+        index = self._getKeycodeIndex()
+        isKeypad = keyboardEvent.modifiers & (1 << pyatspi.MODIFIER_NUMLOCK) \
+            and keyboardEvent.keyval_name.startswith("KP")
+        key = keyboardEvent.hw_code, keyboardEvent.modifiers, clickCount, \
+              bool(isKeypad)
+
+        try:
+            keyBinding = self._matches[key]
+        except KeyError:
+            keyBinding = self._findMatch(index.get(keyboardEvent.hw_code, []),
+                                         keyboardEvent.modifiers,
+                                         clickCount,
+                                         isKeypad)
+            self._matches[key] = keyBinding
+
+        if keyBinding:
+            return keyBinding.handler
+
+        return None
+
+    def _findMatch(self, keyBindings, modifiers, clickCount, isKeypad):
+        """Returns the KeyBinding from keyBindings, all of which have the
+        keycode of the keystroke, which best matches the keystroke."""
+
+        candidates = []
+        for keyBinding in keyBindings:
+            if modifiers & keyBinding.modifier_mask == keyBinding.modifiers:
+                if keyBinding.modifier_mask == modifiers and \
                    keyBinding.click_count == clickCount:
-                    return keyBinding.handler
+                    return keyBinding
                 # If there's no keysymstring, it's unbound and cannot be
                 # a match.
                 #
                 if keyBinding.keysymstring:
                     candidates.append(keyBinding)
 
-        if keyboardEvent.modifiers & (1 << pyatspi.MODIFIER_NUMLOCK) \
-            and keyboardEvent.keyval_name.startswith("KP"):
+        if isKeypad:
             return None
 
         # If we're still here, we don't have an exact match. Prefer
         # the one whose click count is closest to, but does not exceed,
         # the actual click count.
         #
-        comparison = lambda x, y: y.click_count - x.click_count
-        candidates.sort(key=functools.cmp_to_key(comparison))
+        candidates.sort(key=lambda x: x.click_count, reverse=True)
         for candidate in candidates:
             if candidate.click_count <= clickCount:
-                return candidate.handler
+                return candidate
 
         return None
 
@@ -1,4 +1,4 @@
-import bisect
+import collections
 import copy
 import pyatspi
 import time
@@ -28,45 +28,98 @@ MSG_KEEPALIVE_TIME = 45  # in seconds
 # LiveRegionManager.reviewLiveAnnouncement.
 CACHE_SIZE = 9  # corresponds to one of nine key bindings
 
+# The most messages held in the queue, and the most pieces of content held
+# in a message from merging those of the same region. When there are more,
+# the oldest ones of the lowest priority are discarded.
+QUEUE_SIZE = 50
+
 class PriorityQueue:
     """ This class represents a thread **UNSAFE** priority queue where priority
     is determined by the given integer priority.  The entries are also   
-    maintained in chronological order. 
+    maintained in chronological order, in a deque for each priority, so that
+    adding, removing, and purging entries does not depend on the number of
+    entries. A message for an object which already has a message of the same
+    priority pending is merged into that message.
 
     TODO: experiment with Queue.Queue to make thread safe
     """
-    def __init__(self):
-        self.queue = []
+    def __init__(self, maxsize=QUEUE_SIZE):
+        self.maxsize = maxsize
+        self.queues = {}
+        self.pending = {}
+        self.size = 0
+
+    @staticmethod
+    def _key(obj):
+        try:
+            return hash(obj)
+        except:
+            return id(obj)
+
+    def _merge(self, entry, data):
+        """ Adds the content of data which is not already in the message of
+        entry to it. """
+        content = entry[2]['content']
+        for item in data['content']:
+            if item not in content:
+                content.append(item)
+        del content[:-self.maxsize]
+
+    def _remove(self, entry):
+        self.size -= 1
+        key = self._key(entry[3])
+        if self.pending.get(key) is entry:
+            del self.pending[key]
 
     def enqueue(self, data, priority, obj):
         """ Add a new element to the queue according to 1) priority and
-        2) timestamp. """
-        bisect.insort_left(self.queue, (priority, time.time(), data, obj))
-       
+        2) timestamp, or merge it with the pending one for obj. """
+        entry = self.pending.get(self._key(obj))
+        if entry and entry[0] == priority:
+            self._merge(entry, data)
+            return
+
+        entry = [priority, time.time(), data, obj]
+        self.queues.setdefault(priority, collections.deque()).append(entry)
+        self.pending[self._key(obj)] = entry
+        self.size += 1
+
+        if self.size > self.maxsize:
+            lowest = min(x for x in self.queues if self.queues[x])
+            self._remove(self.queues[lowest].popleft())
+
     def dequeue(self):
         """get the highest priority element from the queue.  """
-        return self.queue.pop(0)
+        highest = max(x for x in self.queues if self.queues[x])
+        entry = self.queues[highest].popleft()
+        self._remove(entry)
+        return tuple(entry)
 
     def clear(self):
         """ Clear the queue """
-        self.queue = []
+        self.queues = {}
+        self.pending = {}
+        self.size = 0
 
     def purgeByKeepAlive(self):
         """ Purge items from the queue that are older than the keepalive 
         time """
-        currenttime = time.time()
-        myfilter = lambda item: item[1] + MSG_KEEPALIVE_TIME > currenttime
-        self.queue = list(filter(myfilter, self.queue))
+        oldest = time.time() - MSG_KEEPALIVE_TIME
+        for queue in self.queues.values():
+            while queue and queue[0][1] <= oldest:
+                self._remove(queue.popleft())
 
     def purgeByPriority(self, priority):
         """ Purge items from the queue that have a lower than or equal priority
         than the given argument """
-        myfilter = lambda item: item[0] > priority
-        self.queue = list(filter(myfilter, self.queue))
+        for level, queue in self.queues.items():
+            if level <= priority:
+                while queue:
+                    self._remove(queue.popleft())
 
     def __len__(self):
         """ Return the length of the queue """
-        return len(self.queue)
+        return self.size
 
 
 class LiveRegionManager:
@@ -74,6 +127,7 @@ class LiveRegionManager:
         self._script = script
         # message priority queue
         self.msg_queue = PriorityQueue()
+        self._pumpSourceId = 0
 
         self.inputEventHandlers = self._getInputEventHandlers()
         self.keyBindings = self._getKeyBindings()
@@ -86,7 +140,7 @@ class LiveRegionManager:
 
         # Message cache.  Used to store up to 9 previous messages so user can
         # review if desired.
-        self.msg_cache = []
+        self.msg_cache = collections.deque(maxlen=CACHE_SIZE)
 
         # User overrides for politeness settings.
         self._politenessOverrides = None
@@ -214,8 +268,8 @@ class LiveRegionManager:
 
         message = self._getMessage(event)
         if message:
-            if len(self.msg_queue) == 0:
-                GLib.timeout_add(100, self.pumpMessages)
+            if not self._pumpSourceId:
+                self._pumpSourceId = GLib.timeout_add(100, self.pumpMessages)
             self.msg_queue.enqueue(message, politeness, event.source)
 
     def pumpMessages(self):
@@ -224,9 +278,13 @@ class LiveRegionManager:
         were queued up in the handleEvent() method.
         """
 
-        if len(self.msg_queue) > 0:
-            self.msg_queue.purgeByKeepAlive()
+        self.msg_queue.purgeByKeepAlive()
+        while len(self.msg_queue) > 0:
             politeness, timestamp, message, obj = self.msg_queue.dequeue()
+            message = self._expandMessage(message, obj)
+            if not message:
+                continue
+
             # Form output message.  No need to repeat labels and content.
             # TODO: really needs to be tested in real life cases.  Perhaps
             # a verbosity setting?
@@ -241,13 +299,14 @@ class LiveRegionManager:
 
             # cache our message
             self._cacheMessage(utts)
-
-        # We still want to maintain our queue if we are not monitoring
-        if not self.monitoring:
-            self.msg_queue.purgeByKeepAlive()
+            break
 
         # See you again soon, stay in event loop if we still have messages.
-        return len(self.msg_queue) > 0
+        if len(self.msg_queue) > 0:
+            return True
+
+        self._pumpSourceId = 0
+        return False
 
     def getLiveNoneObjects(self):
         """Return the live objects that are registered and have a politeness
@@ -404,50 +463,84 @@ class LiveRegionManager:
         return 'container-live' in attrs
 
     def _getMessage(self, event):
-        """Gets the message associated with a given live event."""
+        """Gets the message associated with a given live event. The text of
+        objects is only obtained, by _expandMessage(), when the message is
+        about to be presented, so that no time is spent on messages which
+        are merged, purged, or discarded before then."""
         attrs = self._getAttrDictionary(event.source)
-        content = ""
-        labels = ""
-        
+        content = None
+
         # A message is divided into two parts: labels and content.  We
         # will first try to get the content.  If there is None, 
         # assume it is an invalid message and return None
         if event.type.startswith('object:children-changed:add'):
             if attrs.get('container-atomic') == 'true':
-                content = self._script.utilities.expandEOCs(event.source)
+                content = self._script.utilities.expandEOCs, event.source
             else:
-                content = self._script.utilities.expandEOCs(event.any_data)
+                content = self._script.utilities.expandEOCs, event.any_data
 
         elif event.type.startswith('object:text-changed:insert'):
             if attrs.get('container-atomic') != 'true':
                 content = event.any_data
             else:
-                text = self._script.utilities.queryNonEmptyText(event.source)
-                if text:
-                    content = text.getText(0, -1)
+                content = self._getText, event.source
 
         if not content:
             return None
 
-        content = content.strip()
-        if len(content) == 1:
-            content = chnames.getCharacterName(content)
+        message = {'content':[content], 'labels':[]}
+
+        # instantly send out notify messages
+        if attrs.get('channel') == 'notify':
+            message = self._expandMessage(message, event.source)
+            if message:
+                utts = message['labels'] + message['content']
+                self._script.presentationInterrupt()
+                self._script.presentMessage(utts)
+            return None
+
+        return message
+
+    def _getText(self, obj):
+        text = self._script.utilities.queryNonEmptyText(obj)
+        if text:
+            return text.getText(0, -1)
+        return ""
+
+    def _expandMessage(self, message, obj):
+        """Returns the message, from _getMessage(), for the live region obj
+        with the text of its objects obtained, or None if it has no content."""
+        contents = []
+        for item in message['content']:
+            if isinstance(item, tuple):
+                function, source = item
+                try:
+                    item = function(source)
+                except:
+                    continue
+
+            content = item.strip()
+            if len(content) == 1:
+                content = chnames.getCharacterName(content)
+            if content:
+                contents.append(content)
+
+        if not contents:
+            return None
 
         # Proper live regions typically come with proper aria labels. These
         # labels are typically exposed as names. Failing that, descriptions.
         # Looking for actual labels seems a non-performant waste of time.
-        name = (event.source.name or event.source.description).strip()
-        if name and name != content:
-            labels = name
+        try:
+            name = (obj.name or obj.description).strip()
+        except:
+            name = ""
 
-        # instantly send out notify messages
-        if attrs.get('channel') == 'notify':
-            utts = labels + content
-            self._script.presentationInterrupt()
-            self._script.presentMessage(utts)
-            return None
+        labels = []
+        if name and name != " ".join(contents):
+            labels = [name]
 
-        return {'content':[content], 'labels':[labels]}
+        return {'content':contents, 'labels':labels}
 
     def flushMessages(self):
         self.msg_queue.clear()
@@ -455,8 +548,6 @@ class LiveRegionManager:
     def _cacheMessage(self, utts):
         """Cache a message in our cache list of length CACHE_SIZE"""
         self.msg_cache.append(utts)
-        if len(self.msg_cache) > CACHE_SIZE:
-            self.msg_cache.pop(0)
 
     def _getLiveType(self, obj):
         """Returns the live politeness setting for a given object. Also,
@@ -2297,19 +2297,26 @@ def adjustForSpeech(string):
     if _RE_COMBINING is None:
         __compileRE_COMBINING()
 
+    def _adjustPair(match):
+        pair = match.group(0)
+        name = _combining.get(pair[1])
+        if name:
+            return " %s " % (name % pair[0])
+        return pair
+
+    includeStyle = speakStyle == SPEAK_ALWAYS
+
+    def _adjustChar(match):
+        char = match.group(0)
+        name = _getSpokenName(char, includeStyle)
+        if name:
+            return " %s " % name
+        return char
+
     if _RE_COMBINING is not None:
-        combiningPairs = set(re.findall(_RE_COMBINING, string))
-        for pair in combiningPairs:
-            name = _combining.get(pair[1])
-            if name:
-                string = re.sub(pair, " %s " % (name % pair[0]), string)
+        string = _RE_COMBINING.sub(_adjustPair, string)
 
     if _RE is not None:
-        chars = set(re.findall(_RE, string))
-        includeStyle = speakStyle == SPEAK_ALWAYS
-        for char in chars:
-            name = _getSpokenName(char, includeStyle)
-            if name:
-                string = re.sub(char, " %s " % name, string)
+        string = _RE.sub(_adjustChar, string)
 
     return string
@@ -1884,6 +1884,16 @@ PARAGRAPH_UNSELECTED_DOWN = _("paragraph unselected down from cursor position")
 # pressing Ctrl+Shift+UP.
 PARAGRAPH_UNSELECTED_UP = _("paragraph unselected up from cursor position")
 
+# Translators: this is a debug message that Orca users will not normally see.
+# It is presented when Orca failed to save the performance measurements it has
+# collected (e.g. how long it takes to process events) to a file.
+PERFORMANCE_METRICS_NOT_SAVED = _("Could not save performance metrics.")
+
+# Translators: this is a debug message that Orca users will not normally see.
+# It is presented when Orca has saved the performance measurements it has
+# collected (e.g. how long it takes to process events) to a file.
+PERFORMANCE_METRICS_SAVED = _("Performance metrics saved.")
+
 # Translators: This message appears in a warning dialog when the user performs
 # the command to get into Orca's preferences dialog when the preferences dialog
 # is already open.
@@ -2334,6 +2344,12 @@ def leavingNLists(count):
     # series of nested lists and then navigates out of several levels at once.
     return ngettext("Leaving %d list.", "Leaving %d lists.", count) % count
 
+def linesOfOutput(count):
+    # Translators: Orca collects the output of a command run in a terminal and,
+    # when there is a lot of it, presents only the last few lines. This message
+    # presents the number of lines of output, and is followed by those last lines.
+    return ngettext("%d line of output", "%d lines of output", count) % count
+
 def listItemCount(count):
     # Translators: This message describes a bulleted or numbered list.
     return ngettext("List with %d item", "List with %d items", count) % count
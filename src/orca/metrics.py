@@ -0,0 +1,158 @@
+# Orca
+#
+# Copyright 2026 Orca Team.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., Franklin Street, Fifth Floor,
+# Boston MA  02110-1301 USA.
+
+"""Records performance metrics, such as how long events wait in the queue
+and how long scripts and generators take to handle them, in histograms
+which can be examined at run time or dumped as JSON."""
+
+__id__        = "$Id$"
+__version__   = "$Revision$"
+__date__      = "$Date$"
+__copyright__ = "Copyright (c) 2026 Orca Team."
+__license__   = "LGPL"
+
+import bisect
+import json
+import threading
+import time
+
+from . import settings
+
+# The categories of metrics. Within each category, values are recorded
+# per key, e.g. the event type or the generator method name.
+#
+QUEUE_DEPTH = "queue-depth"
+QUEUE_WAIT = "queue-wait"
+EVENT_TIME = "event-time"
+SCRIPT_TIME = "script-time"
+GENERATOR_TIME = "generator-time"
+SCRIPT_CREATION_TIME = "script-creation-time"
+
+# The upper bounds of the histogram buckets. Values larger than the last
+# bound are counted in an additional overflow bucket.
+#
+TIME_BOUNDS = [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+COUNT_BOUNDS = [0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+
+_bounds = {QUEUE_DEPTH: COUNT_BOUNDS}
+
+class Histogram:
+    """The distribution of the values recorded for one metric."""
+
+    def __init__(self, bounds=TIME_BOUNDS):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, fraction):
+        """Returns the upper bound of the bucket containing the given
+        fraction (e.g. 0.95) of the values, or None if that's the overflow
+        bucket or there are no values."""
+
+        target = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                if i < len(self.bounds):
+                    return self.bounds[i]
+                return None
+        return None
+
+    def toDict(self):
+        labels = ["<=%s" % x for x in self.bounds] + [">%s" % self.bounds[-1]]
+        return {"count": self.count,
+                "total": self.total,
+                "mean": self.count and self.total / self.count,
+                "min": self.min,
+                "max": self.max,
+                "p50": self.percentile(0.5),
+                "p95": self.percentile(0.95),
+                "buckets": dict(zip(labels, self.buckets))}
+
+_lock = threading.Lock()
+_histograms = {}
+_startTime = time.time()
+
+def record(category, key, value):
+    """Adds value to the histogram for key in category.
+
+    Arguments:
+    - category: one of the categories defined above, e.g. QUEUE_WAIT
+    - key: what the value is for, e.g. an event type
+    - value: the value, in seconds for the time-based categories
+    """
+
+    if not settings.enablePerformanceMetrics:
+        return
+
+    with _lock:
+        histogram = _histograms.get((category, key))
+        if histogram is None:
+            histogram = Histogram(_bounds.get(category, TIME_BOUNDS))
+            _histograms[(category, key)] = histogram
+        histogram.add(value)
+
+def getHistogram(category, key):
+    """Returns the Histogram for key in category, or None."""
+
+    return _histograms.get((category, key))
+
+def getMetrics():
+    """Returns a dictionary of all the metrics recorded since Orca started
+    or reset() was last called, in the form {category: {key: histogram}},
+    where each histogram is a dictionary."""
+
+    with _lock:
+        result = {"duration": time.time() - _startTime}
+        for (category, key), histogram in sorted(_histograms.items()):
+            result.setdefault(category, {})[key] = histogram.toDict()
+    return result
+
+def toJSON():
+    """Returns the metrics from getMetrics() as a JSON string."""
+
+    return json.dumps(getMetrics(), indent=2)
+
+def dump(filename):
+    """Writes the metrics from getMetrics() as JSON to filename."""
+
+    with open(filename, "w") as f:
+        f.write(toJSON())
+
+def reset():
+    """Discards all the metrics recorded so far."""
+
+    global _startTime
+
+    with _lock:
+        _histograms.clear()
+        _startTime = time.time()
@@ -318,6 +318,8 @@ class MouseReviewer:
         if not script:
             return
 
+        self._update_flat_review(script, window, pX, pY)
+
         obj = script.utilities.descendantAtPoint(window, pX, pY)
         msg = "MOUSE REVIEW: Object at (%i, %i) is %s" % (pX, pY, obj)
         debug.println(debug.LEVEL_INFO, msg, True)
@@ -327,6 +329,19 @@ class MouseReviewer:
         new.present(self._currentMouseOver)
         self._currentMouseOver = new
 
+    def _update_flat_review(self, script, window, pX, pY):
+        """Moves the flat review locus of script to the point under the
+        pointer, if flat review is in use in window, so that reviewing
+        continues from there."""
+
+        context = getattr(script, "flatReviewContext", None)
+        if not context or context.isCollecting() or context.topLevel != window:
+            return
+
+        if context.setCurrentToPoint(pX, pY):
+            msg = "MOUSE REVIEW: Moved flat review to (%i, %i)" % (pX, pY)
+            debug.println(debug.LEVEL_INFO, msg, True)
+
     def _listener(self, event):
         """Generic listener, mainly to output debugging info."""
 
@@ -64,6 +64,7 @@ try:
 except:
     pass
 
+from . import atspi_profiler
 from . import braille
 from . import debug
 from . import event_manager
@@ -313,6 +314,77 @@ def _restoreXmodmap(keyList=[]):
         stdin=subprocess.PIPE, stdout=None, stderr=None)
     p.communicate(_originalXmodmap)
 
+# The settings which, when changed, require the speech, braille, and sound
+# output or the scripts to be reinitialized. Changes to any other settings
+# take effect without restarting anything.
+#
+_speechSettings = ['enableSpeech', 'speechServerFactory', 'speechServerInfo']
+_brailleSettings = ['enableBraille', 'tty']
+_soundSettings = ['enableSound']
+_scriptSettings = ['keybindings', 'keyboardLayout', 'orcaModifierKeys']
+
+def _updateOrcaModifiers():
+    global _orcaModifiers
+    custom = [k for k in settings.orcaModifierKeys if k not in _orcaModifiers]
+    _orcaModifiers += custom
+    # Handle the case where a change was made in the Orca Preferences dialog.
+    #
+    if _originalXmodmap:
+        _restoreXmodmap(_orcaModifiers)
+
+    _storeXmodmap(_orcaModifiers)
+    _createOrcaXmodmap()
+
+def _applySettingsChanges(changed):
+    """Applies the changed settings, reinitializing only the output and the
+    scripts which depend upon them rather than everything.
+
+    Arguments:
+    - changed: the names of the changed settings, as returned by the
+      settings manager's getChangedSettings()
+    """
+
+    msg = 'ORCA: Changed settings: %s' % sorted(changed)
+    debug.println(debug.LEVEL_INFO, msg, True)
+
+    if changed.intersection(_speechSettings):
+        speech.shutdown()
+        if _settingsManager.getSetting('enableSpeech'):
+            try:
+                speech.init()
+            except:
+                debug.printException(debug.LEVEL_SEVERE)
+    else:
+        # Voice changes are sent to the speech server with the next
+        # utterance; these are only sent when the server is initialized.
+        if 'verbalizePunctuationStyle' in changed:
+            speech.updatePunctuationLevel()
+        if 'capitalizationStyle' in changed:
+            speech.updateCapitalizationStyle()
+
+    if changed.intersection(_brailleSettings):
+        braille.shutdown()
+        if _settingsManager.getSetting('enableBraille'):
+            try:
+                braille.init(_processBrailleEvent, settings.tty)
+            except:
+                debug.printException(debug.LEVEL_WARNING)
+                msg = 'ORCA: Could not initialize connection to braille.'
+                debug.println(debug.LEVEL_WARNING, msg, True)
+
+    if changed.intersection(_soundSettings):
+        player = sound.getPlayer()
+        player.shutdown()
+        if _settingsManager.getSetting('enableSound'):
+            player.init()
+
+    if changed.intersection(_scriptSettings):
+        _scriptManager.deactivate()
+        if 'orcaModifierKeys' in changed:
+            _updateOrcaModifiers()
+        _scriptManager.activate()
+        _eventManager.activate()
+
 def loadUserSettings(script=None, inputEvent=None, skipReloadMessage=False):
     """Loads (and reloads) the user settings module, reinitializing
     things such as speech if necessary.
@@ -324,45 +396,58 @@ def loadUserSettings(script=None, inputEvent=None, skipReloadMessage=False):
 
     global _userSettings
 
-    # Shutdown the output drivers and give them a chance to die.
-
-    player = sound.getPlayer()
-    player.shutdown()
-    speech.shutdown()
-    braille.shutdown()
-
-    _scriptManager.deactivate()
-
-    reloaded = False
+    # When reloading, apply just the settings which have changed rather
+    # than shutting down and reinitializing everything.
+    #
     if _userSettings:
         _profile = _settingsManager.getSetting('activeProfile')[1]
         try:
             _userSettings = _settingsManager.getGeneralSettings(_profile)
             _settingsManager.setProfile(_profile)
-            reloaded = True
-        except ImportError:
-            debug.printException(debug.LEVEL_INFO)
-        except:
-            debug.printException(debug.LEVEL_SEVERE)
-    else:
-        _profile = _settingsManager.profile
-        try:
-            _userSettings = _settingsManager.getGeneralSettings(_profile)
         except ImportError:
             debug.printException(debug.LEVEL_INFO)
         except:
             debug.printException(debug.LEVEL_SEVERE)
+        else:
+            if not script:
+                script = _scriptManager.getDefaultScript()
+
+            _settingsManager.loadAppSettings(script)
+            _applySettingsChanges(_settingsManager.getChangedSettings())
+
+            if _settingsManager.getSetting('enableSpeech') \
+               and not skipReloadMessage:
+                script.speakMessage(messages.SETTINGS_RELOADED)
+
+            debug.println(debug.LEVEL_INFO, 'ORCA: User Settings Loaded', True)
+            return True
+
+    # Shutdown the output drivers and give them a chance to die.
+
+    player = sound.getPlayer()
+    player.shutdown()
+    speech.shutdown()
+    braille.shutdown()
+
+    _scriptManager.deactivate()
+
+    _profile = _settingsManager.profile
+    try:
+        _userSettings = _settingsManager.getGeneralSettings(_profile)
+    except ImportError:
+        debug.printException(debug.LEVEL_INFO)
+    except:
+        debug.printException(debug.LEVEL_SEVERE)
 
     if not script:
         script = _scriptManager.getDefaultScript()
 
     _settingsManager.loadAppSettings(script)
+    _settingsManager.getChangedSettings()
 
     if _settingsManager.getSetting('enableSpeech'):
         try:
             speech.init()
-            if reloaded and not skipReloadMessage:
-                script.speakMessage(messages.SETTINGS_RELOADED)
         except:
             debug.printException(debug.LEVEL_SEVERE)
     else:
@@ -380,16 +465,7 @@ def loadUserSettings(script=None, inputEvent=None, skipReloadMessage=False):
     if _settingsManager.getSetting('enableSound'):
         player.init()
 
-    global _orcaModifiers
-    custom = [k for k in settings.orcaModifierKeys if k not in _orcaModifiers]
-    _orcaModifiers += custom
-    # Handle the case where a change was made in the Orca Preferences dialog.
-    #
-    if _originalXmodmap:
-        _restoreXmodmap(_orcaModifiers)
-
-    _storeXmodmap(_orcaModifiers)
-    _createOrcaXmodmap()
+    _updateOrcaModifiers()
 
     _scriptManager.activate()
     _eventManager.activate()
@@ -516,6 +592,9 @@ def init(registry):
     if settings.timeoutCallback and (settings.timeoutTime > 0):
         signal.alarm(0)
 
+    if settings.enableAtspiProfiling:
+        atspi_profiler.install()
+
     _initialized = True
     # In theory, we can do this through dbus. In practice, it fails to
     # work sometimes. Until we know why, we need to leave this as-is
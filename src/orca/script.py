@@ -62,10 +62,37 @@ _eventManager = event_manager.getManager()
 _scriptManager = script_manager.getManager()
 _settingsManager = settings_manager.getManager()
 
+class _LazyComponent:
+    """A script component, such as a generator, which is created by calling
+    the script's getter for it the first time it is used rather than when
+    the script is created. Scripts for applications which never present
+    anything thus never pay for creating it."""
+
+    def __init__(self, name, getterName):
+        self.name = name
+        self.getterName = getterName
+
+    def __get__(self, script, scriptClass=None):
+        if script is None:
+            return self
+
+        value = getattr(script, self.getterName)()
+        setattr(script, self.name, value)
+        msg = 'SCRIPT: Created %s for %s' % (self.name, script.name)
+        debug.println(debug.LEVEL_INFO, msg, True)
+        return value
+
 class Script:
     """The specific focus tracking scripts for applications.
     """
 
+    labelInference = _LazyComponent('labelInference', 'getLabelInference')
+    formatting = _LazyComponent('formatting', 'getFormatting')
+    brailleGenerator = _LazyComponent('brailleGenerator', 'getBrailleGenerator')
+    soundGenerator = _LazyComponent('soundGenerator', 'getSoundGenerator')
+    speechGenerator = _LazyComponent('speechGenerator', 'getSpeechGenerator')
+    tutorialGenerator = _LazyComponent('tutorialGenerator', 'getTutorialGenerator')
+
     def __init__(self, app):
         """Creates a script for the given application, if necessary.
         This method should not be called by anyone except the
@@ -95,7 +122,6 @@ class Script:
         self.presentIfInactive = True
 
         self.utilities = self.getUtilities()
-        self.labelInference = self.getLabelInference()
         self.structuralNavigation = self.getStructuralNavigation()
         self.caretNavigation = self.getCaretNavigation()
         self.bookmarks = self.getBookmarks()
@@ -108,14 +134,11 @@ class Script:
         self.keyBindings = self.getKeyBindings()
         self.brailleBindings = self.getBrailleBindings()
 
-        self.formatting = self.getFormatting()
-        self.brailleGenerator = self.getBrailleGenerator()
-        self.soundGenerator = self.getSoundGenerator()
-        self.speechGenerator = self.getSpeechGenerator()
+        # The label inference, formatting, and generators are created when
+        # first used. See _LazyComponent.
         self.generatorCache = {}
         self.eventCache = {}
         self.spellcheck = self.getSpellCheck()
-        self.tutorialGenerator = self.getTutorialGenerator()
 
         self.findCommandRun = False
         self._lastCommandWasStructNav = False
@@ -24,11 +24,16 @@ __date__      = "$Date$"
 __copyright__ = "Copyright (c) 2011. Orca Team."
 __license__   = "LGPL"
 
+import collections
 import importlib
 import pyatspi
+import time
+import tracemalloc
 
 from . import debug
+from . import metrics
 from . import orca_state
+from . import settings
 from .scripts import apps, toolkits
 
 class ScriptManager:
@@ -38,6 +43,17 @@ class ScriptManager:
         self.appScripts = {}
         self.toolkitScripts = {}
         self.customScripts = {}
+
+        # The apps with scripts, least recently used first, so that the
+        # scripts of inactive apps can be discarded. The transferable
+        # attributes of discarded app scripts are restored when they are
+        # created again.
+        self._recentApps = collections.OrderedDict()
+        self._savedAttributes = {}
+        self._created = 0
+        self._evicted = 0
+        self._creationStatistics = {}
+
         self._appModules = apps.__all__
         self._toolkitModules = toolkits.__all__
         self._defaultScript = None
@@ -82,6 +98,8 @@ class ScriptManager:
         self.appScripts = {}
         self.toolkitScripts = {}
         self.customScripts = {}
+        self._recentApps.clear()
+        self._savedAttributes = {}
         self._active = False
         debug.println(debug.LEVEL_INFO, 'SCRIPT MANAGER: Deactivated', True)
 
@@ -163,9 +181,9 @@ class ScriptManager:
             debug.println(debug.LEVEL_INFO, 'SCRIPT MANAGER: Found %s' % moduleName, True)
             try:
                 if hasattr(module, 'getScript'):
-                    script = module.getScript(app)
+                    script = self._instantiate(module.getScript, app)
                 else:
-                    script = module.Script(app)
+                    script = self._instantiate(module.Script, app)
                 break
             except:
                 debug.printException(debug.LEVEL_INFO)
@@ -208,13 +226,92 @@ class ScriptManager:
             return self._defaultScript
 
         from .scripts import default
-        script = default.Script(app)
+        script = self._instantiate(default.Script, app)
 
         if not app:
             self._defaultScript = script
 
         return script
 
+    def _instantiate(self, factory, app):
+        """Calls factory to create a script for app, recording how long
+        that took and, if tracemalloc is tracing, how much memory the new
+        script allocated."""
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            startMemory = tracemalloc.get_traced_memory()[0]
+        startTime = time.time()
+
+        script = factory(app)
+
+        elapsed = time.time() - startTime
+        memory = 0
+        if tracing:
+            memory = tracemalloc.get_traced_memory()[0] - startMemory
+
+        name = script.__class__.__module__
+        stats = self._creationStatistics.setdefault(name, [0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += memory
+        self._created += 1
+        metrics.record(metrics.SCRIPT_CREATION_TIME, name, elapsed)
+
+        msg = 'SCRIPT MANAGER: Created %s in %.4fs' % (script.name, elapsed)
+        debug.println(debug.LEVEL_INFO, msg, True)
+        return script
+
+    def getStatistics(self):
+        """Returns a dictionary describing the scripts which currently exist
+        and the cost of creating scripts: for each script module, the number
+        of scripts created, the time spent creating them in seconds, and
+        the memory they allocated in bytes (which is only measured when
+        tracemalloc is tracing)."""
+
+        toolkitScripts = sum(map(len, self.toolkitScripts.values()))
+        customScripts = sum(map(len, self.customScripts.values()))
+        modules = {}
+        for name, (count, elapsed, memory) in self._creationStatistics.items():
+            modules[name] = {"created": count, "time": elapsed, "memory": memory}
+
+        return {"appScripts": len(self.appScripts),
+                "toolkitScripts": toolkitScripts,
+                "customScripts": customScripts,
+                "created": self._created,
+                "evicted": self._evicted,
+                "modules": modules}
+
+    def _touch(self, app):
+        """Marks app as the most recently used app."""
+
+        if app in self._recentApps:
+            self._recentApps.move_to_end(app)
+        else:
+            self._recentApps[app] = True
+
+    def _evictScripts(self):
+        """Discards the scripts of the least recently used apps, other than
+        the app of the active script, so that no more than the number given
+        by settings.maxInactiveScripts remain. Called when the active script
+        changes."""
+
+        activeScript = orca_state.activeScript
+        activeApp = activeScript and activeScript.app
+        inactiveApps = [a for a in self._recentApps if a != activeApp]
+        excess = len(inactiveApps) - settings.maxInactiveScripts
+        for app in inactiveApps[:max(0, excess)]:
+            del self._recentApps[app]
+            appScript = self.appScripts.pop(app, None)
+            if appScript:
+                self._savedAttributes[app] = appScript.getTransferableAttributes()
+            self.toolkitScripts.pop(app, None)
+            self.customScripts.pop(app, None)
+            self._evicted += 1
+
+            msg = 'SCRIPT MANAGER: Discarded inactive script %s' % appScript
+            debug.println(debug.LEVEL_INFO, msg, True)
+
     def sanityCheckScript(self, script):
         if not self._active:
             return script
@@ -254,6 +351,9 @@ class ScriptManager:
         appScript = None
         toolkitScript = None
 
+        if app:
+            self._touch(app)
+
         roleName = self._scriptForRole(obj)
         if roleName:
             customScripts = self.customScripts.get(app, {})
@@ -280,6 +380,9 @@ class ScriptManager:
             else:
                 appScript = self._createScript(app, None)
                 self.appScripts[app] = appScript
+                attrs = self._savedAttributes.pop(app, {})
+                for attr, value in attrs.items():
+                    setattr(appScript, attr, value)
         except:
             msg = 'WARNING: Exception getting app script.'
             debug.printException(debug.LEVEL_ALL)
@@ -329,6 +432,10 @@ class ScriptManager:
               (newScript.name, reason)
         debug.println(debug.LEVEL_INFO, msg, True)
 
+        # Scripts are also looked up for the events of inactive apps, so
+        # they are only discarded here, rather than whenever one is created.
+        self._evictScripts()
+
     def _getScriptForAppReplicant(self, app):
         if not self._active:
             return None
@@ -358,6 +465,8 @@ class ScriptManager:
         appList = list(self.appScripts.keys())
         try:
             appList = [a for a in appList if a is not None and a not in self._desktop]
+            for app in [a for a in self._savedAttributes if a not in self._desktop]:
+                del self._savedAttributes[app]
         except:
             debug.printException(debug.LEVEL_FINEST)
             return
@@ -367,6 +476,7 @@ class ScriptManager:
             debug.println(debug.LEVEL_INFO, msg, True)
 
             appScript = self.appScripts.pop(app)
+            self._recentApps.pop(app, None)
             newScript = self._getScriptForAppReplicant(app)
             if newScript:
                 msg = "SCRIPT MANAGER: Script for app replicant found: %s" % newScript
@@ -40,6 +40,7 @@ from gi.repository import Gtk
 
 from . import chnames
 from . import colornames
+from . import accessible_cache
 from . import debug
 from . import keynames
 from . import keybindings
@@ -78,6 +79,9 @@ class Utilities:
     WORDS_RE = re.compile(r"(\W+)", flags)
     SUPERSCRIPTS_RE = re.compile("[%s]+" % "".join(SUPERSCRIPT_DIGITS), flags)
     SUBSCRIPTS_RE = re.compile("[%s]+" % "".join(SUBSCRIPT_DIGITS), flags)
+    SCRIPTED_DIGITS_RE = re.compile("[%s]+|[%s]+" % ("".join(SUPERSCRIPT_DIGITS),
+                                                     "".join(SUBSCRIPT_DIGITS)),
+                                    flags)
 
     # generatorCache
     #
@@ -106,10 +110,10 @@ class Utilities:
 
     def _isActiveAndShowingAndNotIconified(self, obj):
         try:
-            state = obj.getState()
+            state = accessible_cache.getState(obj)
         except:
-            msg = "ERROR: Exception getting state of %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting state of %s", obj, timestamp=True)
             return False
 
         if not state.contains(pyatspi.STATE_ACTIVE):
@@ -125,13 +129,15 @@ class Utilities:
             return False
 
         window.clearCache()
+        accessible_cache.invalidate(window)
         if not self._isActiveAndShowingAndNotIconified(window):
-            msg = "INFO: %s is not active and showing, or is iconified" % window
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "INFO: %s is not active and showing, or is iconified", window,
+                               timestamp=True)
             return False
 
-        msg = "INFO: %s can be active window" % window
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "INFO: %s can be active window", window, timestamp=True)
         return True
 
     def activeWindow(self, *apps):
@@ -143,17 +149,18 @@ class Utilities:
             try:
                 candidates.extend([child for child in app if self.canBeActiveWindow(child)])
             except:
-                msg = "ERROR: Exception examining children of %s" % app
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "ERROR: Exception examining children of %s", app, timestamp=True)
 
         if not candidates:
-            msg = "ERROR: Unable to find active window from %s" % list(map(str, apps))
-            debug.println(debug.LEVEL_INFO, msg, True)
+            if debug.isEnabled(debug.LEVEL_INFO):
+                msg = "ERROR: Unable to find active window from %s" % list(map(str, apps))
+                debug.println(debug.LEVEL_INFO, msg, True)
             return None
 
         if len(candidates) == 1:
-            msg = "INFO: Active window is %s" % candidates[0]
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "INFO: Active window is %s", candidates[0], timestamp=True)
             return candidates[0]
 
         # Sorting by size in a lame attempt to filter out the "desktop" frame of various
@@ -162,11 +169,12 @@ class Utilities:
         # Asking AT-SPI2 for the size seems to give us 1024x768 regardless of reality....
         # This is why we can't have nice things.
         candidates = sorted(candidates, key=functools.cmp_to_key(self.sizeComparison))
-        msg = "WARNING: These windows all claim to be active: %s" % list(map(str, candidates))
-        debug.println(debug.LEVEL_INFO, msg, True)
+        if debug.isEnabled(debug.LEVEL_INFO):
+            msg = "WARNING: These windows all claim to be active: %s" % list(map(str, candidates))
+            debug.println(debug.LEVEL_INFO, msg, True)
 
-        msg = "INFO: Active window is (hopefully) %s" % candidates[0]
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "INFO: Active window is (hopefully) %s", candidates[0], timestamp=True)
         return candidates[0]
 
     @staticmethod
@@ -195,7 +203,7 @@ class Utilities:
         obj = obj.parent
         while obj and (obj != obj.parent):
             try:
-                role = obj.getRole()
+                role = accessible_cache.getRole(obj)
             except:
                 break
             if role in ancestorRoles:
@@ -226,7 +234,7 @@ class Utilities:
         if index:
             return int(index)
 
-        return obj.getIndexInParent()
+        return accessible_cache.getIndexInParent(obj)
 
     def childNodes(self, obj):
         """Gets all of the children that have RELATION_NODE_CHILD_OF pointing
@@ -243,7 +251,7 @@ class Utilities:
         except:
             return []
         else:
-            if not obj.getState().contains(pyatspi.STATE_EXPANDED):
+            if not accessible_cache.getState(obj).contains(pyatspi.STATE_EXPANDED):
                 return []
 
         nodes = []
@@ -259,7 +267,7 @@ class Utilities:
                         pyatspi.RELATION_NODE_PARENT_OF:
                     for target in range(relation.getNTargets()):
                         node = relation.getTarget(target)
-                        if node and node.getIndexInParent() != -1:
+                        if node and accessible_cache.getIndexInParent(node) != -1:
                             nodes.append(node)
                     return nodes
         except:
@@ -305,8 +313,8 @@ class Utilities:
         - b: Accessible
         """
 
-        msg = 'INFO: Looking for common ancestor of %s and %s' % (a, b)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           'INFO: Looking for common ancestor of %s and %s', a, b, timestamp=True)
 
         # Don't do any Zombie checks here, as tempting and logical as it
         # may seem as it can lead to chattiness.
@@ -347,8 +355,9 @@ class Utilities:
             else:
                 break
 
-        msg = 'INFO: Common ancestor of %s and %s is %s' % (a, b, commonAncestor)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           'INFO: Common ancestor of %s and %s is %s', a, b, commonAncestor,
+                           timestamp=True)
         return commonAncestor
 
     def defaultButton(self, obj):
@@ -365,8 +374,8 @@ class Utilities:
                      pyatspi.ROLE_TREE_TABLE,
                      pyatspi.ROLE_TABLE]
 
-        if obj.getState().contains(pyatspi.STATE_MANAGES_DESCENDANTS) \
-           or obj.getRole() in skipRoles:
+        if accessible_cache.getState(obj).contains(pyatspi.STATE_MANAGES_DESCENDANTS) \
+           or accessible_cache.getRole(obj) in skipRoles:
             return
 
         defaultButton = None
@@ -427,11 +436,11 @@ class Utilities:
             displayedText = None
 
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
             name = obj.name
         except:
-            msg = 'ERROR: Exception getting role and name of %s' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Exception getting role and name of %s', obj, timestamp=True)
             role = None
             name = ''
 
@@ -462,7 +471,7 @@ class Utilities:
         #
         if not displayedText and role == pyatspi.ROLE_PUSH_BUTTON:
             for child in obj:
-                if child.getRole() == pyatspi.ROLE_LABEL:
+                if accessible_cache.getRole(child) == pyatspi.ROLE_LABEL:
                     childText = self.displayedText(child)
                     if childText and len(childText):
                         displayedText = \
@@ -489,7 +498,7 @@ class Utilities:
         stopRoles = [pyatspi.ROLE_FRAME, pyatspi.ROLE_SCROLL_PANE]
         document = self.ancestorWithRole(obj, docRoles, stopRoles)
         if not document and orca_state.locusOfFocus:
-            if orca_state.locusOfFocus.getRole() in docRoles:
+            if accessible_cache.getRole(orca_state.locusOfFocus) in docRoles:
                 return orca_state.locusOfFocus
 
         return document
@@ -519,7 +528,7 @@ class Utilities:
         if not root:
             return None
 
-        if root.getState().contains(pyatspi.STATE_FOCUSED):
+        if accessible_cache.getState(root).contains(pyatspi.STATE_FOCUSED):
             return root
 
         for child in root:
@@ -539,9 +548,9 @@ class Utilities:
 
         parent = obj.parent
         while parent and (parent.parent != parent):
-            if parent.getRole() == pyatspi.ROLE_FRAME:
+            if accessible_cache.getRole(parent) == pyatspi.ROLE_FRAME:
                 results[0] = parent
-            if parent.getRole() in [pyatspi.ROLE_DIALOG,
+            if accessible_cache.getRole(parent) in [pyatspi.ROLE_DIALOG,
                                     pyatspi.ROLE_FILE_CHOOSER]:
                 results[1] = parent
             parent = parent.parent
@@ -560,7 +569,7 @@ class Utilities:
         to routing the cursor.
         """
 
-        if obj and obj.getRole() == pyatspi.ROLE_COMBO_BOX \
+        if obj and accessible_cache.getRole(obj) == pyatspi.ROLE_COMBO_BOX \
            and not self.isSameObject(obj, orca_state.locusOfFocus):
             return True
 
@@ -596,7 +605,7 @@ class Utilities:
                 if isinstance(role[0], str):
                     current_role = current.getRoleName()
                 else:
-                    current_role = current.getRole()
+                    current_role = accessible_cache.getRole(current)
             except:
                 current_role = None
 
@@ -618,14 +627,14 @@ class Utilities:
             obj = orca_state.locusOfFocus
 
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except:
             return False
 
         if role != pyatspi.ROLE_ENTRY:
             return False
 
-        isToolbar = lambda x: x and x.getRole() == pyatspi.ROLE_TOOL_BAR
+        isToolbar = lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_TOOL_BAR
         toolbar = pyatspi.findAncestor(obj, isToolbar)
 
         return toolbar is not None
@@ -929,28 +938,29 @@ class Utilities:
                 "search"]
 
     def isProgressBar(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_PROGRESS_BAR):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_PROGRESS_BAR):
             return False
 
         try:
             value = obj.queryValue()
         except NotImplementedError:
-            msg = "ERROR: %s doesn't implement AtspiValue" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: %s doesn't implement AtspiValue", obj, timestamp=True)
             return False
         except:
-            msg = "ERROR: Exception getting value for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting value for %s", obj, timestamp=True)
             return False
         else:
             try:
                 if value.maximumValue == value.minimumValue:
-                    msg = "INFO: %s is busy indicator" % obj
-                    debug.println(debug.LEVEL_INFO, msg, True)
+                    debug.printMessage(debug.LEVEL_INFO,
+                                       "INFO: %s is busy indicator", obj, timestamp=True)
                     return False
             except:
-                msg = "INFO: %s is either busy indicator or broken" % obj
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "INFO: %s is either busy indicator or broken", obj,
+                                   timestamp=True)
                 return False
 
         return True
@@ -968,7 +978,7 @@ class Utilities:
             return False, "Has no size"
 
         if _settingsManager.getSetting('ignoreStatusBarProgressBars'):
-            isStatusBar = lambda x: x and x.getRole() == pyatspi.ROLE_STATUS_BAR
+            isStatusBar = lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_STATUS_BAR
             if pyatspi.findAncestor(obj, isStatusBar):
                 return False, "Is status bar descendant"
 
@@ -998,12 +1008,12 @@ class Utilities:
             value = obj.queryValue()
             minval, val, maxval =  value.minimumValue, value.currentValue, value.maximumValue
         except NotImplementedError:
-            msg = "ERROR: %s doesn't implement AtspiValue" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: %s doesn't implement AtspiValue", obj, timestamp=True)
             return None
         except:
-            msg = "ERROR: Exception getting value for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting value for %s", obj, timestamp=True)
             return None
 
         if maxval == minval == val:
@@ -1014,30 +1024,28 @@ class Utilities:
         return int((val / (maxval - minval)) * 100)
 
     def isBlockquote(self, obj):
-        return obj and obj.getRole() == pyatspi.ROLE_BLOCK_QUOTE
+        return obj and accessible_cache.getRole(obj) == pyatspi.ROLE_BLOCK_QUOTE
 
     def isDocumentList(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_LIST):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_LIST):
             return False
 
         try:
             document = pyatspi.findAncestor(obj, self.isDocument)
         except:
-            msg = "ERROR: Exception finding ancestor of %s" % obj
-            debug.println(debug.LEVEL_INFO, msg)
+            debug.printMessage(debug.LEVEL_INFO, "ERROR: Exception finding ancestor of %s", obj)
             return False
 
         return document is not None
 
     def isDocumentPanel(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_PANEL):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_PANEL):
             return False
 
         try:
             document = pyatspi.findAncestor(obj, self.isDocument)
         except:
-            msg = "ERROR: Exception finding ancestor of %s" % obj
-            debug.println(debug.LEVEL_INFO, msg)
+            debug.printMessage(debug.LEVEL_INFO, "ERROR: Exception finding ancestor of %s", obj)
             return False
 
         return document is not None
@@ -1049,7 +1057,7 @@ class Utilities:
                          pyatspi.ROLE_DOCUMENT_SPREADSHEET,
                          pyatspi.ROLE_DOCUMENT_TEXT,
                          pyatspi.ROLE_DOCUMENT_WEB]
-        return obj and obj.getRole() in documentRoles
+        return obj and accessible_cache.getRole(obj) in documentRoles
 
     def inDocumentContent(self, obj=None):
         obj = obj or orca_state.locusOfFocus
@@ -1062,12 +1070,12 @@ class Utilities:
         try:
             doc = pyatspi.findAncestor(obj, self.isDocument)
         except:
-            msg = "ERROR: Exception finding ancestor of %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception finding ancestor of %s", obj, timestamp=True)
             return None
 
-        msg = "INFO: Document containing %s is %s" % (obj, doc)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "INFO: Document containing %s is %s", obj, doc, timestamp=True)
         return doc
 
     def getTable(self, obj):
@@ -1075,31 +1083,31 @@ class Utilities:
             return None
 
         tableRoles = [pyatspi.ROLE_TABLE, pyatspi.ROLE_TREE_TABLE]
-        isTable = lambda x: x and x.getRole() in tableRoles
+        isTable = lambda x: x and accessible_cache.getRole(x) in tableRoles
         if isTable(obj):
             return obj
 
         try:
             table = pyatspi.findAncestor(obj, isTable)
         except:
-            msg = "ERROR: Exception finding ancestor of %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception finding ancestor of %s", obj, timestamp=True)
             return None
 
         return table
 
     def isTextDocumentTable(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_TABLE):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_TABLE):
             return False
 
         doc = self.getContainingDocument(obj)
         if not doc:
             return False
 
-        return doc.getRole() != pyatspi.ROLE_DOCUMENT_SPREADSHEET
+        return accessible_cache.getRole(doc) != pyatspi.ROLE_DOCUMENT_SPREADSHEET
 
     def isGUITable(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_TABLE):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_TABLE):
             return False
 
         return self.getContainingDocument(obj) is None
@@ -1109,10 +1117,10 @@ class Utilities:
             return False
 
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except:
-            msg = 'ERROR: Exception getting role of %s' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Exception getting role of %s', obj, timestamp=True)
             return False
 
         if not role == pyatspi.ROLE_TABLE:
@@ -1122,17 +1130,19 @@ class Utilities:
         if not doc:
             return False
 
-        if doc.getRole() == pyatspi.ROLE_DOCUMENT_SPREADSHEET:
+        if accessible_cache.getRole(doc) == pyatspi.ROLE_DOCUMENT_SPREADSHEET:
             return True
 
         try:
             table = obj.queryTable()
         except NotImplementedError:
-            msg = 'ERROR: Table %s does not implement table interface' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Table %s does not implement table interface', obj,
+                               timestamp=True)
         except:
-            msg = 'ERROR: Exception querying table interface of %s' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Exception querying table interface of %s', obj,
+                               timestamp=True)
         else:
             return table.nRows > 65536
 
@@ -1143,10 +1153,10 @@ class Utilities:
             return False
 
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except:
-            msg = 'ERROR: Exception getting role of %s' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Exception getting role of %s', obj, timestamp=True)
             return False
 
         cellRoles = [pyatspi.ROLE_TABLE_CELL,
@@ -1162,10 +1172,10 @@ class Utilities:
             return False
 
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except:
-            msg = 'ERROR: Exception getting role of %s' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Exception getting role of %s', obj, timestamp=True)
             return False
 
         cellRoles = [pyatspi.ROLE_TABLE_CELL,
@@ -1210,8 +1220,8 @@ class Utilities:
 
     def isFocusableLabel(self, obj):
         try:
-            role = obj.getRole()
-            state = obj.getState()
+            role = accessible_cache.getRole(obj)
+            state = accessible_cache.getState(obj)
         except:
             return False
 
@@ -1222,16 +1232,16 @@ class Utilities:
             return True
 
         if state.contains(pyatspi.STATE_FOCUSED):
-            msg = 'INFO: %s is focused but lacks state focusable' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'INFO: %s is focused but lacks state focusable', obj, timestamp=True)
             return True
 
         return False
 
     def isNonFocusableList(self, obj):
         try:
-            role = obj.getRole()
-            state = obj.getState()
+            role = accessible_cache.getRole(obj)
+            state = accessible_cache.getState(obj)
         except:
             return False
 
@@ -1242,17 +1252,17 @@ class Utilities:
             return False
 
         if state.contains(pyatspi.STATE_FOCUSED):
-            msg = 'INFO: %s is focused but lacks state focusable' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'INFO: %s is focused but lacks state focusable', obj, timestamp=True)
             return False
 
         return True
 
     def isStatusBarNotification(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_NOTIFICATION):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_NOTIFICATION):
             return False
 
-        isStatusBar = lambda x: x and x.getRole() == pyatspi.ROLE_STATUS_BAR
+        isStatusBar = lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_STATUS_BAR
         if pyatspi.findAncestor(obj, isStatusBar):
             return True
 
@@ -1262,10 +1272,10 @@ class Utilities:
         if not obj:
             return False
 
-        if obj.getRole() == pyatspi.ROLE_TREE_ITEM:
+        if accessible_cache.getRole(obj) == pyatspi.ROLE_TREE_ITEM:
             return True
 
-        isTree = lambda x: x and x.getRole() in [pyatspi.ROLE_TREE, pyatspi.ROLE_TREE_TABLE]
+        isTree = lambda x: x and accessible_cache.getRole(x) in [pyatspi.ROLE_TREE, pyatspi.ROLE_TREE_TABLE]
         if pyatspi.findAncestor(obj, isTree):
             return True
 
@@ -1285,12 +1295,12 @@ class Utilities:
         except:
             attrs = {}
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except:
             role = None
 
         try:
-            parentRole = obj.parent.getRole()
+            parentRole = accessible_cache.getRole(obj.parent)
         except:
             parentRole = None
 
@@ -1309,22 +1319,24 @@ class Utilities:
             try:
                 table = obj.queryTable()
             except NotImplementedError:
-                msg = 'ERROR: Table %s does not implement table interface' % obj
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   'ERROR: Table %s does not implement table interface', obj,
+                                   timestamp=True)
                 layoutOnly = True
             except:
-                msg = 'ERROR: Exception querying table interface of %s' % obj
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   'ERROR: Exception querying table interface of %s', obj,
+                                   timestamp=True)
                 layoutOnly = True
             else:
                 if not (table.nRows and table.nColumns):
-                    layoutOnly = not obj.getState().contains(pyatspi.STATE_FOCUSED)
+                    layoutOnly = not accessible_cache.getState(obj).contains(pyatspi.STATE_FOCUSED)
                 elif not (obj.name or self.displayedLabel(obj)):
                     layoutOnly = not (table.getColumnHeader(0) or table.getRowHeader(0))
         elif role == pyatspi.ROLE_TABLE_CELL and obj.childCount:
             if parentRole == pyatspi.ROLE_TREE_TABLE:
                 layoutOnly = False
-            elif firstChild.getRole() == pyatspi.ROLE_TABLE_CELL:
+            elif accessible_cache.getRole(firstChild) == pyatspi.ROLE_TABLE_CELL:
                 layoutOnly = True
             elif parentRole == pyatspi.ROLE_TABLE:
                 layoutOnly = self.isLayoutOnly(obj.parent)
@@ -1355,11 +1367,11 @@ class Utilities:
         elif role == pyatspi.ROLE_LIST_ITEM and parentRole == pyatspi.ROLE_LIST_BOX:
             layoutOnly = False
         elif self.isTableRow(obj):
-            state = obj.getState()
+            state = accessible_cache.getState(obj)
             layoutOnly = not (state.contains(pyatspi.STATE_FOCUSABLE) \
                               or state.contains(pyatspi.STATE_SELECTABLE))
         elif role == pyatspi.ROLE_PANEL and obj.childCount and firstChild \
-             and firstChild.getRole() in ignorePanelParent:
+             and accessible_cache.getRole(firstChild) in ignorePanelParent:
             layoutOnly = True
         elif obj.childCount == 1 and obj.name and obj.name == firstChild.name:
             layoutOnly = True
@@ -1370,8 +1382,8 @@ class Utilities:
                 layoutOnly = True
 
         if layoutOnly:
-            msg = 'INFO: %s is deemed to be layout only' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'INFO: %s is deemed to be layout only', obj, timestamp=True)
 
         return layoutOnly
 
@@ -1396,10 +1408,10 @@ class Utilities:
             return False
 
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except (LookupError, RuntimeError):
-            msg = 'ERROR: Exception getting role for %s' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Exception getting role for %s', obj, timestamp=True)
             return False
 
         return role == pyatspi.ROLE_LINK
@@ -1410,7 +1422,7 @@ class Utilities:
         if not self.isTextArea(obj):
             return False
 
-        state = obj.getState()
+        state = accessible_cache.getState(obj)
         readOnly = state.contains(pyatspi.STATE_FOCUSABLE) \
                    and not state.contains(pyatspi.STATE_EDITABLE)
         return readOnly
@@ -1449,9 +1461,10 @@ class Utilities:
             return False
 
         try:
-            if obj1.getRole() != obj2.getRole():
+            if accessible_cache.getRole(obj1) != accessible_cache.getRole(obj2):
                 return False
-            if obj1.name != obj2.name and not ignoreNames:
+            if not ignoreNames \
+               and accessible_cache.getName(obj1) != accessible_cache.getName(obj2):
                 return False
             if comparePaths and self._hasSamePath(obj1, obj2):
                 return True
@@ -1490,7 +1503,7 @@ class Utilities:
         if self.isLink(obj):
             return False
 
-        return obj and obj.getRole() in (pyatspi.ROLE_TEXT,
+        return obj and accessible_cache.getRole(obj) in (pyatspi.ROLE_TEXT,
                                          pyatspi.ROLE_ENTRY,
                                          pyatspi.ROLE_PARAGRAPH)
 
@@ -1518,8 +1531,8 @@ class Utilities:
         try:
             relations = obj.getRelationSet()
         except (LookupError, RuntimeError):
-            msg = 'ERROR: Exception getting relationset for %s' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Exception getting relationset for %s', obj, timestamp=True)
             return label
 
         allTargets = []
@@ -1651,11 +1664,11 @@ class Utilities:
 
         if self.isBlockquote(obj):
             pred = lambda x: self.isBlockquote(x)
-        elif obj.getRole() == pyatspi.ROLE_LIST_ITEM:
-            pred = lambda x: x and x.parent and x.parent.getRole() == pyatspi.ROLE_LIST
+        elif accessible_cache.getRole(obj) == pyatspi.ROLE_LIST_ITEM:
+            pred = lambda x: x and x.parent and accessible_cache.getRole(x.parent) == pyatspi.ROLE_LIST
         else:
-            role = obj.getRole()
-            pred = lambda x: x and x.getRole() == role
+            role = accessible_cache.getRole(obj)
+            pred = lambda x: x and accessible_cache.getRole(x) == role
 
         ancestors = []
         ancestor = pyatspi.findAncestor(obj, pred)
@@ -1692,8 +1705,9 @@ class Utilities:
             try:
                 relations = node.getRelationSet()
             except (LookupError, RuntimeError):
-                msg = 'ERROR: Exception getting relationset for %s' % node
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   'ERROR: Exception getting relationset for %s', node,
+                                   timestamp=True)
                 return -1
             node = None
             for relation in relations:
@@ -1706,12 +1720,13 @@ class Utilities:
             # infinite cycle of nodes.  Bon Echo has been seen to do
             # this (see bug 351847).
             if nodes.count(node):
-                msg = 'ERROR: %s is already in the list of nodes for %s' % (node, obj)
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   'ERROR: %s is already in the list of nodes for %s', node, obj,
+                                   timestamp=True)
                 done = True
             if len(nodes) > 100:
-                msg = 'INFO: More than 100 nodes found for %s' % obj
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   'INFO: More than 100 nodes found for %s', obj, timestamp=True)
                 done = True
             elif node:
                 nodes.append(node)
@@ -1729,30 +1744,29 @@ class Utilities:
             return False
 
         if not self.isShowingAndVisible(obj):
-            msg = "INFO: %s is not showing and visible" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "INFO: %s is not showing and visible", obj, timestamp=True)
             return False
 
         try:
             box = obj.queryComponent().getExtents(pyatspi.DESKTOP_COORDS)
         except:
-            msg = "ERROR: Exception getting extents for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting extents for %s", obj, timestamp=True)
             return False
 
         if box.x < 0 and box.y < 0:
-            msg = "INFO: %s has negative coordinates" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "INFO: %s has negative coordinates", obj, timestamp=True)
             return False
 
         if not (box.width or box.height):
             if not obj.childCount:
-                msg = "INFO: %s has no size and no children" % obj
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "INFO: %s has no size and no children", obj, timestamp=True)
                 return False
-            if obj.getRole() == pyatspi.ROLE_MENU:
-                msg = "INFO: %s has no size" % obj
-                debug.println(debug.LEVEL_INFO, msg, True)
+            if accessible_cache.getRole(obj) == pyatspi.ROLE_MENU:
+                debug.printMessage(debug.LEVEL_INFO, "INFO: %s has no size", obj, timestamp=True)
                 return False
 
             return True
@@ -1761,18 +1775,18 @@ class Utilities:
             return True
 
         if not self.containsRegion(box, boundingbox):
-            msg = "INFO: %s %s not in %s" % (obj, box, boundingbox)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "INFO: %s %s not in %s", obj, box, boundingbox, timestamp=True)
             return False
 
         return True
 
     def selectedMenuBarMenu(self, menubar):
         try:
-            role = menubar.getRole()
+            role = accessible_cache.getRole(menubar)
         except:
-            msg = "ERROR: Exception getting role of %s" % menubar
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role of %s", menubar, timestamp=True)
             return None
 
         if role != pyatspi.ROLE_MENU_BAR:
@@ -1787,10 +1801,11 @@ class Utilities:
         for menu in menubar:
             try:
                 menu.clearCache()
-                state = menu.getState()
+                accessible_cache.invalidate(menu)
+                state = accessible_cache.getState(menu)
             except:
-                msg = "ERROR: Exception getting state of %s" % menu
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "ERROR: Exception getting state of %s", menu, timestamp=True)
                 continue
 
             if state.contains(pyatspi.STATE_EXPANDED) \
@@ -1803,7 +1818,7 @@ class Utilities:
         if not obj:
             return False
 
-        isMenuBar = lambda x: x and x.getRole() == pyatspi.ROLE_MENU_BAR
+        isMenuBar = lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_MENU_BAR
         menubar = pyatspi.findAncestor(obj, isMenuBar)
         if menubar is None:
             return False
@@ -1826,10 +1841,10 @@ class Utilities:
             return []
 
         try:
-            role = root.getRole()
+            role = accessible_cache.getRole(root)
         except:
-            msg = "ERROR: Exception getting role of %s" % root
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role of %s", root, timestamp=True)
             return []
 
         if role == pyatspi.ROLE_INVALID:
@@ -1841,7 +1856,7 @@ class Utilities:
         if role == pyatspi.ROLE_MENU_BAR:
             self._selectedMenuBarMenu[hash(root)] = self.selectedMenuBarMenu(root)
 
-        if root.parent and root.parent.getRole() == pyatspi.ROLE_MENU_BAR \
+        if root.parent and accessible_cache.getRole(root.parent) == pyatspi.ROLE_MENU_BAR \
            and not self.isInOpenMenuBarMenu(root):
             return [root]
 
@@ -1850,8 +1865,8 @@ class Utilities:
                 component = root.queryComponent()
                 extents = component.getExtents(pyatspi.DESKTOP_COORDS)
             except:
-                msg = "ERROR: Exception getting extents of %s" % root
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "ERROR: Exception getting extents of %s", root, timestamp=True)
                 extents = 0, 0, 0, 0
 
         interfaces = pyatspi.listInterfaces(root)
@@ -1893,21 +1908,22 @@ class Utilities:
             if not (obj and obj.parent and obj.childCount):
                 return False
         except:
-            msg = "ERROR: Exception getting parent and childCount for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting parent and childCount for %s", obj,
+                               timestamp=True)
             return False
 
-        role = obj.getRole()
+        role = accessible_cache.getRole(obj)
         if role == pyatspi.ROLE_TABLE_ROW:
             return True
 
         if role == pyatspi.ROLE_TABLE_CELL:
             return False
 
-        if not obj.parent.getRole() == pyatspi.ROLE_TABLE:
+        if not accessible_cache.getRole(obj.parent) == pyatspi.ROLE_TABLE:
             return False
 
-        isCell = lambda x: x and x.getRole() in [pyatspi.ROLE_TABLE_CELL,
+        isCell = lambda x: x and accessible_cache.getRole(x) in [pyatspi.ROLE_TABLE_CELL,
                                                  pyatspi.ROLE_ROW_HEADER,
                                                  pyatspi.ROLE_COLUMN_HEADER]
         cellChildren = list(filter(isCell, [x for x in obj]))
@@ -1917,7 +1933,7 @@ class Utilities:
         return False
 
     def realActiveAncestor(self, obj):
-        if obj.getState().contains(pyatspi.STATE_FOCUSED):
+        if accessible_cache.getState(obj).contains(pyatspi.STATE_FOCUSED):
             return obj
 
         roles = [pyatspi.ROLE_TABLE_CELL,
@@ -1925,7 +1941,7 @@ class Utilities:
                  pyatspi.ROLE_ROW_HEADER,
                  pyatspi.ROLE_LIST_ITEM]
 
-        ancestor = pyatspi.findAncestor(obj, lambda x: x and x.getRole() in roles)
+        ancestor = pyatspi.findAncestor(obj, lambda x: x and accessible_cache.getRole(x) in roles)
         if ancestor and not self._script.utilities.isLayoutOnly(ancestor.parent):
             obj = ancestor
 
@@ -1944,7 +1960,7 @@ class Utilities:
         if self.isDead(obj):
             return None
 
-        if obj.getRole() != pyatspi.ROLE_TABLE_CELL:
+        if accessible_cache.getRole(obj) != pyatspi.ROLE_TABLE_CELL:
             return obj
 
         hasContent = [x for x in obj if self.displayedText(x).strip()]
@@ -1967,8 +1983,8 @@ class Utilities:
                      pyatspi.ROLE_TREE_TABLE,
                      pyatspi.ROLE_TABLE]
 
-        if obj.getState().contains(pyatspi.STATE_MANAGES_DESCENDANTS) \
-           or obj.getRole() in skipRoles:
+        if accessible_cache.getState(obj).contains(pyatspi.STATE_MANAGES_DESCENDANTS) \
+           or accessible_cache.getRole(obj) in skipRoles:
             return
 
         statusBar = None
@@ -1999,15 +2015,17 @@ class Utilities:
             return False
 
         try:
-            role = orca_state.locusOfFocus.getRole()
+            role = accessible_cache.getRole(orca_state.locusOfFocus)
         except:
-            msg = "ERROR: Exception getting role for %s" % orca_state.locusOfFocus
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role for %s", orca_state.locusOfFocus,
+                               timestamp=True)
             return False
 
         rv = role in self._topLevelRoles()
-        msg = "INFO: %s is top-level object: %s" % (orca_state.locusOfFocus, rv)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "INFO: %s is top-level object: %s", orca_state.locusOfFocus, rv,
+                           timestamp=True)
 
         return rv
 
@@ -2025,8 +2043,8 @@ class Utilities:
         stopAtRoles = self._topLevelRoles()
 
         while obj and obj.parent \
-              and not obj.getRole() in stopAtRoles \
-              and not obj.parent.getRole() == pyatspi.ROLE_APPLICATION:
+              and not accessible_cache.getRole(obj) in stopAtRoles \
+              and not accessible_cache.getRole(obj.parent) == pyatspi.ROLE_APPLICATION:
             obj = obj.parent
 
         return obj
@@ -2039,11 +2057,13 @@ class Utilities:
             return False
 
         topLevel.clearCache()
+        accessible_cache.invalidate(topLevel)
         try:
-            state = topLevel.getState()
+            state = accessible_cache.getState(topLevel)
         except:
-            msg = "ERROR: Exception getting state of topLevel %s" % topLevel
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting state of topLevel %s", topLevel,
+                               timestamp=True)
             return False
 
         if not state.contains(pyatspi.STATE_ACTIVE) \
@@ -2131,7 +2151,7 @@ class Utilities:
         # on the index in the parent. This is seen with GtkListBox items which
         # had been scrolled off-screen.
         if not rv and obj1.parent == obj2.parent:
-            rv = obj1.getIndexInParent() - obj2.getIndexInParent()
+            rv = accessible_cache.getIndexInParent(obj1) - accessible_cache.getIndexInParent(obj2)
 
         rv = max(rv, -1)
         rv = min(rv, 1)
@@ -2145,8 +2165,8 @@ class Utilities:
         try:
             extents = obj.queryComponent().getExtents(pyatspi.DESKTOP_COORDS)
         except:
-            msg = "ERROR: Exception getting extents for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting extents for %s", obj, timestamp=True)
             return True
 
         return not (extents.width and extents.height)
@@ -2160,7 +2180,7 @@ class Utilities:
             if not x:
                 return False
 
-            if x.getRole() in roles:
+            if accessible_cache.getRole(x) in roles:
                 return True
 
             if 'Table' in pyatspi.listInterfaces(x):
@@ -2171,8 +2191,8 @@ class Utilities:
 
         match = pyatspi.findDescendant(root, isMatch)
         if match:
-            msg = "INFO: %s has descendant %s" % (root, match)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "INFO: %s has descendant %s", root, match, timestamp=True)
             return True
 
         return False
@@ -2196,7 +2216,7 @@ class Utilities:
         if self._script.spellcheck and self._script.spellcheck.isCheckWindow(root):
             return []
 
-        hasRole = lambda x: x and x.getRole() == pyatspi.ROLE_LABEL
+        hasRole = lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_LABEL
         try:
             allLabels = pyatspi.findAllDescendants(root, hasRole)
         except:
@@ -2204,7 +2224,7 @@ class Utilities:
         try:
             labels = [x for x in allLabels if not x.getRelationSet()]
             if onlyShowing:
-                labels = [x for x in labels if x.getState().contains(pyatspi.STATE_SHOWING)]
+                labels = [x for x in labels if accessible_cache.getState(x).contains(pyatspi.STATE_SHOWING)]
         except:
             return []
 
@@ -2233,12 +2253,12 @@ class Utilities:
         alertAndDialogCount = 0
         app = obj.getApplication()
         window = self.topLevelObject(obj)
-        if window and window.getRole() != pyatspi.ROLE_ALERT and \
-           window.getRole() != pyatspi.ROLE_DIALOG and \
+        if window and accessible_cache.getRole(window) != pyatspi.ROLE_ALERT and \
+           accessible_cache.getRole(window) != pyatspi.ROLE_DIALOG and \
            not self.isFunctionalDialog(window):
             for child in app:
-                if child.getRole() == pyatspi.ROLE_ALERT or \
-                   child.getRole() == pyatspi.ROLE_DIALOG or \
+                if accessible_cache.getRole(child) == pyatspi.ROLE_ALERT or \
+                   accessible_cache.getRole(child) == pyatspi.ROLE_DIALOG or \
                    self.isFunctionalDialog(child):
                     alertAndDialogCount += 1
 
@@ -2313,10 +2333,10 @@ class Utilities:
             if relation.getRelationType() == pyatspi.RELATION_FLOWS_FROM:
                 return relation.getTarget(0)
 
-        index = obj.getIndexInParent() - 1
+        index = accessible_cache.getIndexInParent(obj) - 1
         if obj.parent and not (0 <= index < obj.parent.childCount - 1):
             obj = obj.parent
-            index = obj.getIndexInParent() - 1
+            index = accessible_cache.getIndexInParent(obj) - 1
 
         try:
             prevObj = obj.parent[index]
@@ -2338,10 +2358,10 @@ class Utilities:
             if relation.getRelationType() == pyatspi.RELATION_FLOWS_TO:
                 return relation.getTarget(0)
 
-        index = obj.getIndexInParent() + 1
+        index = accessible_cache.getIndexInParent(obj) + 1
         if obj.parent and not (0 < index < obj.parent.childCount):
             obj = obj.parent
-            index = obj.getIndexInParent() + 1
+            index = accessible_cache.getIndexInParent(obj) + 1
 
         try:
             nextObj = obj.parent[index]
@@ -2437,8 +2457,9 @@ class Utilities:
         try:
             hyperlink = obj.queryHyperlink()
         except NotImplementedError:
-            msg = "INFO: %s does not implement the hyperlink interface" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "INFO: %s does not implement the hyperlink interface", obj,
+                               timestamp=True)
         else:
             # We need to make sure that this is an embedded object in
             # some accessible text (as opposed to an imagemap link).
@@ -2447,11 +2468,12 @@ class Utilities:
                 obj.parent.queryText()
                 offset = hyperlink.startIndex
             except:
-                msg = "ERROR: Exception getting startIndex for %s in parent %s" % (obj, obj.parent)
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "ERROR: Exception getting startIndex for %s in parent %s", obj,
+                                   obj.parent, timestamp=True)
             else:
-                msg = "INFO: startIndex of %s is %i" % (obj, offset)
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "INFO: startIndex of %s is %i", obj, offset, timestamp=True)
 
         return offset
 
@@ -2538,7 +2560,7 @@ class Utilities:
         return False
 
     def getError(self, obj):
-        return obj.getState().contains(pyatspi.STATE_INVALID_ENTRY)
+        return accessible_cache.getState(obj).contains(pyatspi.STATE_INVALID_ENTRY)
 
     def getErrorMessage(self, obj):
         return ""
@@ -2581,10 +2603,10 @@ class Utilities:
             return event.any_data
 
         try:
-            role = event.source.getRole()
+            role = accessible_cache.getRole(event.source)
         except:
-            msg = "ERROR: Exception getting role of %s" % event.source
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role of %s", event.source, timestamp=True)
             role = None
 
         msg = "ERROR: Broken text insertion event"
@@ -2595,8 +2617,8 @@ class Utilities:
             if text:
                 string = text.getText(0, -1)
                 if string:
-                    msg = "HACK: Returning last char in '%s'" % string
-                    debug.println(debug.LEVEL_INFO, msg, True)
+                    debug.printMessage(debug.LEVEL_INFO,
+                                       "HACK: Returning last char in '%s'", string, timestamp=True)
                     return string[-1]
 
         msg = "FAIL: Unable to correct broken text insertion event"
@@ -2793,11 +2815,11 @@ class Utilities:
             return False
 
         obj = orca_state.locusOfFocus
-        role = obj.getRole()
+        role = accessible_cache.getRole(obj)
         if role == pyatspi.ROLE_PASSWORD_TEXT:
             return False
 
-        if obj.getState().contains(pyatspi.STATE_EDITABLE):
+        if accessible_cache.getState(obj).contains(pyatspi.STATE_EDITABLE):
             return True
 
         return False
@@ -2926,16 +2948,28 @@ class Utilities:
         if self.speakMathSymbolNames():
             line = mathsymbols.adjustForSpeech(line)
 
-        if settings.speakNumbersAsDigits:
-            words = self.WORDS_RE.split(line)
-            line = ''.join(map(self._convertWordToDigits, words))
-
+        speakDigits = settings.speakNumbersAsDigits
         if not settings.usePronunciationDictionary:
+            if speakDigits:
+                words = self.WORDS_RE.split(line)
+                line = ''.join(map(self._convertWordToDigits, words))
             return line
 
-        newLine = ""
+        # Convert numbers to digits and look up pronunciations in the same
+        # pass. The digits of a converted number are looked up individually,
+        # as they would be were the converted line split into words again.
+        #
+        def _getPronunciation(word):
+            if speakDigits:
+                digits = self._convertWordToDigits(word)
+                if digits != word:
+                    words = self.WORDS_RE.split(digits)
+                    return ''.join(map(pronunciation_dict.getPronunciation, words))
+
+            return pronunciation_dict.getPronunciation(word)
+
         words = self.WORDS_RE.split(line)
-        newLine = ''.join(map(pronunciation_dict.getPronunciation, words))
+        newLine = ''.join(map(_getPronunciation, words))
 
         if settings.speakMultiCaseStringsAsWords:
             newLine = self._processMultiCaseString(newLine)
@@ -2990,20 +3024,16 @@ class Utilities:
         Returns: a new string which contains actual digits.
         """
 
-        subscripted = set(re.findall(self.SUBSCRIPTS_RE, string))
-        superscripted = set(re.findall(self.SUPERSCRIPTS_RE, string))
-
-        for number in superscripted:
-            new = [str(self.SUPERSCRIPT_DIGITS.index(d)) for d in number]
-            newString = messages.DIGITS_SUPERSCRIPT % "".join(new)
-            string = re.sub(number, newString, string)
+        def _adjust(match):
+            number = match.group(0)
+            if number[0] in self.SUPERSCRIPT_DIGITS:
+                new = [str(self.SUPERSCRIPT_DIGITS.index(d)) for d in number]
+                return messages.DIGITS_SUPERSCRIPT % "".join(new)
 
-        for number in subscripted:
             new = [str(self.SUBSCRIPT_DIGITS.index(d)) for d in number]
-            newString = messages.DIGITS_SUBSCRIPT % "".join(new)
-            string = re.sub(number, newString, string)
+            return messages.DIGITS_SUBSCRIPT % "".join(new)
 
-        return string
+        return self.SCRIPTED_DIGITS_RE.sub(_adjust, string)
 
     def indentationDescription(self, line):
         if _settingsManager.getSetting('onlySpeakDisplayedText') \
@@ -3062,14 +3092,15 @@ class Utilities:
             if not event.any_data or not event.source:
                 return False
 
-            state = event.source.getState()
+            state = accessible_cache.getState(event.source)
             if not state.contains(pyatspi.STATE_EDITABLE):
                 return False
             if not state.contains(pyatspi.STATE_SHOWING):
                 return False
             if state.contains(pyatspi.STATE_FOCUSABLE):
                 event.source.clearCache()
-                state = event.source.getState()
+                accessible_cache.invalidate(event.source)
+                state = accessible_cache.getState(event.source)
                 if not state.contains(pyatspi.STATE_FOCUSED):
                     return False
 
@@ -3331,26 +3362,28 @@ class Utilities:
             maxValue = value.maximumValue
         except (LookupError, RuntimeError):
             maxValue = 0.0
-            msg = 'ERROR: Exception getting maximumValue for %s' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Exception getting maximumValue for %s', obj, timestamp=True)
         try:
             minValue = value.minimumValue
         except (LookupError, RuntimeError):
             minValue = 0.0
-            msg = 'ERROR: Exception getting minimumValue for %s' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Exception getting minimumValue for %s', obj, timestamp=True)
         try:
             minIncrement = value.minimumIncrement
         except (LookupError, RuntimeError):
             minIncrement = (maxValue - minValue) / 100.0
-            msg = 'ERROR: Exception getting minimumIncrement for %s' % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               'ERROR: Exception getting minimumIncrement for %s', obj,
+                               timestamp=True)
         if minIncrement != 0.0:
             try:
                 decimalPlaces = math.ceil(max(0, -math.log10(minIncrement)))
             except ValueError:
-                msg = 'ERROR: Exception calculating decimal places for %s' % obj
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   'ERROR: Exception calculating decimal places for %s', obj,
+                                   timestamp=True)
                 return ""
         elif abs(currentValue) < 1:
             decimalPlaces = 1
@@ -3419,16 +3452,18 @@ class Utilities:
             selection = obj.querySelection()
             count = selection.nSelectedChildren
         except NotImplementedError:
-            msg = "INFO: %s does not implement the selection interface" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "INFO: %s does not implement the selection interface", obj,
+                               timestamp=True)
             return []
         except:
-            msg = "ERROR: Exception querying selection interface for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception querying selection interface for %s", obj,
+                               timestamp=True)
             return []
 
-        msg = "INFO: %s reports %i selected children" % (obj, count)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "INFO: %s reports %i selected children", obj, count, timestamp=True)
 
         children = []
         for x in range(count):
@@ -3436,14 +3471,15 @@ class Utilities:
             if not self.isZombie(child):
                 children.append(child)
 
-        role = obj.getRole()
+        role = accessible_cache.getRole(obj)
         if role == pyatspi.ROLE_MENU and not children:
-            pred = lambda x: x and x.getState().contains(pyatspi.STATE_SELECTED)
+            pred = lambda x: x and accessible_cache.getState(x).contains(pyatspi.STATE_SELECTED)
             try:
                 children = pyatspi.findAllDescendants(obj, pred)
             except:
-                msg = "ERROR: Exception calling findAllDescendants on %s" % obj
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "ERROR: Exception calling findAllDescendants on %s", obj,
+                                   timestamp=True)
 
         if role == pyatspi.ROLE_COMBO_BOX \
            and children and children[0].getRole() == pyatspi.ROLE_MENU:
@@ -3453,8 +3489,9 @@ class Utilities:
                 try:
                     children = pyatspi.findAllDescendants(obj, pred)
                 except:
-                    msg = "ERROR: Exception calling findAllDescendants on %s" % obj
-                    debug.println(debug.LEVEL_INFO, msg, True)
+                    debug.printMessage(debug.LEVEL_INFO,
+                                       "ERROR: Exception calling findAllDescendants on %s", obj,
+                                       timestamp=True)
 
         return children
 
@@ -3463,24 +3500,26 @@ class Utilities:
             selection = obj.querySelection()
             count = selection.nSelectedChildren
         except NotImplementedError:
-            msg = "INFO: %s does not implement the selection interface" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "INFO: %s does not implement the selection interface", obj,
+                               timestamp=True)
             return 0
         except:
-            msg = "ERROR: Exception querying selection interface for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception querying selection interface for %s", obj,
+                               timestamp=True)
             return 0
 
-        msg = "INFO: %s reports %i selected children" % (obj, count)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "INFO: %s reports %i selected children", obj, count, timestamp=True)
         return count
 
     def focusedChild(self, obj):
-        isFocused = lambda x: x and x.getState().contains(pyatspi.STATE_FOCUSED)
+        isFocused = lambda x: x and accessible_cache.getState(x).contains(pyatspi.STATE_FOCUSED)
         child = pyatspi.findDescendant(obj, isFocused)
         if child == obj:
-            msg = "ERROR: focused child of %s is %s" % (obj, child)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: focused child of %s is %s", obj, child, timestamp=True)
             return None
 
         return child
@@ -3489,13 +3528,13 @@ class Utilities:
         if not obj and obj.childCount:
             return None
 
-        menus = [child for child in obj if child.getRole() == pyatspi.ROLE_MENU]
+        menus = [child for child in obj if accessible_cache.getRole(child) == pyatspi.ROLE_MENU]
         for menu in menus:
             try:
-                state = menu.getState()
+                state = accessible_cache.getState(menu)
             except:
-                msg = "ERROR: Exception getting state for %s" % menu
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "ERROR: Exception getting state for %s", menu, timestamp=True)
                 continue
             if state.contains(pyatspi.STATE_ENABLED):
                 return menu
@@ -3507,10 +3546,10 @@ class Utilities:
             return False
 
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except:
-            msg = "ERROR: Exception getting role for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role for %s", obj, timestamp=True)
             return False
 
         if role not in [pyatspi.ROLE_PUSH_BUTTON, pyatspi.ROLE_TOGGLE_BUTTON]:
@@ -3526,10 +3565,10 @@ class Utilities:
             return None
 
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except:
-            msg = "ERROR: Exception getting role for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role for %s", obj, timestamp=True)
             return None
 
         if role != pyatspi.ROLE_COMBO_BOX:
@@ -3549,16 +3588,16 @@ class Utilities:
             return False
 
         try:
-            state = obj.getState()
+            state = accessible_cache.getState(obj)
         except:
-            msg = "ERROR: Exception getting state for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting state for %s", obj, timestamp=True)
             return False
 
         if not state.contains(pyatspi.STATE_EDITABLE):
             return False
 
-        isComboBox = lambda x: x and x.getRole() == pyatspi.ROLE_COMBO_BOX
+        isComboBox = lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_COMBO_BOX
         return pyatspi.findAncestor(obj, isComboBox) is not None
 
     def isPopOver(self, obj):
@@ -3569,10 +3608,10 @@ class Utilities:
             return False
 
         try:
-            state = obj.getState()
+            state = accessible_cache.getState(obj)
         except:
-            msg = "ERROR: Exception getting state for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting state for %s", obj, timestamp=True)
             return False
 
         return not state.contains(pyatspi.STATE_MODAL)
@@ -3594,21 +3633,22 @@ class Utilities:
         return False
 
     def headingLevel(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_HEADING):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_HEADING):
             return 0
 
         try:
             attrs = dict([attr.split(':', 1) for attr in obj.getAttributes()])
         except:
-            msg = "ERROR: Exception getting attributes for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting attributes for %s", obj, timestamp=True)
             return 0
 
         try:
             value = int(attrs.get('level', '0'))
         except ValueError:
-            msg = "ERROR: Exception getting value for %s (%s)" % (obj, attrs)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting value for %s (%s)", obj, attrs,
+                               timestamp=True)
             return 0
 
         return value
@@ -3627,7 +3667,7 @@ class Utilities:
         return False
 
     def columnHeadersForCell(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_TABLE_CELL):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_TABLE_CELL):
             return []
 
         isTable = lambda x: x and 'Table' in pyatspi.listInterfaces(x)
@@ -3648,7 +3688,7 @@ class Utilities:
         return headers
 
     def rowHeadersForCell(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_TABLE_CELL):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_TABLE_CELL):
             return []
 
         isTable = lambda x: x and 'Table' in pyatspi.listInterfaces(x)
@@ -3669,7 +3709,7 @@ class Utilities:
         return headers
 
     def columnHeaderForCell(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_TABLE_CELL):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_TABLE_CELL):
             return None
 
         isTable = lambda x: x and 'Table' in pyatspi.listInterfaces(x)
@@ -3684,7 +3724,7 @@ class Utilities:
         return table.getColumnHeader(columnIndex)
 
     def rowHeaderForCell(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_TABLE_CELL):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_TABLE_CELL):
             return None
 
         isTable = lambda x: x and 'Table' in pyatspi.listInterfaces(x)
@@ -3702,7 +3742,7 @@ class Utilities:
         roles = [pyatspi.ROLE_TABLE_CELL,
                  pyatspi.ROLE_COLUMN_HEADER,
                  pyatspi.ROLE_ROW_HEADER]
-        if not (obj and obj.getRole() in roles):
+        if not (obj and accessible_cache.getRole(obj) in roles):
             return -1, -1
 
         isTable = lambda x: x and 'Table' in pyatspi.listInterfaces(x)
@@ -3716,7 +3756,7 @@ class Utilities:
         return table.getRowAtIndex(index), table.getColumnAtIndex(index)
 
     def rowAndColumnSpan(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_TABLE_CELL):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_TABLE_CELL):
             return -1, -1
 
         isTable = lambda x: x and 'Table' in pyatspi.listInterfaces(x)
@@ -3749,8 +3789,9 @@ class Utilities:
 
         x1, y1 = x + margin, y + margin
         if component.contains(x1, y1, coordType):
-            msg = "INFO: %s contains (%i,%i); not (%i,%i)" % (obj, x1, y1, x, y)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "INFO: %s contains (%i,%i); not (%i,%i)", obj, x1, y1, x, y,
+                               timestamp=True)
             return True
 
         return False
@@ -3762,7 +3803,7 @@ class Utilities:
         roles = [pyatspi.ROLE_MENU,
                  pyatspi.ROLE_PAGE_TAB]
 
-        return obj.getRole() not in roles
+        return accessible_cache.getRole(obj) not in roles
 
     def _treatAsLeafNode(self, obj):
         if not obj or self.isDead(obj):
@@ -3771,11 +3812,11 @@ class Utilities:
         if not obj.childCount:
             return True
 
-        role = obj.getRole()
+        role = accessible_cache.getRole(obj)
         if role == pyatspi.ROLE_TABLE_ROW:
             return False
 
-        state = obj.getState()
+        state = accessible_cache.getState(obj)
         if state.contains(pyatspi.STATE_EXPANDABLE):
             return not state.contains(pyatspi.STATE_EXPANDED)
 
@@ -3801,18 +3842,21 @@ class Utilities:
             try:
                 component = root.queryComponent()
             except:
-                msg = "ERROR: Exception querying component of %s" % root
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "ERROR: Exception querying component of %s", root,
+                                   timestamp=True)
                 child = None
             else:
                 child = component.getAccessibleAtPoint(x, y, coordType)
-                msg = "INFO: %s is at (%s, %s) in %s" % (child, x, y, root)
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "INFO: %s is at (%s, %s) in %s", child, x, y, root,
+                                   timestamp=True)
 
                 if child and child != root:
                     cell = self.descendantAtPoint(child, x, y, coordType)
-                    msg = "INFO: %s is at (%s, %s) in %s" % (cell, x, y, child)
-                    debug.println(debug.LEVEL_INFO, msg, True)
+                    debug.printMessage(debug.LEVEL_INFO,
+                                       "INFO: %s is at (%s, %s) in %s", cell, x, y, child,
+                                       timestamp=True)
                     if cell:
                         return cell
 
@@ -3862,15 +3906,14 @@ class Utilities:
         except:
             return []
 
-        msg = "INFO: %s has %i rows" % (obj, nRows)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO, "INFO: %s has %i rows", obj, nRows, timestamp=True)
 
         x, y, width, height = boundingbox
         cell = self.descendantAtPoint(obj, x, y + 1)
         row, col = self.coordinatesForCell(cell)
         startIndex = max(0, row)
-        msg = "INFO: First cell: %s (row: %i)" % (cell, row)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "INFO: First cell: %s (row: %i)", cell, row, timestamp=True)
 
         # Just in case the row above is a static header row in a scrollable table.
         try:
@@ -3881,13 +3924,13 @@ class Utilities:
             cell = self.descendantAtPoint(obj, x, y + extents.height + 1)
             row, col = self.coordinatesForCell(cell)
             nextIndex = max(startIndex, row)
-            msg = "INFO: Next cell: %s (row: %i)" % (cell, row)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "INFO: Next cell: %s (row: %i)", cell, row, timestamp=True)
 
         cell = self.descendantAtPoint(obj, x, y + height - 1)
         row, col = self.coordinatesForCell(cell)
-        msg = "INFO: Last cell: %s (row: %i)" % (cell, row)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "INFO: Last cell: %s (row: %i)", cell, row, timestamp=True)
 
         if row == -1:
             row = nRows
@@ -3899,43 +3942,78 @@ class Utilities:
 
         return rows
 
-    def getVisibleTableCells(self, obj):
-        try:
-            table = obj.queryTable()
-        except:
-            return []
+    def getVisibleTableRowsAndColumns(self, obj):
+        """Returns the indices of the visible rows of the table obj, and the
+        range of the indices of its columns which are presented."""
 
         try:
             component = obj.queryComponent()
             extents = component.getExtents(pyatspi.DESKTOP_COORDS)
         except:
-            msg = "ERROR: Exception getting extents of %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
-            return []
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting extents of %s", obj, timestamp=True)
+            return [], range(0)
 
         rows = self.visibleRows(obj, extents)
         if not rows:
-            return []
+            return [], range(0)
 
         colStartIndex, colEndIndex = self._getTableRowRange(obj)
-        if colStartIndex == colEndIndex:
+        return rows, range(colStartIndex, colEndIndex)
+
+    def getTableColumnHeaders(self, obj, columns):
+        """Returns the headers of the given columns of the table obj."""
+
+        try:
+            table = obj.queryTable()
+        except:
             return []
 
-        cells = []
-        for col in range(colStartIndex, colEndIndex):
+        headers = []
+        for col in columns:
             colHeader = table.getColumnHeader(col)
             if colHeader:
-                cells.append(colHeader)
-            for row in rows:
-                try:
-                    cell = table.getAccessibleAt(row, col)
-                except:
-                    continue
-                if cell and self.isOnScreen(cell):
-                    cells.append(cell)
+                headers.append(colHeader)
+
+        return headers
+
+    def getVisibleTableCellsInRow(self, obj, row, columns):
+        """Returns the cells in the given columns of the row of the table
+        obj which are on screen."""
+
+        try:
+            table = obj.queryTable()
+        except:
+            return []
+
+        cells = []
+        for col in columns:
+            try:
+                cell = table.getAccessibleAt(row, col)
+            except:
+                continue
+            if cell and self.isOnScreen(cell):
+                cells.append(cell)
+
+        return cells
+
+    def getVisibleTableCells(self, obj):
+        rows, columns = self.getVisibleTableRowsAndColumns(obj)
+        if not (rows and columns):
+            return []
+
+        cells = self.getTableColumnHeaders(obj, columns)
+        for row in rows:
+            cells.extend(self.getVisibleTableCellsInRow(obj, row, columns))
 
         return cells
 
+    def getOnScreenTableExtras(self, obj):
+        """Returns the objects, other than its cells, which are presented
+        along with the table obj when examining what is on screen."""
+
+        return []
+
     def _getTableRowRange(self, obj):
         rowCount, columnCount = self.rowAndColumnCount(obj)
         startIndex, endIndex = 0, columnCount
@@ -3946,8 +4024,9 @@ class Utilities:
         try:
             component = parent.queryComponent()
         except:
-            msg = "ERROR: Exception querying component interface of %s" % parent
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception querying component interface of %s", parent,
+                               timestamp=True)
             return startIndex, endIndex
 
         x, y, width, height = component.getExtents(pyatspi.DESKTOP_COORDS)
@@ -3968,8 +4047,9 @@ class Utilities:
         try:
             table = parent.queryTable()
         except:
-            msg = "ERROR: Exception querying table interface of %s" % parent
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception querying table interface of %s", parent,
+                               timestamp=True)
             return []
 
         row, column = self.coordinatesForCell(obj)
@@ -3984,7 +4064,7 @@ class Utilities:
         for i in range(startIndex, endIndex):
             cell = table.getAccessibleAt(row, i)
             try:
-                showing = cell.getState().contains(pyatspi.STATE_SHOWING)
+                showing = accessible_cache.getState(cell).contains(pyatspi.STATE_SHOWING)
             except:
                 continue
             if showing:
@@ -4003,10 +4083,10 @@ class Utilities:
             return cell
 
         try:
-            state = cell.getState()
+            state = accessible_cache.getState(cell)
         except:
-            msg = "ERROR: Exception getting state of %s" % cell
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting state of %s", cell, timestamp=True)
             return None
 
         if not state().contains(pyatspi.STATE_SHOWING):
@@ -4016,10 +4096,10 @@ class Utilities:
 
     def isLastCell(self, obj):
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except:
-            msg = "ERROR: Exception getting role of %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role of %s", obj, timestamp=True)
             return False
 
         if not role == pyatspi.ROLE_TABLE_CELL:
@@ -4052,27 +4132,27 @@ class Utilities:
 
     def isShowingOrVisible(self, obj):
         try:
-            state = obj.getState()
+            state = accessible_cache.getState(obj)
         except:
-            msg = "ERROR: Exception getting state of %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting state of %s", obj, timestamp=True)
             return False
 
         if state.contains(pyatspi.STATE_SHOWING) \
            or state.contains(pyatspi.STATE_VISIBLE):
             return True
 
-        msg = "INFO: %s is neither showing nor visible" % obj
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "INFO: %s is neither showing nor visible", obj, timestamp=True)
         return False
 
     def isShowingAndVisible(self, obj):
         try:
-            state = obj.getState()
-            role = obj.getRole()
+            state = accessible_cache.getState(obj)
+            role = accessible_cache.getRole(obj)
         except:
-            msg = "ERROR: Exception getting state and role of %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting state and role of %s", obj, timestamp=True)
             return False
 
         if state.contains(pyatspi.STATE_SHOWING) \
@@ -4090,8 +4170,8 @@ class Utilities:
                      pyatspi.ROLE_SEPARATOR]
 
         if role in menuRoles and self.isInOpenMenuBarMenu(obj):
-            msg = "HACK: Treating %s as showing and visible" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "HACK: Treating %s as showing and visible", obj, timestamp=True)
             return True
 
         return False
@@ -4107,9 +4187,9 @@ class Utilities:
 
     def isZombie(self, obj):
         try:
-            index = obj.getIndexInParent()
-            state = obj.getState()
-            role = obj.getRole()
+            index = accessible_cache.getIndexInParent(obj)
+            state = accessible_cache.getState(obj)
+            role = accessible_cache.getRole(obj)
         except:
             debug.println(debug.LEVEL_INFO, "ZOMBIE: %s is null or dead" % obj, True)
             return True
@@ -4140,7 +4220,7 @@ class Utilities:
         # Given an broken table hierarchy, findDescendant can hang. And the
         # reason we're here in the first place is to work around the app or
         # toolkit killing accessibles. There's only so much we can do....
-        if root.getRole() in [pyatspi.ROLE_TABLE, pyatspi.ROLE_EMBEDDED]:
+        if accessible_cache.getRole(root) in [pyatspi.ROLE_TABLE, pyatspi.ROLE_EMBEDDED]:
             return None
 
         isSame = lambda x: x and self.isSameObject(
@@ -4151,12 +4231,14 @@ class Utilities:
             try:
                 replicant = pyatspi.findDescendant(root, isSame)
             except:
-                msg = "INFO: Exception from findDescendant for %s" % root
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "INFO: Exception from findDescendant for %s", root,
+                                   timestamp=True)
                 replicant = None
 
-        msg = "HACK: Returning %s as replicant for Zombie %s" % (replicant, obj)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "HACK: Returning %s as replicant for Zombie %s", replicant, obj,
+                           timestamp=True)
         return replicant
 
     def getFunctionalChildCount(self, obj):
@@ -4200,7 +4282,7 @@ class Utilities:
         if not obj:
             return -1, -1
 
-        isComboBox = obj.getRole() == pyatspi.ROLE_COMBO_BOX
+        isComboBox = accessible_cache.getRole(obj) == pyatspi.ROLE_COMBO_BOX
         if isComboBox:
             selected = self.selectedChildren(obj)
             if selected:
@@ -4209,12 +4291,12 @@ class Utilities:
         parent = self.getFunctionalParent(obj)
         childCount = self.getFunctionalChildCount(parent)
         if childCount > 100 and parent == obj.parent:
-            return obj.getIndexInParent(), childCount
+            return accessible_cache.getIndexInParent(obj), childCount
 
         siblings = self.getFunctionalChildren(parent)
         if len(siblings) < 100 and not pyatspi.utils.findAncestor(obj, isComboBox):
             layoutRoles = [pyatspi.ROLE_SEPARATOR, pyatspi.ROLE_TEAROFF_MENU_ITEM]
-            isNotLayoutOnly = lambda x: not (self.isZombie(x) or x.getRole() in layoutRoles)
+            isNotLayoutOnly = lambda x: not (self.isZombie(x) or accessible_cache.getRole(x) in layoutRoles)
             siblings = list(filter(isNotLayoutOnly, siblings))
         if not (siblings and obj in siblings):
             return -1, -1
@@ -4231,20 +4313,22 @@ class Utilities:
     def getCachedTextSelection(self, obj):
         textSelections = self._script.pointOfReference.get('textSelections', {})
         start, end, string = textSelections.get(hash(obj), (0, 0, ''))
-        msg = "INFO: Cached selection for %s is '%s' (%i, %i)" % (obj, string, start, end)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "INFO: Cached selection for %s is '%s' (%i, %i)", obj, string, start,
+                           end, timestamp=True)
         return start, end, string
 
     def updateCachedTextSelection(self, obj):
         try:
             text = obj.queryText()
         except NotImplementedError:
-            msg = "ERROR: %s doesn't implement AtspiText" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: %s doesn't implement AtspiText", obj, timestamp=True)
             text = None
         except:
-            msg = "ERROR: Exception querying text interface for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception querying text interface for %s", obj,
+                               timestamp=True)
             text = None
 
         if self._script.pointOfReference.get('entireDocumentSelected'):
@@ -4269,8 +4353,9 @@ class Utilities:
             try:
                 start, end = text.getSelection(0)
             except:
-                msg = "ERROR: Exception getting selected text for %s" % obj
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "ERROR: Exception getting selected text for %s", obj,
+                                   timestamp=True)
                 start = end = 0
             if start != end:
                 string = text.getText(start, end)
@@ -4278,8 +4363,9 @@ class Utilities:
                     end -= 1
                     string = string[:-1]
 
-        msg = "INFO: New selection for %s is '%s' (%i, %i)" % (obj, string, start, end)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "INFO: New selection for %s is '%s' (%i, %i)", obj, string, start, end,
+                           timestamp=True)
         textSelections[hash(obj)] = start, end, string
         self._script.pointOfReference['textSelections'] = textSelections
 
@@ -4532,10 +4618,11 @@ class Utilities:
                     return False
 
         try:
-            role = orca_state.locusOfFocus.getRole()
+            role = accessible_cache.getRole(orca_state.locusOfFocus)
         except:
-            msg = "ERROR: Exception getting role for %s" % orca_state.locusOfFocus
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role for %s", orca_state.locusOfFocus,
+                               timestamp=True)
             return False
 
         roles = [pyatspi.ROLE_COLUMN_HEADER,
@@ -4551,11 +4638,12 @@ class Utilities:
             return False
 
         try:
-            role = event.source.getRole()
-            state = event.source.getState()
+            role = accessible_cache.getRole(event.source)
+            state = accessible_cache.getState(event.source)
         except:
-            msg = "ERROR: Exception getting role and state of %s" % event.source
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role and state of %s", event.source,
+                               timestamp=True)
             return False
 
         ignoreRoles = [pyatspi.ROLE_LABEL,
@@ -4652,10 +4740,10 @@ class Utilities:
             return False
 
         try:
-            role = event.source.getRole()
+            role = accessible_cache.getRole(event.source)
         except:
-            msg = "ERROR: Exception getting role of %s" % event.source
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role of %s", event.source, timestamp=True)
             return False
 
         if role == pyatspi.ROLE_PASSWORD_TEXT:
@@ -4671,10 +4759,10 @@ class Utilities:
             return False
 
         try:
-            state = obj.getState()
+            state = accessible_cache.getState(obj)
         except:
-            msg = "ERROR: Exception getting state of %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting state of %s", obj, timestamp=True)
             return False
 
         return state.contains(pyatspi.STATE_EDITABLE)
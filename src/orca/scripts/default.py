@@ -30,11 +30,13 @@ __copyright__ = "Copyright (c) 2004-2009 Sun Microsystems Inc." \
                 "Copyright (c) 2010 Joanmarie Diggs"
 __license__   = "LGPL"
 
+import os
 import time
 
 import pyatspi
 import orca.braille as braille
 import orca.chnames as chnames
+import orca.atspi_profiler as atspi_profiler
 import orca.cmdnames as cmdnames
 import orca.debug as debug
 import orca.eventsynthesizer as eventsynthesizer
@@ -44,6 +46,7 @@ import orca.guilabels as guilabels
 import orca.input_event as input_event
 import orca.keybindings as keybindings
 import orca.messages as messages
+import orca.metrics as metrics
 import orca.orca as orca
 import orca.orca_gui_commandlist as commandlist
 import orca.orca_state as orca_state
@@ -123,6 +126,7 @@ class Script(script.Script):
         self._inSayAll = False
         self._sayAllIsInterrupted = False
         self._sayAllContexts = []
+        self._sayAllLastContext = None
 
         if app:
             app.setCacheMask(
@@ -471,6 +475,11 @@ class Script(script.Script):
                 Script.cycleDebugLevel,
                 cmdnames.CYCLE_DEBUG_LEVEL)
 
+        self.inputEventHandlers["dumpPerformanceMetricsHandler"] = \
+            input_event.InputEventHandler(
+                Script.dumpPerformanceMetrics,
+                cmdnames.DUMP_PERFORMANCE_METRICS)
+
         self.inputEventHandlers["goToPrevBookmark"] = \
             input_event.InputEventHandler(
                 Script.goToPrevBookmark,
@@ -1773,15 +1782,22 @@ class Script(script.Script):
         if self.flatReviewContext:
             if inputEvent and verbosity != settings.VERBOSITY_LEVEL_BRIEF:
                 self.presentMessage(messages.FLAT_REVIEW_STOP)
+            self.flatReviewContext.cancel()
             self.flatReviewContext = None
             self.updateBraille(orca_state.locusOfFocus)
         else:
             if inputEvent and verbosity != settings.VERBOSITY_LEVEL_BRIEF:
                 self.presentMessage(messages.FLAT_REVIEW_START)
-            context = self.getFlatReviewContext()
-            [wordString, x, y, width, height] = \
-                     context.getCurrent(flat_review.Context.WORD)
-            self._reviewCurrentItem(inputEvent, self.targetCursorCell)
+
+            # Examining a large window can take a while, so the zones are
+            # collected from the main loop. Flat review commands given in
+            # the meantime wait for the collection to finish.
+            def _onZonesCollected(context):
+                if context == self.flatReviewContext:
+                    self._reviewCurrentItem(inputEvent, self.targetCursorCell)
+
+            context = self.getFlatReviewContext(wait=False)
+            context.collect(_onZonesCollected)
 
         return True
 
@@ -2057,6 +2073,24 @@ class Script(script.Script):
 
         return True
 
+    def dumpPerformanceMetrics(self, inputEvent=None):
+        filename = os.path.join(_settingsManager.getPrefsDir(),
+                                time.strftime('metrics-%Y-%m-%d-%H:%M:%S.json'))
+        try:
+            metrics.dump(filename)
+            if atspi_profiler.isActive():
+                atspi_profiler.printReport()
+                atspi_profiler.dump(filename.replace('metrics-', 'atspi-calls-'))
+        except:
+            debug.printException(debug.LEVEL_WARNING)
+            self.presentMessage(messages.PERFORMANCE_METRICS_NOT_SAVED)
+            return True
+
+        msg = "INFO: Performance metrics saved to %s" % filename
+        debug.println(debug.LEVEL_INFO, msg, True)
+        self.presentMessage(messages.PERFORMANCE_METRICS_SAVED)
+        return True
+
     def whereAmILink(self, inputEvent=None, link=None):
         link = link or orca_state.locusOfFocus
         if not self.utilities.isLink(link):
@@ -2809,6 +2843,7 @@ class Script(script.Script):
             # recreated.
             #
             if self.flatReviewContext:
+                self.flatReviewContext.cancel()
                 self.flatReviewContext = None
                 self.updateBraille(orca_state.locusOfFocus)
 
@@ -2949,12 +2984,29 @@ class Script(script.Script):
         self.sayAll(None, context.obj, context.endOffset)
         return True
 
+    def _sayAllCompleted(self, context):
+        """Ends the Say All if context is the last one textLines produced.
+        Because utterances are generated ahead of being spoken, textLines
+        finishes before the last of them have been spoken."""
+
+        if context is not self._sayAllLastContext:
+            return
+
+        msg = "DEFAULT: Last SayAll context spoken"
+        debug.println(debug.LEVEL_INFO, msg, True)
+        self._inSayAll = False
+        self._sayAllContexts = []
+        self._sayAllLastContext = None
+
     def __sayAllProgressCallback(self, context, progressType):
         # [[[TODO: WDW - this needs work.  Need to be able to manage
         # the monitoring of progress and couple that with both updating
         # the visual progress of what is being spoken as well as
         # positioning the cursor when speech has stopped.]]]
         #
+        if progressType == speechserver.SayAllContext.COMPLETED:
+            self._sayAllCompleted(context)
+
         try:
             text = context.obj.queryText()
             char = text.getText(context.currentOffset, context.currentOffset+1)
@@ -2979,6 +3031,7 @@ class Script(script.Script):
 
             self._inSayAll = False
             self._sayAllContexts = []
+            self._sayAllLastContext = None
             text.setCaretOffset(context.currentOffset)
         elif progressType == speechserver.SayAllContext.COMPLETED:
             orca.setLocusOfFocus(None, context.obj, notifyScript=False)
@@ -3358,11 +3411,16 @@ class Script(script.Script):
 
         return True
 
-    def getFlatReviewContext(self):
-        """Returns the flat review context, creating one if necessary."""
+    def getFlatReviewContext(self, wait=True):
+        """Returns the flat review context, creating one if necessary.
+
+        Arguments:
+        - wait: if False, the zones of a new context might not yet have
+          been collected (see flat_review.Context.collect()).
+        """
 
         if not self.flatReviewContext:
-            self.flatReviewContext = flat_review.Context(self)
+            self.flatReviewContext = flat_review.Context(self, wait=False)
             self.justEnteredFlatReviewMode = True
 
             # Remember where the cursor currently was
@@ -3372,6 +3430,9 @@ class Script(script.Script):
             #
             self.targetCursorCell = self.getBrailleCursorCell()
 
+        if wait:
+            self.flatReviewContext.waitForZones()
+
         return self.flatReviewContext
 
     def updateBrailleReview(self, targetCursorCell=0):
@@ -3471,6 +3532,7 @@ class Script(script.Script):
         """
 
         self._sayAllIsInterrupted = False
+        self._sayAllLastContext = None
         try:
             text = obj.queryText()
         except:
@@ -3499,7 +3561,10 @@ class Script(script.Script):
         #
         done = False
         while not done:
-            speech.speak(self.speechGenerator.generateContext(obj, priorObj=priorObj))
+            # Lines of the prior object may still be queued to be spoken.
+            #
+            speech.speak(self.speechGenerator.generateContext(obj, priorObj=priorObj),
+                         interrupt=priorObj is obj)
 
             lastEndOffset = -1
             while offset < length:
@@ -3571,8 +3636,12 @@ class Script(script.Script):
             if not moreLines:
                 done = True
 
-        self._inSayAll = False
-        self._sayAllContexts = []
+        # The Say All ends when the last line has been spoken.
+        #
+        if self._sayAllContexts:
+            self._sayAllLastContext = self._sayAllContexts[-1]
+        else:
+            self._inSayAll = False
 
         msg = "DEFAULT: textLines complete. Verifying SayAll status"
         debug.println(debug.LEVEL_INFO, msg, True)
@@ -0,0 +1,173 @@
+# Orca
+#
+# Copyright 2026 Orca Team.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the
+# Free Software Foundation, Inc., Franklin Street, Fifth Floor,
+# Boston MA  02110-1301 USA.
+
+"""A copy of the most recent text of a terminal, kept up to date from the
+text-changed events the terminal emits, so that the lines output by a
+command can be found without querying the terminal for each insertion."""
+
+__id__        = "$Id$"
+__version__   = "$Revision$"
+__date__      = "$Date$"
+__copyright__ = "Copyright (c) 2026 Orca Team."
+__license__   = "LGPL"
+
+from orca import debug
+
+
+class ScreenBuffer:
+    """The last maxChars characters of the text of a terminal. Offsets are
+    those of the terminal's text. The buffer becomes invalid when an event
+    cannot be applied to it, and is then loaded again when next needed."""
+
+    def __init__(self, maxChars):
+        self._maxChars = maxChars
+        self._text = ""
+        self._start = 0
+        self._valid = False
+
+    def __str__(self):
+        return "screen buffer (%i, %i)%s" \
+            % (self._start, self.getCharacterCount(), "" if self._valid else " (invalid)")
+
+    def isValid(self):
+        return self._valid
+
+    def invalidate(self):
+        self._text = ""
+        self._start = 0
+        self._valid = False
+
+    def getCharacterCount(self):
+        """Returns the number of characters in the terminal's text."""
+
+        return self._start + len(self._text)
+
+    def load(self, text):
+        """Copies the last maxChars characters of text, which implements
+        the accessible text interface, into the buffer."""
+
+        try:
+            count = text.characterCount
+            start = max(0, count - self._maxChars)
+            string = text.getText(start, count)
+        except:
+            msg = "ERROR: Exception loading %s" % self
+            debug.println(debug.LEVEL_INFO, msg, True)
+            self.invalidate()
+            return False
+
+        self._text = string
+        self._start = start
+        self._valid = True
+        msg = "TERMINAL: Loaded %s" % self
+        debug.println(debug.LEVEL_INFO, msg, True)
+        return True
+
+    def _trim(self):
+        excess = len(self._text) - self._maxChars
+        if excess > 0:
+            self._text = self._text[excess:]
+            self._start += excess
+
+    def insert(self, offset, string):
+        """Applies the insertion of string at offset. Returns False if it
+        could not be applied, in which case the buffer is now invalid."""
+
+        if not self._valid:
+            return False
+
+        if not self._start <= offset <= self.getCharacterCount():
+            self.invalidate()
+            return False
+
+        i = offset - self._start
+        self._text = self._text[:i] + string + self._text[i:]
+        self._trim()
+        return True
+
+    def delete(self, offset, length):
+        """Applies the deletion of length characters at offset. Returns False
+        if it could not be applied, in which case the buffer is now invalid."""
+
+        if not self._valid:
+            return False
+
+        if offset + length > self.getCharacterCount():
+            self.invalidate()
+            return False
+
+        # Terminals discard their oldest scrollback from the start, which
+        # may be before the start of the buffer.
+        if offset < self._start:
+            self._text = self._text[max(0, offset + length - self._start):]
+            self._start -= min(length, self._start - offset)
+            return True
+
+        i = offset - self._start
+        self._text = self._text[:i] + self._text[i + length:]
+        return True
+
+    def getText(self, start, end):
+        """Returns the text from start to end, or None if it is not all in
+        the buffer."""
+
+        if not self._valid or start < self._start or end > self.getCharacterCount():
+            return None
+
+        return self._text[start - self._start:end - self._start]
+
+    def getLineAtOffset(self, offset):
+        """Returns (line, start, end) for the line containing offset, as
+        getTextAtOffset() with TEXT_BOUNDARY_LINE_START would, or None if
+        the line is not all in the buffer."""
+
+        if not self._valid or not self._start <= offset <= self.getCharacterCount():
+            return None
+
+        i = offset - self._start
+        lineStart = self._text.rfind("\n", 0, i) + 1
+        if not lineStart and self._start:
+            return None
+
+        lineEnd = self._text.find("\n", i)
+        if lineEnd == -1:
+            lineEnd = len(self._text)
+        else:
+            lineEnd += 1
+
+        return self._text[lineStart:lineEnd], self._start + lineStart, self._start + lineEnd
+
+    def getLastLines(self, count):
+        """Returns the last count non-blank lines in the buffer."""
+
+        if not self._valid:
+            return []
+
+        lines = []
+        end = len(self._text)
+        while end > 0 and len(lines) < count:
+            start = self._text.rfind("\n", 0, end) + 1
+            if not start and self._start:
+                break
+            line = self._text[start:end]
+            if line.strip():
+                lines.insert(0, line)
+            end = start - 1
+
+        return lines
@@ -24,9 +24,19 @@ __date__      = "$Date$"
 __copyright__ = "Copyright (c) 2016 Igalia, S.L."
 __license__   = "LGPL"
 
+import pyatspi
+import time
+
+from gi.repository import GLib
+
+from orca import cmdnames
 from orca import debug
+from orca import input_event
+from orca import keybindings
+from orca import messages
 from orca import orca
 from orca import orca_state
+from orca import settings_manager
 from orca import speech
 from orca.scripts import default
 
@@ -34,6 +44,8 @@ from .braille_generator import BrailleGenerator
 from .speech_generator import SpeechGenerator
 from .script_utilities import Utilities
 
+_settingsManager = settings_manager.getManager()
+
 
 class Script(default.Script):
 
@@ -41,12 +53,43 @@ class Script(default.Script):
         super().__init__(app)
         self.presentIfInactive = False
 
+        # The output of the current command which has yet to be presented.
+        self._pendingOutput = []
+        self._pendingOutputSource = None
+        self._pendingOutputLines = 0
+        self._outputSourceId = 0
+        self._lastOutputTime = 0
+
     def deactivate(self):
         """Called when this script is deactivated."""
 
+        self._clearPendingOutput()
         self.utilities.clearCache()
         super().deactivate()
 
+    def setupInputEventHandlers(self):
+        """Defines InputEventHandlers for this script."""
+
+        super().setupInputEventHandlers()
+
+        self.inputEventHandlers["presentNewestOutputHandler"] = \
+            input_event.InputEventHandler(
+                Script.presentNewestOutput,
+                cmdnames.PRESENT_NEWEST_TERMINAL_OUTPUT)
+
+    def getAppKeyBindings(self):
+        """Returns the application-specific keybindings for this script."""
+
+        keyBindings = keybindings.KeyBindings()
+        keyBindings.add(
+            keybindings.KeyBinding(
+                "",
+                keybindings.defaultModifierMask,
+                keybindings.NO_MODIFIER_MASK,
+                self.inputEventHandlers.get("presentNewestOutputHandler")))
+
+        return keyBindings
+
     def getBrailleGenerator(self):
         """Returns the braille generator for this script."""
 
@@ -71,6 +114,8 @@ class Script(default.Script):
     def onTextDeleted(self, event):
         """Callback for object:text-changed:delete accessibility events."""
 
+        self.utilities.updateScreenBuffer(event)
+
         if self.utilities.treatEventAsNoise(event):
             msg = "TERMINAL: Deletion is believed to be noise"
             debug.println(debug.LEVEL_INFO, msg, True)
@@ -81,6 +126,8 @@ class Script(default.Script):
     def onTextInserted(self, event):
         """Callback for object:text-changed:insert accessibility events."""
 
+        self.utilities.updateScreenBuffer(event)
+
         if not self.utilities.treatEventAsCommand(event):
             super().onTextInserted(event)
             return
@@ -88,9 +135,78 @@ class Script(default.Script):
         msg = "TERMINAL: Insertion is believed to be due to terminal command"
         debug.println(debug.LEVEL_INFO, msg, True)
 
-        self.updateBraille(event.source)
-
         newString = self.utilities.insertedText(event)
+        if not _settingsManager.getSetting("terminalOutputBatchTime"):
+            self._presentOutput(event.source, [newString], newString.count("\n") + 1)
+            return
+
+        if self._pendingOutputSource and self._pendingOutputSource != event.source:
+            self._flushPendingOutput()
+
+        self._pendingOutput.append(newString)
+        self._pendingOutputSource = event.source
+        self._pendingOutputLines += event.any_data.count("\n")
+        if self._outputSourceId:
+            return
+
+        delay = _settingsManager.getSetting("terminalOutputBatchTime")
+        interval = _settingsManager.getSetting("terminalOutputInterval")
+        elapsed = int((time.time() - self._lastOutputTime) * 1000)
+        delay = max(delay, interval - elapsed)
+        self._outputSourceId = GLib.timeout_add(delay, self._onOutputTimeout)
+
+    def _onOutputTimeout(self):
+        self._outputSourceId = 0
+        self._flushPendingOutput()
+        return False
+
+    def _clearPendingOutput(self):
+        if self._outputSourceId:
+            GLib.source_remove(self._outputSourceId)
+            self._outputSourceId = 0
+
+        self._pendingOutput = []
+        self._pendingOutputSource = None
+        self._pendingOutputLines = 0
+
+    def _flushPendingOutput(self):
+        output = self._pendingOutput
+        obj = self._pendingOutputSource
+        lines = self._pendingOutputLines + 1
+        self._clearPendingOutput()
+        if output:
+            self._presentOutput(obj, output, lines)
+
+    def _presentOutput(self, obj, output, lines):
+        """Presents the strings in output, inserted into obj by a command,
+        or, if the output has more lines than terminalOutputBurstLines, the
+        number of lines and the last terminalOutputMaxLines of them."""
+
+        self._lastOutputTime = time.time()
+        self.updateBraille(obj)
+
+        burstLines = _settingsManager.getSetting("terminalOutputBurstLines")
+        isBurst = burstLines and lines > burstLines
+        if len(output) == 1 and not isBurst:
+            newString = output[0]
+        else:
+            msg = "TERMINAL: Presenting %i insertions with %i lines" % (len(output), lines)
+            debug.println(debug.LEVEL_INFO, msg, True)
+
+            # Consecutive insertions may be in, and so each contain, the same
+            # line. The screen buffer has each line once.
+            buffer = self.utilities.verifyScreenBuffer(obj)
+            count = lines
+            if isBurst:
+                count = min(lines, _settingsManager.getSetting("terminalOutputMaxLines") or 1)
+            lastLines = buffer.getLastLines(count) if buffer else []
+            if not lastLines:
+                lastLines = "\n".join(output).split("\n")[-count:]
+
+            newString = "\n".join(lastLines)
+            if isBurst:
+                newString = "%s.\n%s" % (messages.linesOfOutput(lines), newString)
+
         if len(newString) == 1:
             self.speakCharacter(newString)
         else:
@@ -101,12 +217,35 @@ class Script(default.Script):
             return
 
         try:
-            text = event.source.queryText()
+            text = obj.queryText()
         except:
             pass
         else:
-            self._saveLastCursorPosition(event.source, text.caretOffset)
-            self.utilities.updateCachedTextSelection(event.source)
+            self._saveLastCursorPosition(obj, text.caretOffset)
+            self.utilities.updateCachedTextSelection(obj)
+
+    def presentNewestOutput(self, inputEvent=None):
+        """Presents the last lines output in the terminal with focus,
+        discarding any output which has yet to be presented."""
+
+        self._clearPendingOutput()
+
+        obj = orca_state.locusOfFocus
+        if not (obj and obj.getRole() == pyatspi.ROLE_TERMINAL):
+            return False
+
+        self._lastOutputTime = time.time()
+        maxLines = _settingsManager.getSetting("terminalOutputMaxLines") or 1
+        buffer = self.utilities.verifyScreenBuffer(obj)
+        lastLines = buffer.getLastLines(maxLines) if buffer else []
+        if not lastLines:
+            self.presentMessage(messages.BLANK)
+            return True
+
+        newString = "\n".join(lastLines)
+        voice = self.speechGenerator.voice(string=newString)
+        speech.speak(newString, voice)
+        return True
 
     def presentKeyboardEvent(self, event):
         if orca_state.learnModeEnabled or not event.isPrintableKey():
@@ -28,21 +28,108 @@ import pyatspi
 import re
 
 from orca import debug
+from orca import event_manager
 from orca import keybindings
 from orca import orca_state
 from orca import script_utilities
 from orca import settings_manager
 
+from .screen_buffer import ScreenBuffer
+
 _settingsManager = settings_manager.getManager()
 
+_TEXT_CHANGED_EVENTS = ["object:text-changed:insert",
+                        "object:text-changed:insert:system",
+                        "object:text-changed:delete",
+                        "object:text-changed:delete:system"]
+
 
 class Utilities(script_utilities.Utilities):
 
     def __init__(self, script):
         super().__init__(script)
+        self._screenBuffers = {}
 
     def clearCache(self):
-        pass
+        self._screenBuffers = {}
+
+    def getScreenBuffer(self, obj, create=True):
+        """Returns the ScreenBuffer of the terminal obj, loading it if it is
+        not valid, or None if create is False and there is no valid one."""
+
+        buffer = self._screenBuffers.get(hash(obj))
+        if buffer and buffer.isValid():
+            return buffer
+
+        if not create:
+            return None
+
+        # The terminal's text already has the changes of the pending events,
+        # which would then be applied to the buffer a second time.
+        if self._hasPendingTextChanges(obj):
+            msg = "TERMINAL: Not loading screen buffer while text changes are pending"
+            debug.println(debug.LEVEL_INFO, msg, True)
+            return None
+
+        try:
+            text = obj.queryText()
+        except:
+            return None
+
+        if not buffer:
+            buffer = ScreenBuffer(_settingsManager.getSetting("terminalBufferSize"))
+            self._screenBuffers[hash(obj)] = buffer
+
+        if not buffer.load(text):
+            return None
+
+        return buffer
+
+    def _hasPendingTextChanges(self, obj):
+        return event_manager.getManager().hasPendingEvents(obj, _TEXT_CHANGED_EVENTS)
+
+    def updateScreenBuffer(self, event):
+        """Applies the text-changed event to the source's screen buffer."""
+
+        buffer = self._screenBuffers.get(hash(event.source))
+        if not buffer or not buffer.isValid():
+            return
+
+        if event.type.startswith("object:text-changed:insert"):
+            applied = buffer.insert(event.detail1, event.any_data)
+        else:
+            applied = buffer.delete(event.detail1, event.detail2)
+
+        if not applied:
+            msg = "TERMINAL: Could not apply %s to %s" % (event.type, buffer)
+            debug.println(debug.LEVEL_INFO, msg, True)
+
+    def verifyScreenBuffer(self, obj):
+        """Returns the ScreenBuffer of the terminal obj, reloading it if its
+        length no longer matches that of the terminal's text, e.g. because
+        events were skipped or discarded."""
+
+        buffer = self.getScreenBuffer(obj)
+        if not buffer:
+            return None
+
+        # Until the pending events are processed, the terminal's text is
+        # expected to be ahead of the buffer.
+        if self._hasPendingTextChanges(obj):
+            return buffer
+
+        try:
+            count = obj.queryText().characterCount
+        except:
+            return buffer
+
+        if count != buffer.getCharacterCount():
+            msg = "TERMINAL: %s does not match length %i" % (buffer, count)
+            debug.println(debug.LEVEL_INFO, msg, True)
+            buffer.invalidate()
+            return self.getScreenBuffer(obj)
+
+        return buffer
 
     def deletedText(self, event):
         match = re.search("\n~", event.any_data)
@@ -74,11 +161,25 @@ class Utilities(script_utilities.Utilities):
         start, end = event.detail1, event.detail1 + len(event.any_data)
         boundary = pyatspi.TEXT_BOUNDARY_LINE_START
 
-        firstLine = text.getTextAtOffset(start, boundary)
+        # The lines are taken from the screen buffer, to which the insertion
+        # has already been applied, so that the terminal is only queried for
+        # the caret offset.
+        buffer = self.verifyScreenBuffer(event.source)
+        if buffer and buffer.getText(start, end) != event.any_data:
+            msg = "TERMINAL: Insertion is not in %s" % buffer
+            debug.println(debug.LEVEL_INFO, msg, True)
+            buffer.invalidate()
+            buffer = None
+
+        def _getLine(offset):
+            line = buffer and buffer.getLineAtOffset(offset)
+            return line or text.getTextAtOffset(offset, boundary)
+
+        firstLine = _getLine(start)
         msg = "TERMINAL: First line of insertion: '%s' (%i, %i)" % firstLine
         debug.println(debug.LEVEL_INFO, msg, True)
 
-        lastLine = text.getTextAtOffset(end - 1, boundary)
+        lastLine = _getLine(end - 1)
         msg = "TERMINAL: Last line of insertion: '%s' (%i, %i)" % lastLine
         debug.println(debug.LEVEL_INFO, msg, True)
 
@@ -87,7 +188,7 @@ class Utilities(script_utilities.Utilities):
             debug.println(debug.LEVEL_INFO, msg, True)
             return event.any_data
 
-        currentLine = text.getTextAtOffset(text.caretOffset, boundary)
+        currentLine = _getLine(text.caretOffset)
         msg = "TERMINAL: Current line: '%s' (%i, %i)" % currentLine
         debug.println(debug.LEVEL_INFO, msg, True)
 
@@ -102,7 +203,9 @@ class Utilities(script_utilities.Utilities):
             if lastLine[0].endswith("\n"):
                 end -= 1
 
-        adjusted = text.getText(start, end)
+        adjusted = buffer and buffer.getText(start, end)
+        if adjusted is None:
+            adjusted = text.getText(start, end)
         if adjusted:
             msg = "TERMINAL: Adjusted insertion: '%s'" % adjusted
             debug.println(debug.LEVEL_INFO, msg, True)
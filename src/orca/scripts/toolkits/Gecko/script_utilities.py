@@ -134,13 +134,16 @@ class Utilities(web.Utilities):
 
     def getOnScreenObjects(self, root, extents=None):
         objects = super().getOnScreenObjects(root, extents)
+        objects.extend(self.getOnScreenTableExtras(root))
+        return objects
 
+    def getOnScreenTableExtras(self, obj):
         # For things like Thunderbird's "Select columns to display" button
-        if root.getRole() == pyatspi.ROLE_TREE_TABLE and root.childCount:
+        if obj.getRole() == pyatspi.ROLE_TREE_TABLE and obj.childCount:
             isExtra = lambda x: x and x.getRole() != pyatspi.ROLE_COLUMN_HEADER
-            objects.extend([x for x in root[0] if isExtra(x)])
+            return [x for x in obj[0] if isExtra(x)]
 
-        return objects
+        return []
 
     def isEditableMessage(self, obj):
         """Returns True if this is an editable message."""
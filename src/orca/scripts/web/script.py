@@ -67,6 +67,7 @@ class Script(default.Script):
         super().__init__(app)
 
         self._sayAllContents = []
+        self._sayAllContentsForContext = {}
         self._inSayAll = False
         self._sayAllIsInterrupted = False
         self._loadingDocumentContent = False
@@ -109,6 +110,7 @@ class Script(default.Script):
         """Called when this script is deactivated."""
 
         self._sayAllContents = []
+        self._sayAllContentsForContext = {}
         self._inSayAll = False
         self._sayAllIsInterrupted = False
         self._loadingDocumentContent = False
@@ -535,6 +537,8 @@ class Script(default.Script):
             return
 
         self._sayAllIsInterrupted = False
+        self._sayAllLastContext = None
+        self._sayAllContentsForContext = {}
 
         sayAllStyle = _settingsManager.getSetting('sayAllStyle')
         sayAllBySentence = sayAllStyle == settings.SAYALL_STYLE_SENTENCE
@@ -568,7 +572,6 @@ class Script(default.Script):
                 contents = self.utilities.getSentenceContentsAtOffset(obj, characterOffset)
             else:
                 contents = self.utilities.getLineContentsAtOffset(obj, characterOffset)
-            self._sayAllContents = contents
             for content in contents:
                 if self.utilities.isInferredLabelForContents(content, contents):
                     continue
@@ -586,6 +589,7 @@ class Script(default.Script):
                     context = speechserver.SayAllContext(
                         obj, element, startOffset, endOffset)
                     self._sayAllContexts.append(context)
+                    self._sayAllContentsForContext[context] = contents
                     yield [context, voices[i]]
 
             lastObj, lastOffset = contents[-1][0], contents[-1][2]
@@ -595,9 +599,13 @@ class Script(default.Script):
 
             done = obj is None
 
-        self._inSayAll = False
-        self._sayAllContents = []
-        self._sayAllContexts = []
+        # The Say All ends when the last line has been spoken.
+        #
+        if self._sayAllContexts:
+            self._sayAllLastContext = self._sayAllContexts[-1]
+        else:
+            self._inSayAll = False
+            self._sayAllContents = []
 
         msg = "WEB: textLines complete. Verifying SayAll status"
         debug.println(debug.LEVEL_INFO, msg, True)
@@ -690,11 +698,24 @@ class Script(default.Script):
         self.sayAll(None, nextObj, nextOffset)
         return True
 
+    def _sayAllCompleted(self, context):
+        if context is self._sayAllLastContext:
+            self._sayAllContents = []
+            self._sayAllContentsForContext = {}
+
+        super()._sayAllCompleted(context)
+
     def __sayAllProgressCallback(self, context, progressType):
         if not self.utilities.inDocumentContent() or self._inFocusMode:
             super().__sayAllProgressCallback(context, progressType)
             return
 
+        # The line being spoken, which lines generated ahead of it have not
+        # yet replaced, is the one to rewind or fast forward from.
+        #
+        self._sayAllContents = \
+            self._sayAllContentsForContext.pop(context, self._sayAllContents)
+
         if progressType == speechserver.SayAllContext.INTERRUPTED:
             if isinstance(orca_state.lastInputEvent, input_event.KeyboardEvent):
                 self._sayAllIsInterrupted = True
@@ -710,11 +731,16 @@ class Script(default.Script):
             self._inSayAll = False
             self._sayAllContents = []
             self._sayAllContexts = []
+            self._sayAllLastContext = None
+            self._sayAllContentsForContext = {}
             return
 
         orca.setLocusOfFocus(None, context.obj, notifyScript=False)
         self.utilities.setCaretContext(context.obj, context.currentOffset)
 
+        if progressType == speechserver.SayAllContext.COMPLETED:
+            self._sayAllCompleted(context)
+
     def inFocusMode(self):
         """ Returns True if we're in focus mode."""
 
@@ -1194,6 +1220,7 @@ class Script(default.Script):
             return False
 
         self.structuralNavigation.clearCache()
+        self.utilities.clearCachedLines(document=event.source)
 
         if self.utilities.getDocumentForObject(event.source.parent):
             msg = "WEB: Ignoring: Event source is nested document"
@@ -1479,9 +1506,11 @@ class Script(default.Script):
 
         document = self.utilities.getDocumentForObject(event.source)
         if document:
-            msg = "WEB: Clearing structural navigation cache for %s" % document
+            msg = "WEB: Updating structural navigation cache for %s" % event.source
             debug.println(debug.LEVEL_INFO, msg, True)
-            self.structuralNavigation.clearCache(document)
+            self.structuralNavigation.updateCache(document, event.source)
+            self.utilities.clearCachedLines(event.source)
+            self.utilities.clearTextSnapshot(event.source)
         else:
             msg = "WEB: Could not get document for event source"
             debug.println(debug.LEVEL_INFO, msg, True)
@@ -1852,13 +1881,13 @@ class Script(default.Script):
 
         msg = "WEB: Clearing content cache due to text deletion"
         debug.println(debug.LEVEL_INFO, msg, True)
-        self.utilities.clearContentCache()
+        self.utilities.clearContentCache(event.source)
 
         document = self.utilities.getDocumentForObject(event.source)
         if document:
-            msg = "WEB: Clearing structural navigation cache for %s" % document
+            msg = "WEB: Updating structural navigation cache for %s" % event.source
             debug.println(debug.LEVEL_INFO, msg, True)
-            self.structuralNavigation.clearCache(document)
+            self.structuralNavigation.updateCache(document, event.source)
 
         state = event.source.getState()
         if not state.contains(pyatspi.STATE_EDITABLE):
@@ -1911,7 +1940,7 @@ class Script(default.Script):
 
         msg = "WEB: Clearing content cache due to text insertion"
         debug.println(debug.LEVEL_INFO, msg, True)
-        self.utilities.clearContentCache()
+        self.utilities.clearContentCache(event.source)
 
         if self.utilities.handleAsLiveRegion(event):
             msg = "WEB: Event to be handled as live region"
@@ -1921,9 +1950,9 @@ class Script(default.Script):
 
         document = self.utilities.getDocumentForObject(event.source)
         if document:
-            msg = "WEB: Clearing structural navigation cache for %s" % document
+            msg = "WEB: Updating structural navigation cache for %s" % event.source
             debug.println(debug.LEVEL_INFO, msg, True)
-            self.structuralNavigation.clearCache(document)
+            self.structuralNavigation.updateCache(document, event.source)
 
         text = self.utilities.queryNonEmptyText(event.source)
         if not text:
@@ -25,10 +25,14 @@ __copyright__ = "Copyright (c) 2010 Joanmarie Diggs." \
                 "Copyright (c) 2014-2015 Igalia, S.L."
 __license__   = "LGPL"
 
+import bisect
 import pyatspi
 import re
 import urllib
 
+from gi.repository import GLib
+
+from orca import accessible_cache
 from orca import debug
 from orca import input_event
 from orca import messages
@@ -43,6 +47,36 @@ _scriptManager = script_manager.getManager()
 _settingsManager = settings_manager.getManager()
 
 
+class TextSnapshot:
+    """The full text of an accessible along with the offsets of its embedded
+    object characters, so that the text need not be fetched repeatedly and
+    the child at an offset can be found without asking the application."""
+
+    def __init__(self, string, eoc):
+        self.string = string
+        self.characterCount = len(string)
+        self.embeddedOffsets = [i for i, char in enumerate(string) if char == eoc]
+
+    def getText(self, startOffset=0, endOffset=-1):
+        if endOffset == -1:
+            endOffset = self.characterCount
+        return self.string[startOffset:endOffset]
+
+    def getChildIndex(self, offset):
+        """Returns the index of the child whose embedded object character is
+        at offset, or -1 if there is no embedded object character there."""
+
+        index = bisect.bisect_left(self.embeddedOffsets, offset)
+        if index < len(self.embeddedOffsets) and self.embeddedOffsets[index] == offset:
+            return index
+        return -1
+
+    def getChildCountBefore(self, offset):
+        """Returns the number of embedded object characters before offset."""
+
+        return bisect.bisect_left(self.embeddedOffsets, offset)
+
+
 class Utilities(script_utilities.Utilities):
 
     def __init__(self, script):
@@ -101,9 +135,10 @@ class Utilities(script_utilities.Utilities):
         self._setsize = {}
         self._currentObjectContents = None
         self._currentSentenceContents = None
-        self._currentLineContents = None
         self._currentWordContents = None
         self._currentCharacterContents = None
+        self._lineCache = []
+        self._linePrefetchId = 0
 
         self._validChildRoles = {pyatspi.ROLE_LIST: [pyatspi.ROLE_LIST_ITEM]}
 
@@ -167,24 +202,154 @@ class Utilities(script_utilities.Utilities):
         self._contextPathsRolesAndNames = {}
         self._cleanupContexts()
         self._priorContexts = {}
+        self.clearTextSnapshot()
 
-    def clearContentCache(self):
+    def clearContentCache(self, obj=None):
         self._currentObjectContents = None
         self._currentSentenceContents = None
-        self._currentLineContents = None
         self._currentWordContents = None
         self._currentCharacterContents = None
         self._currentAttrs = {}
         self._text = {}
+        self.clearTextSnapshot(obj)
+        if obj is None:
+            self._lineCache = []
+        else:
+            self.clearCachedLines(obj)
+
+    def clearTextSnapshot(self, obj=None):
+        """Discards the TextSnapshot of obj, or of all objects."""
+
+        if obj is None:
+            accessible_cache.clear([accessible_cache.TEXT])
+        else:
+            accessible_cache.invalidate(obj, [accessible_cache.TEXT])
+
+    def _getTextSnapshot(self, obj):
+        text = self.queryNonEmptyText(obj)
+        if not text:
+            return None
+
+        return TextSnapshot(text.getText(0, -1), self.EMBEDDED_OBJECT_CHARACTER)
+
+    def getTextSnapshot(self, obj):
+        """Returns a TextSnapshot of the text of obj, or None if obj has no
+        (non-empty) text. The snapshot is kept in the accessible cache, which
+        discards it when any event says the text or children of obj have
+        changed, including the events which are then ignored."""
+
+        try:
+            return accessible_cache.getText(obj, self._getTextSnapshot)
+        except:
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting text of %s", obj, timestamp=True)
+            return None
+
+    def clearCachedLines(self, obj=None, document=None):
+        """Removes the cached lines which contain obj, its ancestors, or its
+        descendants, or all the cached lines in document. If neither is specified, all the
+        cached lines are removed."""
+
+        if obj is None and document is None:
+            self._lineCache = []
+            return
+
+        # Each cached line has the set of its objects and their ancestors, so
+        # only the ancestors of obj need to be obtained.
+        ancestors = set()
+        if obj is not None:
+            ancestors = self._getAncestorSet([obj])
+            if ancestors is None:
+                self._lineCache = []
+                return
+
+        def _isAffected(entry):
+            docHash, layoutMode, contents, objects = entry
+            if document is not None:
+                return docHash == hash(document)
+            return obj in objects or any(x[0] in ancestors for x in contents)
+
+        oldSize = len(self._lineCache)
+        self._lineCache = [x for x in self._lineCache if not _isAffected(x)]
+        debug.printMessage(debug.LEVEL_INFO,
+                           "WEB: Removed %i cached lines for %s",
+                           oldSize - len(self._lineCache), obj or document, timestamp=True)
+
+    def _getAncestorSet(self, objects):
+        """Returns the set of objects and all their ancestors, or None if
+        they cannot be obtained."""
+
+        result = set()
+        try:
+            for obj in objects:
+                while obj and obj not in result:
+                    result.add(obj)
+                    obj = accessible_cache.getParent(obj)
+        except:
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting ancestors of %s", objects,
+                               timestamp=True)
+            return None
+
+        return result
+
+    def _getCachedLine(self, obj, offset, layoutMode):
+        for i, entry in enumerate(self._lineCache):
+            docHash, mode, contents, objects = entry
+            if mode == layoutMode and self.findObjectInContents(obj, offset, contents) != -1:
+                if i != len(self._lineCache) - 1:
+                    self._lineCache.append(self._lineCache.pop(i))
+                return contents
+
+        return None
+
+    def _cacheLine(self, contents, layoutMode):
+        if not contents:
+            return
+
+        objects = self._getAncestorSet([x[0] for x in contents])
+        if objects is None:
+            return
+
+        document = self.getDocumentForObject(contents[0][0])
+        self._lineCache.append([hash(document), layoutMode, contents, objects])
+        del self._lineCache[:-max(1, settings.lineCacheSize)]
+
+    def _scheduleLinePrefetch(self, contents, layoutMode):
+        """Arranges for the lines before and after contents to be cached once
+        Orca is idle, so that moving to them is fast."""
+
+        if self._linePrefetchId:
+            GLib.source_remove(self._linePrefetchId)
+            self._linePrefetchId = 0
+
+        if not contents or settings.lineCacheSize < 3:
+            return
+
+        obj, offset = contents[0][0], contents[0][1]
+        self._linePrefetchId = GLib.idle_add(self._prefetchLines, obj, offset, layoutMode,
+                                             priority=GLib.PRIORITY_LOW)
+
+    def _prefetchLines(self, obj, offset, layoutMode):
+        self._linePrefetchId = 0
+        if self.isZombie(obj):
+            return False
+
+        debug.printMessage(debug.LEVEL_INFO,
+                           "WEB: Prefetching lines around %s, %i", obj, offset, timestamp=True)
+        # Clearing the cached objects is left to the commands the user gives.
+        self.getNextLineContents(obj, offset, layoutMode, prefetch=False, clearCache=False)
+        self.getPreviousLineContents(obj, offset, layoutMode, prefetch=False, clearCache=False)
+        return False
 
     def isDocument(self, obj):
         roles = [pyatspi.ROLE_DOCUMENT_FRAME, pyatspi.ROLE_DOCUMENT_WEB, pyatspi.ROLE_EMBEDDED]
 
         try:
-            rv = obj.getRole() in roles
+            rv = accessible_cache.getRole(obj) in roles
         except:
-            msg = "WEB: Exception getting role for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting role for %s", obj, timestamp=True)
             rv = False
 
         return rv
@@ -232,20 +397,21 @@ class Utilities(script_utilities.Utilities):
         try:
             windowInApp = orca_state.activeWindow in app
         except:
-            msg = "ERROR: Exception checking if %s is in %s" % (orca_state.activeWindow, app)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception checking if %s is in %s", orca_state.activeWindow,
+                               app, timestamp=True)
             windowInApp = False
 
         if windowInApp:
             return True
 
-        msg = "WARNING: %s is not in %s" % (orca_state.activeWindow, app)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "WARNING: %s is not in %s", orca_state.activeWindow, app, timestamp=True)
 
         try:
             script = _scriptManager.getScript(app, orca_state.activeWindow)
-            msg = "WEB: Script for active Window is %s" % script
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Script for active Window is %s", script, timestamp=True)
         except:
             msg = "ERROR: Exception getting script for active window"
             debug.println(debug.LEVEL_INFO, msg, True)
@@ -253,18 +419,18 @@ class Utilities(script_utilities.Utilities):
             if type(script) == type(self._script):
                 attrs = script.getTransferableAttributes()
                 for attr, value in attrs.items():
-                    msg = "WEB: Setting %s to %s" % (attr, value)
-                    debug.println(debug.LEVEL_INFO, msg, True)
+                    debug.printMessage(debug.LEVEL_INFO,
+                                       "WEB: Setting %s to %s", attr, value, timestamp=True)
                     setattr(self._script, attr, value)
 
         window = self.activeWindow(app)
         try:
             self._script.app = window.getApplication()
-            msg = "WEB: updating script's app to %s" % self._script.app
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: updating script's app to %s", self._script.app, timestamp=True)
         except:
-            msg = "ERROR: Exception getting app for %s" % window
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting app for %s", window, timestamp=True)
             return False
 
         orca_state.activeWindow = window
@@ -272,7 +438,7 @@ class Utilities(script_utilities.Utilities):
 
     def documentFrame(self, obj=None):
         if self.sanityCheckActiveWindow():
-            isShowing = lambda x: x and x.getState().contains(pyatspi.STATE_SHOWING)
+            isShowing = lambda x: x and accessible_cache.getState(x).contains(pyatspi.STATE_SHOWING)
             documents = self._getDocumentsEmbeddedBy(orca_state.activeWindow)
             documents = list(filter(isShowing, documents))
             if len(documents) == 1:
@@ -286,11 +452,13 @@ class Utilities(script_utilities.Utilities):
             try:
                 document = documentFrame.queryDocument()
             except NotImplementedError:
-                msg = "WEB: %s does not implement document interface" % documentFrame
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "WEB: %s does not implement document interface", documentFrame,
+                                   timestamp=True)
             except:
-                msg = "ERROR: Exception querying document interface of %s" % documentFrame
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "ERROR: Exception querying document interface of %s",
+                                   documentFrame, timestamp=True)
             else:
                 return document.getAttributeValue('DocURL')
 
@@ -309,11 +477,13 @@ class Utilities(script_utilities.Utilities):
             document = documentFrame.queryDocument()
             attrs = dict([attr.split(":", 1) for attr in document.getAttributes()])
         except NotImplementedError:
-            msg = "WEB: %s does not implement document interface" % documentFrame
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: %s does not implement document interface", documentFrame,
+                               timestamp=True)
         except:
-            msg = "ERROR: Exception getting document attributes of %s" % documentFrame
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting document attributes of %s", documentFrame,
+                               timestamp=True)
         else:
             rv = attrs.get("MimeType")
             msg = "WEB: MimeType of %s is '%s'" % (documentFrame, rv)
@@ -323,11 +493,11 @@ class Utilities(script_utilities.Utilities):
 
     def grabFocusWhenSettingCaret(self, obj):
         try:
-            role = obj.getRole()
-            state = obj.getState()
+            role = accessible_cache.getRole(obj)
+            state = accessible_cache.getState(obj)
         except:
-            msg = "WEB: Exception getting role and state for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting role and state for %s", obj, timestamp=True)
             return False
 
         # To avoid triggering popup lists.
@@ -340,11 +510,12 @@ class Utilities(script_utilities.Utilities):
         try:
             obj.queryComponent().grabFocus()
         except NotImplementedError:
-            msg = "WEB: %s does not implement the component interface" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: %s does not implement the component interface", obj,
+                               timestamp=True)
         except:
-            msg = "WEB: Exception grabbing focus on %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception grabbing focus on %s", obj, timestamp=True)
 
     def setCaretPosition(self, obj, offset, documentFrame=None):
         if self._script.flatReviewContext:
@@ -367,6 +538,7 @@ class Utilities(script_utilities.Utilities):
             self._script.togglePresentationMode(None)
 
         obj.clearCache()
+        accessible_cache.invalidate(obj)
 
         # TODO - JD: This is private.
         self._script._saveFocusedObjectInfo(obj)
@@ -390,7 +562,7 @@ class Utilities(script_utilities.Utilities):
 
         nextObj = None
         while obj and not nextObj:
-            index = obj.getIndexInParent() + 1
+            index = accessible_cache.getIndexInParent(obj) + 1
             if 0 < index < obj.parent.childCount:
                 nextObj = obj.parent[index]
             elif obj.parent != documentFrame:
@@ -414,10 +586,10 @@ class Utilities(script_utilities.Utilities):
                 if self.characterOffsetInParent(child) < offset:
                     return child
 
-        index = obj.getIndexInParent() - 1
+        index = accessible_cache.getIndexInParent(obj) - 1
         if not 0 <= index < obj.parent.childCount:
             obj = obj.parent
-            index = obj.getIndexInParent() - 1
+            index = accessible_cache.getIndexInParent(obj) - 1
 
         previousObj = obj.parent[index]
         while previousObj and previousObj.childCount:
@@ -576,10 +748,10 @@ class Utilities(script_utilities.Utilities):
 
     def isReadOnlyTextArea(self, obj):
         # NOTE: This method is deliberately more conservative than isTextArea.
-        if obj.getRole() != pyatspi.ROLE_ENTRY:
+        if accessible_cache.getRole(obj) != pyatspi.ROLE_ENTRY:
             return False
 
-        state = obj.getState()
+        state = accessible_cache.getState(obj)
         readOnly = state.contains(pyatspi.STATE_FOCUSABLE) \
                    and not state.contains(pyatspi.STATE_EDITABLE)
 
@@ -686,34 +858,37 @@ class Utilities(script_utilities.Utilities):
         except NotImplementedError:
             pass
         except:
-            msg = "WEB: Exception getting range extents for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting range extents for %s", obj, timestamp=True)
             return [0, 0, 0, 0]
 
-        role = obj.getRole()
-        parentRole = obj.parent.getRole()
+        role = accessible_cache.getRole(obj)
+        parentRole = accessible_cache.getRole(obj.parent)
         if role in [pyatspi.ROLE_MENU, pyatspi.ROLE_LIST_ITEM] \
            and parentRole in [pyatspi.ROLE_COMBO_BOX, pyatspi.ROLE_LIST_BOX]:
             try:
                 ext = obj.parent.queryComponent().getExtents(0)
             except NotImplementedError:
-                msg = "WEB: %s does not implement the component interface" % obj.parent
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "WEB: %s does not implement the component interface", obj.parent,
+                                   timestamp=True)
                 return [0, 0, 0, 0]
             except:
-                msg = "WEB: Exception getting extents for %s" % obj.parent
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "WEB: Exception getting extents for %s", obj.parent,
+                                   timestamp=True)
                 return [0, 0, 0, 0]
         else:
             try:
                 ext = obj.queryComponent().getExtents(0)
             except NotImplementedError:
-                msg = "WEB: %s does not implement the component interface" % obj
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "WEB: %s does not implement the component interface", obj,
+                                   timestamp=True)
                 return [0, 0, 0, 0]
             except:
-                msg = "WEB: Exception getting extents for %s" % obj
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "WEB: Exception getting extents for %s", obj, timestamp=True)
                 return [0, 0, 0, 0]
 
         return [ext.x, ext.y, ext.width, ext.height]
@@ -722,21 +897,17 @@ class Utilities(script_utilities.Utilities):
         if not self.inDocumentContent(obj):
             return super().expandEOCs(obj, startOffset, endOffset)
 
-        text = self.queryNonEmptyText(obj)
-        if not text:
+        snapshot = self.getTextSnapshot(obj)
+        if not snapshot:
             return ""
 
-        string = text.getText(startOffset, endOffset)
+        string = snapshot.getText(startOffset, endOffset)
 
         if self.EMBEDDED_OBJECT_CHARACTER in string:
             # If we're not getting the full text of this object, but
             # rather a substring, we need to figure out the offset of
             # the first child within this substring.
-            childOffset = 0
-            for child in obj:
-                if self.characterOffsetInParent(child) >= startOffset:
-                    break
-                childOffset += 1
+            childOffset = snapshot.getChildCountBefore(startOffset)
 
             toBuild = list(string)
             count = toBuild.count(self.EMBEDDED_OBJECT_CHARACTER)
@@ -811,7 +982,7 @@ class Utilities(script_utilities.Utilities):
                  pyatspi.ROLE_PUSH_BUTTON,
                  pyatspi.ROLE_TOGGLE_BUTTON]
 
-        role = obj.getRole()
+        role = accessible_cache.getRole(obj)
         if role in roles:
             rv = True
         elif role in [pyatspi.ROLE_LIST_ITEM, pyatspi.ROLE_TABLE_CELL]:
@@ -843,7 +1014,7 @@ class Utilities(script_utilities.Utilities):
             if not self._script.browseModeIsSticky():
                 doNotQuery.append(pyatspi.ROLE_EMBEDDED)
 
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
             if rv and role in doNotQuery:
                 rv = None
             if rv and excludeNonEntryTextWidgets and self.isNonEntryTextWidget(obj):
@@ -869,7 +1040,7 @@ class Utilities(script_utilities.Utilities):
                  pyatspi.ROLE_PUSH_BUTTON,
                  pyatspi.ROLE_TOGGLE_BUTTON]
 
-        role = obj.getRole()
+        role = accessible_cache.getRole(obj)
         if role in roles:
             return True
 
@@ -939,45 +1110,51 @@ class Utilities(script_utilities.Utilities):
 
     def _getTextAtOffset(self, obj, offset, boundary):
         if not obj:
-            msg = "WEB: Results for text at offset %i for %s using %s:\n" \
-                  "     String: '', Start: 0, End: 0. (obj is None)" % (offset, obj, boundary)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            if debug.isEnabled(debug.LEVEL_INFO):
+                msg = "WEB: Results for text at offset %i for %s using %s:\n" \
+                      "     String: '', Start: 0, End: 0. (obj is None)" % (offset, obj, boundary)
+                debug.println(debug.LEVEL_INFO, msg, True)
             return '', 0, 0
 
         text = self.queryNonEmptyText(obj)
         if not text:
-            msg = "WEB: Results for text at offset %i for %s using %s:\n" \
-                  "     String: '', Start: 0, End: 1. (queryNonEmptyText() returned None)" \
-                  % (offset, obj, boundary)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            if debug.isEnabled(debug.LEVEL_INFO):
+                msg = "WEB: Results for text at offset %i for %s using %s:\n" \
+                      "     String: '', Start: 0, End: 1. (queryNonEmptyText() returned None)" \
+                      % (offset, obj, boundary)
+                debug.println(debug.LEVEL_INFO, msg, True)
             return '', 0, 1
 
+        snapshot = self.getTextSnapshot(obj)
         if boundary == pyatspi.TEXT_BOUNDARY_CHAR:
-            string, start, end = text.getText(offset, offset + 1), offset, offset + 1
-            s = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
-            msg = "WEB: Results for text at offset %i for %s using %s:\n" \
-                  "     String: '%s', Start: %i, End: %i." % (offset, obj, boundary, s, start, end)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            string, start, end = snapshot.getText(offset, offset + 1), offset, offset + 1
+            if debug.isEnabled(debug.LEVEL_INFO):
+                s = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
+                msg = "WEB: Results for text at offset %i for %s using %s:\n" \
+                      "     String: '%s', Start: %i, End: %i." % (offset, obj, boundary, s, start, end)
+                debug.println(debug.LEVEL_INFO, msg, True)
             return string, start, end
 
         if not boundary:
-            string, start, end = text.getText(offset, -1), offset, text.characterCount
-            s = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
-            msg = "WEB: Results for text at offset %i for %s using %s:\n" \
-                  "     String: '%s', Start: %i, End: %i." % (offset, obj, boundary, s, start, end)
-            debug.println(debug.LEVEL_INFO, msg, True)
-            return string, start, end
-
-        if boundary == pyatspi.TEXT_BOUNDARY_SENTENCE_START \
-            and not obj.getState().contains(pyatspi.STATE_EDITABLE):
-            allText = text.getText(0, -1)
-            if obj.getRole() in [pyatspi.ROLE_LIST_ITEM, pyatspi.ROLE_HEADING] \
-               or not (re.search(r"\w", allText) and self.isTextBlockElement(obj)):
-                string, start, end = allText, 0, text.characterCount
+            string, start, end = snapshot.getText(offset, -1), offset, snapshot.characterCount
+            if debug.isEnabled(debug.LEVEL_INFO):
                 s = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
                 msg = "WEB: Results for text at offset %i for %s using %s:\n" \
                       "     String: '%s', Start: %i, End: %i." % (offset, obj, boundary, s, start, end)
                 debug.println(debug.LEVEL_INFO, msg, True)
+            return string, start, end
+
+        if boundary == pyatspi.TEXT_BOUNDARY_SENTENCE_START \
+            and not accessible_cache.getState(obj).contains(pyatspi.STATE_EDITABLE):
+            allText = snapshot.string
+            if accessible_cache.getRole(obj) in [pyatspi.ROLE_LIST_ITEM, pyatspi.ROLE_HEADING] \
+               or not (re.search(r"\w", allText) and self.isTextBlockElement(obj)):
+                string, start, end = allText, 0, snapshot.characterCount
+                if debug.isEnabled(debug.LEVEL_INFO):
+                    s = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
+                    msg = "WEB: Results for text at offset %i for %s using %s:\n" \
+                          "     String: '%s', Start: %i, End: %i." % (offset, obj, boundary, s, start, end)
+                    debug.println(debug.LEVEL_INFO, msg, True)
                 return string, start, end
 
         offset = max(0, offset)
@@ -985,68 +1162,75 @@ class Utilities(script_utilities.Utilities):
 
         # The above should be all that we need to do, but....
         if not self._attemptBrokenTextRecovery(obj, boundary=boundary):
-            s = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
-            msg = "WEB: Results for text at offset %i for %s using %s:\n" \
-                  "     String: '%s', Start: %i, End: %i.\n" \
-                  "     Not checking for broken text." % (offset, obj, boundary, s, start, end)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            if debug.isEnabled(debug.LEVEL_INFO):
+                s = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
+                msg = "WEB: Results for text at offset %i for %s using %s:\n" \
+                      "     String: '%s', Start: %i, End: %i.\n" \
+                      "     Not checking for broken text." % (offset, obj, boundary, s, start, end)
+                debug.println(debug.LEVEL_INFO, msg, True)
             return string, start, end
 
         needSadHack = False
         testString, testStart, testEnd = text.getTextAtOffset(start, boundary)
         if (string, start, end) != (testString, testStart, testEnd):
-            s1 = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
-            s2 = testString.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
-            msg = "FAIL: Bad results for text at offset for %s using %s.\n" \
-                  "      For offset %i - String: '%s', Start: %i, End: %i.\n" \
-                  "      For offset %i - String: '%s', Start: %i, End: %i.\n" \
-                  "      The bug is the above results should be the same.\n" \
-                  "      This very likely needs to be fixed by the toolkit." \
-                  % (obj, boundary, offset, s1, start, end, start, s2, testStart, testEnd)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            if debug.isEnabled(debug.LEVEL_INFO):
+                s1 = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
+                s2 = testString.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
+                msg = "FAIL: Bad results for text at offset for %s using %s.\n" \
+                      "      For offset %i - String: '%s', Start: %i, End: %i.\n" \
+                      "      For offset %i - String: '%s', Start: %i, End: %i.\n" \
+                      "      The bug is the above results should be the same.\n" \
+                      "      This very likely needs to be fixed by the toolkit." \
+                      % (obj, boundary, offset, s1, start, end, start, s2, testStart, testEnd)
+                debug.println(debug.LEVEL_INFO, msg, True)
             needSadHack = True
         elif not string and 0 <= offset < text.characterCount:
-            s1 = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
-            s2 = text.getText(0, -1).replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
-            msg = "FAIL: Bad results for text at offset %i for %s using %s:\n" \
-                  "      String: '%s', Start: %i, End: %i.\n" \
-                  "      The bug is no text reported for a valid offset.\n" \
-                  "      Character count: %i, Full text: '%s'.\n" \
-                  "      This very likely needs to be fixed by the toolkit." \
-                  % (offset, obj, boundary, s1, start, end, text.characterCount, s2)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            if debug.isEnabled(debug.LEVEL_INFO):
+                s1 = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
+                s2 = text.getText(0, -1).replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
+                msg = "FAIL: Bad results for text at offset %i for %s using %s:\n" \
+                      "      String: '%s', Start: %i, End: %i.\n" \
+                      "      The bug is no text reported for a valid offset.\n" \
+                      "      Character count: %i, Full text: '%s'.\n" \
+                      "      This very likely needs to be fixed by the toolkit." \
+                      % (offset, obj, boundary, s1, start, end, text.characterCount, s2)
+                debug.println(debug.LEVEL_INFO, msg, True)
             needSadHack = True
         elif not (start <= offset < end) and not self.isPlainText():
-            s1 = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
-            msg = "FAIL: Bad results for text at offset %i for %s using %s:\n" \
-                  "      String: '%s', Start: %i, End: %i.\n" \
-                  "      The bug is the range returned is outside of the offset.\n" \
-                  "      This very likely needs to be fixed by the toolkit." \
-                  % (offset, obj, boundary, s1, start, end)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            if debug.isEnabled(debug.LEVEL_INFO):
+                s1 = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
+                msg = "FAIL: Bad results for text at offset %i for %s using %s:\n" \
+                      "      String: '%s', Start: %i, End: %i.\n" \
+                      "      The bug is the range returned is outside of the offset.\n" \
+                      "      This very likely needs to be fixed by the toolkit." \
+                      % (offset, obj, boundary, s1, start, end)
+                debug.println(debug.LEVEL_INFO, msg, True)
             needSadHack = True
         elif len(string) < end - start:
-            s1 = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
-            msg = "FAIL: Bad results for text at offset %i for %s using %s:\n" \
-                  "      String: '%s', Start: %i, End: %i.\n" \
-                  "      The bug is that the length of string is less than the text range.\n" \
-                  "      This very likely needs to be fixed by the toolkit." \
-                  % (offset, obj, boundary, s1, start, end)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            if debug.isEnabled(debug.LEVEL_INFO):
+                s1 = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
+                msg = "FAIL: Bad results for text at offset %i for %s using %s:\n" \
+                      "      String: '%s', Start: %i, End: %i.\n" \
+                      "      The bug is that the length of string is less than the text range.\n" \
+                      "      This very likely needs to be fixed by the toolkit." \
+                      % (offset, obj, boundary, s1, start, end)
+                debug.println(debug.LEVEL_INFO, msg, True)
             needSadHack = True
 
         if needSadHack:
             sadString, sadStart, sadEnd = self.__findRange(text, offset, start, end, boundary)
-            s = sadString.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
-            msg = "HACK: Attempting to recover from above failure.\n" \
-                  "      String: '%s', Start: %i, End: %i." % (s, sadStart, sadEnd)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            if debug.isEnabled(debug.LEVEL_INFO):
+                s = sadString.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
+                msg = "HACK: Attempting to recover from above failure.\n" \
+                      "      String: '%s', Start: %i, End: %i." % (s, sadStart, sadEnd)
+                debug.println(debug.LEVEL_INFO, msg, True)
             return sadString, sadStart, sadEnd
 
-        s = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
-        msg = "WEB: Results for text at offset %i for %s using %s:\n" \
-              "     String: '%s', Start: %i, End: %i." % (offset, obj, boundary, s, start, end)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        if debug.isEnabled(debug.LEVEL_INFO):
+            s = string.replace(self.EMBEDDED_OBJECT_CHARACTER, "[OBJ]").replace("\n", "\\n")
+            msg = "WEB: Results for text at offset %i for %s using %s:\n" \
+                  "     String: '%s', Start: %i, End: %i." % (offset, obj, boundary, s, start, end)
+            debug.println(debug.LEVEL_INFO, msg, True)
         return string, start, end
 
     def _getContentsForObj(self, obj, offset, boundary):
@@ -1060,7 +1244,7 @@ class Utilities(script_utilities.Utilities):
                 math = self.getMathAncestor(obj)
             return [[math, 0, 1, '']]
 
-        role = obj.getRole()
+        role = accessible_cache.getRole(obj)
         if role == pyatspi.ROLE_INTERNAL_FRAME and obj.childCount == 1:
             return self._getContentsForObj(obj[0], 0, boundary)
 
@@ -1106,7 +1290,7 @@ class Utilities(script_utilities.Utilities):
 
         boundary = pyatspi.TEXT_BOUNDARY_SENTENCE_START
         objects = self._getContentsForObj(obj, offset, boundary)
-        state = obj.getState()
+        state = accessible_cache.getState(obj)
         if state.contains(pyatspi.STATE_EDITABLE) \
            and state.contains(pyatspi.STATE_FOCUSED):
             return objects
@@ -1241,7 +1425,7 @@ class Utilities(script_utilities.Utilities):
 
         # We want to treat the list item marker as its own word.
         firstObj, firstStart, firstEnd, firstString = objects[0]
-        if firstStart == 0 and firstObj.getRole() == pyatspi.ROLE_LIST_ITEM:
+        if firstStart == 0 and accessible_cache.getRole(firstObj) == pyatspi.ROLE_LIST_ITEM:
             objects = [objects[0]]
 
         if useCache:
@@ -1316,13 +1500,14 @@ class Utilities(script_utilities.Utilities):
         text = self.queryNonEmptyText(obj)
         offset = max(0, offset)
 
-        if useCache:
-            if self.findObjectInContents(obj, offset, self._currentLineContents) != -1:
-                return self._currentLineContents
-
         if layoutMode is None:
             layoutMode = _settingsManager.getSetting('layoutMode')
 
+        if useCache:
+            contents = self._getCachedLine(obj, offset, layoutMode)
+            if contents is not None:
+                return contents
+
         objects = []
         extents = self.getExtents(obj, offset, offset + 1)
 
@@ -1345,7 +1530,7 @@ class Utilities(script_utilities.Utilities):
         objects = self._getContentsForObj(obj, offset, boundary)
         if not layoutMode:
             if useCache:
-                self._currentLineContents = objects
+                self._cacheLine(objects, layoutMode)
             return objects
 
         firstObj, firstStart, firstEnd, firstString = objects[0]
@@ -1401,11 +1586,12 @@ class Utilities(script_utilities.Utilities):
             nextObj, nOffset = self.findNextCaretInOrder(lastObj, lastEnd - 1)
 
         if useCache:
-            self._currentLineContents = objects
+            self._cacheLine(objects, layoutMode)
 
         return objects
 
-    def getPreviousLineContents(self, obj=None, offset=-1, layoutMode=None, useCache=True):
+    def getPreviousLineContents(self, obj=None, offset=-1, layoutMode=None, useCache=True,
+                                    prefetch=True, clearCache=True):
         if obj is None:
             obj, offset = self.getCaretContext()
 
@@ -1414,44 +1600,55 @@ class Utilities(script_utilities.Utilities):
         debug.println(debug.LEVEL_INFO, msg, True)
 
         if obj and self.isZombie(obj):
-            msg = "WEB: Current context obj %s is zombie. Clearing cache." % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            if not clearCache:
+                return []
+
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Current context obj %s is zombie. Clearing cache.", obj,
+                               timestamp=True)
             self.clearCachedObjects()
 
             obj, offset = self.getCaretContext()
-            msg = "WEB: Now Current context is: %s, %i" % (obj, offset)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Now Current context is: %s, %i", obj, offset, timestamp=True)
 
         line = self.getLineContentsAtOffset(obj, offset, layoutMode, useCache)
-        msg = "WEB: Line contents for %s, %i: %s" % (obj, offset, line)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "WEB: Line contents for %s, %i: %s", obj, offset, line, timestamp=True)
 
         if not (line and line[0]):
             return []
 
         firstObj, firstOffset = line[0][0], line[0][1]
-        msg = "WEB: First context on line is: %s, %i" % (firstObj, firstOffset)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "WEB: First context on line is: %s, %i", firstObj, firstOffset,
+                           timestamp=True)
 
         obj, offset = self.previousContext(firstObj, firstOffset, True)
-        if not obj and firstObj:
-            msg = "WEB: Previous context is: %s, %i. Trying again." % (obj, offset)
-            debug.println(debug.LEVEL_INFO, msg, True)
+        if not obj and firstObj and clearCache:
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Previous context is: %s, %i. Trying again.", obj, offset,
+                               timestamp=True)
             self.clearCachedObjects()
             obj, offset = self.previousContext(firstObj, firstOffset, True)
 
-        msg = "WEB: Previous context is: %s, %i" % (obj, offset)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "WEB: Previous context is: %s, %i", obj, offset, timestamp=True)
 
         contents = self.getLineContentsAtOffset(obj, offset, layoutMode, useCache)
         if not contents:
-            msg = "WEB: Could not get line contents for %s, %i" % (obj, offset)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Could not get line contents for %s, %i", obj, offset,
+                               timestamp=True)
             return []
 
+        if useCache and prefetch:
+            self._scheduleLinePrefetch(contents, layoutMode)
+
         return contents
 
-    def getNextLineContents(self, obj=None, offset=-1, layoutMode=None, useCache=True):
+    def getNextLineContents(self, obj=None, offset=-1, layoutMode=None, useCache=True,
+                                prefetch=True, clearCache=True):
         if obj is None:
             obj, offset = self.getCaretContext()
 
@@ -1460,17 +1657,21 @@ class Utilities(script_utilities.Utilities):
         debug.println(debug.LEVEL_INFO, msg, True)
 
         if obj and self.isZombie(obj):
-            msg = "WEB: Current context obj %s is zombie. Clearing cache." % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            if not clearCache:
+                return []
+
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Current context obj %s is zombie. Clearing cache.", obj,
+                               timestamp=True)
             self.clearCachedObjects()
 
             obj, offset = self.getCaretContext()
-            msg = "WEB: Now Current context is: %s, %i" % (obj, offset)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Now Current context is: %s, %i", obj, offset, timestamp=True)
 
         line = self.getLineContentsAtOffset(obj, offset, layoutMode, useCache)
-        msg = "WEB: Line contents for %s, %i: %s" % (obj, offset, line)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "WEB: Line contents for %s, %i: %s", obj, offset, line, timestamp=True)
 
         if not (line and line[0]):
             return []
@@ -1480,31 +1681,38 @@ class Utilities(script_utilities.Utilities):
         if math:
             lastObj, lastOffset = self.lastContext(math)
 
-        msg = "WEB: Last context on line is: %s, %i" % (lastObj, lastOffset)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "WEB: Last context on line is: %s, %i", lastObj, lastOffset,
+                           timestamp=True)
 
         obj, offset = self.nextContext(lastObj, lastOffset, True)
-        if not obj and lastObj:
-            msg = "WEB: Next context is: %s, %i. Trying again." % (obj, offset)
-            debug.println(debug.LEVEL_INFO, msg, True)
+        if not obj and lastObj and clearCache:
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Next context is: %s, %i. Trying again.", obj, offset,
+                               timestamp=True)
             self.clearCachedObjects()
             obj, offset = self.nextContext(lastObj, lastOffset, True)
 
-        msg = "WEB: Next context is: %s, %i" % (obj, offset)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "WEB: Next context is: %s, %i", obj, offset, timestamp=True)
 
         contents = self.getLineContentsAtOffset(obj, offset, layoutMode, useCache)
         if line == contents:
             obj, offset = self.nextContext(obj, offset, True)
-            msg = "WEB: Got same line. Trying again with %s, %i" % (obj, offset)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Got same line. Trying again with %s, %i", obj, offset,
+                               timestamp=True)
             contents = self.getLineContentsAtOffset(obj, offset, layoutMode, useCache)
 
         if not contents:
-            msg = "WEB: Could not get line contents for %s, %i" % (obj, offset)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Could not get line contents for %s, %i", obj, offset,
+                               timestamp=True)
             return []
 
+        if useCache and prefetch:
+            self._scheduleLinePrefetch(contents, layoutMode)
+
         return contents
 
     def hasPresentableText(self, obj):
@@ -1512,7 +1720,11 @@ class Utilities(script_utilities.Utilities):
         if not text:
             return False
 
-        return bool(re.search(r"\w", text.getText(0, -1)))
+        snapshot = self.getTextSnapshot(obj)
+        if not snapshot:
+            return False
+
+        return bool(re.search(r"\w", snapshot.string))
 
     def updateCachedTextSelection(self, obj):
         if not self.inDocumentContent(obj):
@@ -1557,28 +1769,29 @@ class Utilities(script_utilities.Utilities):
 
     def isTopLevelWebApp(self, obj):
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except:
-            msg = "WEB: Exception getting role for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting role for %s", obj, timestamp=True)
             return False
 
         if role == pyatspi.ROLE_EMBEDDED and not self.getDocumentForObject(obj.parent):
             uri = self.documentFrameURI()
             rv = bool(uri and uri.startswith("http"))
-            msg = "WEB: %s is top-level web application: %s (URI: %s)" % (obj, rv, uri)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: %s is top-level web application: %s (URI: %s)", obj, rv, uri,
+                               timestamp=True)
             return rv
 
         return False
 
     def isFocusModeWidget(self, obj):
         try:
-            role = obj.getRole()
-            state = obj.getState()
+            role = accessible_cache.getRole(obj)
+            state = accessible_cache.getState(obj)
         except:
-            msg = "WEB: Exception getting role and state for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting role and state for %s", obj, timestamp=True)
             return False
 
         if state.contains(pyatspi.STATE_EDITABLE) \
@@ -1665,11 +1878,11 @@ class Utilities(script_utilities.Utilities):
             return rv
 
         try:
-            role = obj.getRole()
-            state = obj.getState()
+            role = accessible_cache.getRole(obj)
+            state = accessible_cache.getState(obj)
         except:
-            msg = "WEB: Exception getting role and state for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting role and state for %s", obj, timestamp=True)
             return False
 
         textBlockElements = self._textBlockElementRoles()
@@ -1688,7 +1901,7 @@ class Utilities(script_utilities.Utilities):
         return rv
 
     def _advanceCaretInEmptyObject(self, obj):
-        role = obj.getRole()
+        role = accessible_cache.getRole(obj)
         if role == pyatspi.ROLE_TABLE_CELL and not self.queryNonEmptyText(obj):
             return not self._script._lastCommandWasStructNav
 
@@ -1727,11 +1940,12 @@ class Utilities(script_utilities.Utilities):
             return False
 
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
             childCount = obj.childCount
         except:
-            msg = "WEB: Exception getting role and childCount for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting role and childCount for %s", obj,
+                               timestamp=True)
             return False
 
         if role == pyatspi.ROLE_LIST and offset is not None:
@@ -1748,12 +1962,12 @@ class Utilities(script_utilities.Utilities):
             if not childCount:
                 rv = True
             else:
-                rv = bool([x for x in obj if x and x.getRole() not in validRoles])
+                rv = bool([x for x in obj if x and accessible_cache.getRole(x) not in validRoles])
 
         if not rv:
             validRoles = self._validChildRoles.get(obj.parent)
             if validRoles:
-                rv = bool([x for x in obj.parent if x and x.getRole() not in validRoles])
+                rv = bool([x for x in obj.parent if x and accessible_cache.getRole(x) not in validRoles])
 
         self._treatAsDiv[hash(obj)] = rv
         return rv
@@ -1838,10 +2052,10 @@ class Utilities(script_utilities.Utilities):
 
     def isMathFractionWithoutBar(self, obj):
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except:
-            msg = "ERROR: Exception getting role for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role for %s", obj, timestamp=True)
 
         if role != pyatspi.ROLE_MATH_FRACTION:
             return False
@@ -1910,7 +2124,7 @@ class Utilities(script_utilities.Utilities):
         return self._getTag(obj) in ['mi', 'mn', 'mo', 'mtext', 'ms', 'mspace']
 
     def isMathTopLevel(self, obj):
-        return obj.getRole() == pyatspi.ROLE_MATH
+        return accessible_cache.getRole(obj) == pyatspi.ROLE_MATH
 
     def getMathAncestor(self, obj):
         if not self.isMath(obj):
@@ -2006,13 +2220,13 @@ class Utilities(script_utilities.Utilities):
         if not separator:
             return []
 
-        index = separator.getIndexInParent()
+        index = accessible_cache.getIndexInParent(separator)
         return [obj[i] for i in range(index+1, obj.childCount)]
 
     def getMathPostscripts(self, obj):
         separator = self._getMathPrePostScriptSeparator(obj)
         if separator:
-            index = separator.getIndexInParent()
+            index = accessible_cache.getIndexInParent(separator)
         else:
             index = obj.childCount
 
@@ -2091,7 +2305,7 @@ class Utilities(script_utilities.Utilities):
 
             widget = self.isInferredLabelForContents(x, contents)
             alwaysFilter = [pyatspi.ROLE_RADIO_BUTTON, pyatspi.ROLE_CHECK_BOX]
-            if widget and (inferLabels or widget.getRole() in alwaysFilter):
+            if widget and (inferLabels or accessible_cache.getRole(widget) in alwaysFilter):
                 rv = False
 
             self._shouldFilter[hash(obj)] = rv
@@ -2141,7 +2355,7 @@ class Utilities(script_utilities.Utilities):
         if rv is not None:
             return rv
 
-        isLabel = lambda x: x and x.getRole() == pyatspi.ROLE_LABEL
+        isLabel = lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_LABEL
         rv = pyatspi.findAncestor(obj, isLabel) is not None
         self._isLabelDescendant[hash(obj)] = rv
         return rv
@@ -2154,7 +2368,7 @@ class Utilities(script_utilities.Utilities):
         if rv is not None:
             return rv
 
-        isMenu = lambda x: x and x.getRole() == pyatspi.ROLE_MENU
+        isMenu = lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_MENU
         rv = pyatspi.findAncestor(obj, isMenu) is not None
         self._isMenuDescendant[hash(obj)] = rv
         return rv
@@ -2167,7 +2381,7 @@ class Utilities(script_utilities.Utilities):
         if rv is not None:
             return rv
 
-        isMenu = lambda x: x and x.getRole() == pyatspi.ROLE_TOOL_BAR
+        isMenu = lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_TOOL_BAR
         rv = pyatspi.findAncestor(obj, isMenu) is not None
         self._isToolBarDescendant[hash(obj)] = rv
         return rv
@@ -2181,10 +2395,10 @@ class Utilities(script_utilities.Utilities):
             return rv
 
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except:
-            msg = "ERROR: Exception getting role for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role for %s", obj, timestamp=True)
             return False
 
         if role == pyatspi.ROLE_LIST:
@@ -2236,22 +2450,23 @@ class Utilities(script_utilities.Utilities):
 
     def isDetachedDocument(self, obj):
         docRoles = [pyatspi.ROLE_DOCUMENT_FRAME, pyatspi.ROLE_DOCUMENT_WEB]
-        if (obj and obj.getRole() in docRoles):
+        if (obj and accessible_cache.getRole(obj) in docRoles):
             if obj.parent is None or self.isZombie(obj.parent):
-                msg = "WEB: %s is a detached document" % obj
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "WEB: %s is a detached document", obj, timestamp=True)
                 return True
 
         return False
 
     def iframeForDetachedDocument(self, obj, root=None):
         root = root or self.documentFrame()
-        isIframe = lambda x: x and x.getRole() == pyatspi.ROLE_INTERNAL_FRAME
+        isIframe = lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_INTERNAL_FRAME
         try:
             iframes = pyatspi.findAllDescendants(root, isIframe)
         except:
-            msg = "WEB: Exception getting descendant iframes of %s" % root
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting descendant iframes of %s", root,
+                               timestamp=True)
             return None
 
         for iframe in iframes:
@@ -2259,8 +2474,9 @@ class Utilities(script_utilities.Utilities):
                 # We won't change behavior, but we do want to log all bogosity.
                 self._isBrokenChildParentTree(obj, iframe)
 
-                msg = "WEB: Returning %s as iframe parent of detached %s" % (iframe, obj)
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "WEB: Returning %s as iframe parent of detached %s", iframe, obj,
+                                   timestamp=True)
                 return iframe
 
         return None
@@ -2272,22 +2488,25 @@ class Utilities(script_utilities.Utilities):
         try:
             childIsChildOfParent = child in parent
         except:
-            msg = "WEB: Exception checking if %s is in %s" % (child, parent)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception checking if %s is in %s", child, parent,
+                               timestamp=True)
             childIsChildOfParent = False
         else:
-            msg = "WEB: %s is child of %s: %s" % (child, parent, childIsChildOfParent)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: %s is child of %s: %s", child, parent, childIsChildOfParent,
+                               timestamp=True)
 
         try:
             parentIsParentOfChild = child.parent == parent
         except:
-            msg = "WEB: Exception getting parent of %s" % child
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting parent of %s", child, timestamp=True)
             parentIsParentOfChild = False
         else:
-            msg = "WEB: %s is parent of %s: %s" % (parent, child, parentIsParentOfChild)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: %s is parent of %s: %s", parent, child, parentIsParentOfChild,
+                               timestamp=True)
 
         if parentIsParentOfChild != childIsChildOfParent:
             msg = "FAIL: The above is broken and likely needs to be fixed by the toolkit."
@@ -2351,7 +2570,7 @@ class Utilities(script_utilities.Utilities):
                 continue
 
             ancestor = self.commonAncestor(acc, obj)
-            if ancestor and ancestor.getRole() == pyatspi.ROLE_LABEL:
+            if ancestor and accessible_cache.getRole(ancestor) == pyatspi.ROLE_LABEL:
                 return True
 
         return False
@@ -2365,8 +2584,8 @@ class Utilities(script_utilities.Utilities):
             return rv
 
         rv = False
-        if obj.getRole() == pyatspi.ROLE_LINK \
-           and not obj.getState().contains(pyatspi.STATE_FOCUSABLE) \
+        if accessible_cache.getRole(obj) == pyatspi.ROLE_LINK \
+           and not accessible_cache.getState(obj).contains(pyatspi.STATE_FOCUSABLE) \
            and not 'Action' in pyatspi.listInterfaces(obj):
             rv = True
 
@@ -2380,7 +2599,7 @@ class Utilities(script_utilities.Utilities):
         return self.queryNonEmptyText(obj) is None
 
     def isChromeAlert(self, obj):
-        if not (obj and obj.getRole() == pyatspi.ROLE_ALERT):
+        if not (obj and accessible_cache.getRole(obj) == pyatspi.ROLE_ALERT):
             return False
 
         if self.inDocumentContent(obj):
@@ -2396,7 +2615,7 @@ class Utilities(script_utilities.Utilities):
         while parent and self.isLayoutOnly(parent):
             parent = parent.parent
 
-        return parent.getRole() == pyatspi.ROLE_FRAME
+        return accessible_cache.getRole(parent) == pyatspi.ROLE_FRAME
 
     def isClickableElement(self, obj):
         if not (obj and self.inDocumentContent(obj)):
@@ -2407,7 +2626,7 @@ class Utilities(script_utilities.Utilities):
             return rv
 
         rv = False
-        if not obj.getState().contains(pyatspi.STATE_FOCUSABLE) \
+        if not accessible_cache.getState(obj).contains(pyatspi.STATE_FOCUSABLE) \
            and not self.isFocusModeWidget(obj):
             try:
                 action = obj.queryAction()
@@ -2429,16 +2648,16 @@ class Utilities(script_utilities.Utilities):
             return rv
 
         try:
-            state = obj.getState()
+            state = accessible_cache.getState(obj)
         except:
-            msg = "ERROR: Exception getting state for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting state for %s", obj, timestamp=True)
             return False
 
         if not state.contains(pyatspi.STATE_EDITABLE):
             return False
 
-        isComboBox = lambda x: x and x.getRole() == pyatspi.ROLE_COMBO_BOX
+        isComboBox = lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_COMBO_BOX
         rv = pyatspi.findAncestor(obj, isComboBox) is not None
 
         self._isEditableDescendantOfComboBox[hash(obj)] = rv
@@ -2453,11 +2672,12 @@ class Utilities(script_utilities.Utilities):
             return rv
 
         try:
-            role = obj.getRole()
-            state = obj.getState()
+            role = accessible_cache.getRole(obj)
+            state = accessible_cache.getState(obj)
         except:
-            msg = "ERROR: Exception getting role and state for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting role and state for %s", obj,
+                               timestamp=True)
             return False
 
         rv = False
@@ -2622,7 +2842,7 @@ class Utilities(script_utilities.Utilities):
         if rv is not None:
             return rv
 
-        if obj.getRole() == pyatspi.ROLE_LANDMARK:
+        if accessible_cache.getRole(obj) == pyatspi.ROLE_LANDMARK:
             rv = True
         elif self.isLandmarkRegion(obj):
             rv = bool(obj.name)
@@ -2682,11 +2902,11 @@ class Utilities(script_utilities.Utilities):
         if rv is not None:
             return rv
 
-        role = obj.getRole()
+        role = accessible_cache.getRole(obj)
         if role == pyatspi.ROLE_LINK and not self.isAnchor(obj):
             rv = True
         elif role == pyatspi.ROLE_STATIC \
-           and obj.parent.getRole() == pyatspi.ROLE_LINK \
+           and accessible_cache.getRole(obj.parent) == pyatspi.ROLE_LINK \
            and obj.name and obj.name == obj.parent.name:
             rv = True
         else:
@@ -2703,7 +2923,7 @@ class Utilities(script_utilities.Utilities):
         if rv is not None:
             return rv
 
-        rv = obj.getRole() == pyatspi.ROLE_TOOL_TIP
+        rv = accessible_cache.getRole(obj) == pyatspi.ROLE_TOOL_TIP
 
         self._isNonNavigablePopup[hash(obj)] = rv
         return rv
@@ -2716,12 +2936,13 @@ class Utilities(script_utilities.Utilities):
         if rv is not None:
             return rv
 
-        isCanvas = lambda x: x and x.getRole() == pyatspi.ROLE_CANVAS
+        isCanvas = lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_CANVAS
         try:
             canvases = pyatspi.findAllDescendants(obj, isCanvas)
         except:
-            msg = "WEB: Exception getting descendant canvases of %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting descendant canvases of %s", obj,
+                               timestamp=True)
             rv = False
         else:
             rv = len(list(filter(self.isUselessImage, canvases))) > 0
@@ -2743,7 +2964,7 @@ class Utilities(script_utilities.Utilities):
         if rv is not None:
             return rv
 
-        role = obj.getRole()
+        role = accessible_cache.getRole(obj)
         rv = role == pyatspi.ROLE_IMAGE_MAP
         if rv == False and role == pyatspi.ROLE_IMAGE:
             rv = obj.childCount and obj[0].getRole() == pyatspi.ROLE_LINK
@@ -2777,13 +2998,13 @@ class Utilities(script_utilities.Utilities):
             return rv
 
         rv = True
-        if obj.getRole() not in [pyatspi.ROLE_IMAGE, pyatspi.ROLE_CANVAS]:
+        if accessible_cache.getRole(obj) not in [pyatspi.ROLE_IMAGE, pyatspi.ROLE_CANVAS]:
             rv = False
         if rv and (obj.name or obj.description or obj.childCount):
             rv = False
         if rv and (self.isClickableElement(obj) or self.hasLongDesc(obj)):
             rv = False
-        if rv and obj.parent.getRole() == pyatspi.ROLE_LINK:
+        if rv and accessible_cache.getRole(obj.parent) == pyatspi.ROLE_LINK:
             uri = self.uri(obj.parent)
             if uri and not uri.startswith('javascript'):
                 rv = False
@@ -2813,12 +3034,13 @@ class Utilities(script_utilities.Utilities):
         try:
             childCount = obj.childCount
         except:
-            msg = "WEB: Exception getting childCount for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting childCount for %s", obj, timestamp=True)
             childCount = 0
         if childCount and obj[0] is None:
-            msg = "ERROR: %s reports %i children, but obj[0] is None" % (obj, childCount)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: %s reports %i children, but obj[0] is None", obj, childCount,
+                               timestamp=True)
             rv = True
 
         self._isParentOfNullChild[hash(obj)] = rv
@@ -2883,11 +3105,11 @@ class Utilities(script_utilities.Utilities):
             return rv
 
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
             name = obj.name
         except:
-            msg = "WEB: Exception getting role and name for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting role and name for %s", obj, timestamp=True)
             rv = False
         else:
             if name:
@@ -2937,7 +3159,7 @@ class Utilities(script_utilities.Utilities):
         if not self.inDocumentContent(obj):
             return rv
 
-        rv = list(filter(lambda x: x and x.getRole() == pyatspi.ROLE_LABEL, rv))
+        rv = list(filter(lambda x: x and accessible_cache.getRole(x) == pyatspi.ROLE_LABEL, rv))
         self._actualLabels[hash(obj)] = rv
         return rv
 
@@ -2949,8 +3171,8 @@ class Utilities(script_utilities.Utilities):
         # would look and act like platform native spinners. That's not true for Gecko. And
         # the only thing that's funkier is what we get from WebKitGtk. Try to at least get
         # the two engines into alignment before migrating Epiphany support to the web script.
-        if obj.getState().contains(pyatspi.STATE_EDITABLE) \
-           and obj.parent.getRole() == pyatspi.ROLE_SPIN_BUTTON:
+        if accessible_cache.getState(obj).contains(pyatspi.STATE_EDITABLE) \
+           and accessible_cache.getRole(obj.parent) == pyatspi.ROLE_SPIN_BUTTON:
             return True
 
         return False
@@ -2977,10 +3199,10 @@ class Utilities(script_utilities.Utilities):
             return False
 
         try:
-            role = event.source.getRole()
+            role = accessible_cache.getRole(event.source)
         except:
-            msg = "WEB: Exception getting role for %s" % event.source
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting role for %s", event.source, timestamp=True)
             return False
 
         eType = event.type
@@ -2995,11 +3217,11 @@ class Utilities(script_utilities.Utilities):
         if not self.inDocumentContent(event.source):
             return False
 
-        isListBoxItem = lambda x: x and x.parent and x.parent.getRole() == pyatspi.ROLE_LIST_BOX
-        isMenuItem = lambda x: x and x.parent and x.parent.getRole() == pyatspi.ROLE_MENU
-        isComboBoxItem = lambda x: x and x.parent and x.parent.getRole() == pyatspi.ROLE_COMBO_BOX
+        isListBoxItem = lambda x: x and x.parent and accessible_cache.getRole(x.parent) == pyatspi.ROLE_LIST_BOX
+        isMenuItem = lambda x: x and x.parent and accessible_cache.getRole(x.parent) == pyatspi.ROLE_MENU
+        isComboBoxItem = lambda x: x and x.parent and accessible_cache.getRole(x.parent) == pyatspi.ROLE_COMBO_BOX
 
-        if event.source.getState().contains(pyatspi.STATE_EDITABLE) \
+        if accessible_cache.getState(event.source).contains(pyatspi.STATE_EDITABLE) \
            and event.type.startswith("object:text-"):
             obj, offset = self.getCaretContext()
             if isListBoxItem(obj) or isMenuItem(obj):
@@ -3021,18 +3243,19 @@ class Utilities(script_utilities.Utilities):
             return False
 
         try:
-            focusRole = orca_state.locusOfFocus.getRole()
-            focusState = orca_state.locusOfFocus.getState()
+            focusRole = accessible_cache.getRole(orca_state.locusOfFocus)
+            focusState = accessible_cache.getState(orca_state.locusOfFocus)
         except:
-            msg = "WEB: Exception getting role and state for %s" % orca_state.locusOfFocus
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting role and state for %s",
+                               orca_state.locusOfFocus, timestamp=True)
             return False
 
         try:
-            role = event.source.getRole()
+            role = accessible_cache.getRole(event.source)
         except:
-            msg = "WEB: Exception getting role for %s" % event.source
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting role for %s", event.source, timestamp=True)
             return False
 
         if role in [pyatspi.ROLE_MENU, pyatspi.ROLE_MENU_ITEM] \
@@ -3050,7 +3273,7 @@ class Utilities(script_utilities.Utilities):
             return False
 
         roles = [pyatspi.ROLE_PAGE_TAB, pyatspi.ROLE_PAGE_TAB_LIST]
-        if not event.source.getRole() in roles:
+        if not accessible_cache.getRole(event.source) in roles:
             return False
 
         if self.inDocumentContent(event.source):
@@ -3066,7 +3289,7 @@ class Utilities(script_utilities.Utilities):
             return False
 
         if not self.inDocumentContent(event.source) \
-           or not event.source.getState().contains(pyatspi.STATE_EDITABLE) \
+           or not accessible_cache.getState(event.source).contains(pyatspi.STATE_EDITABLE) \
            or not event.source == orca_state.locusOfFocus:
             return False
 
@@ -3097,7 +3320,7 @@ class Utilities(script_utilities.Utilities):
         if not event.type.startswith("object:text-caret-moved"):
             return False
 
-        if event.source.getState().contains(pyatspi.STATE_EDITABLE):
+        if accessible_cache.getState(event.source).contains(pyatspi.STATE_EDITABLE):
             return False
 
         linkURI = self.uri(orca_state.locusOfFocus)
@@ -3134,11 +3357,11 @@ class Utilities(script_utilities.Utilities):
 
         rv = False
         try:
-            state = obj.getState()
-            role = obj.getRole()
+            state = accessible_cache.getState(obj)
+            role = accessible_cache.getRole(obj)
         except:
-            msg = "WEB: Exception getting state and role for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting state and role for %s", obj, timestamp=True)
             return rv
 
         if state.contains(pyatspi.STATE_EDITABLE):
@@ -3153,12 +3376,14 @@ class Utilities(script_utilities.Utilities):
             hyperlink = obj.queryHyperlink()
             start, end = hyperlink.startIndex, hyperlink.endIndex
         except NotImplementedError:
-            msg = "WEB: %s does not implement the hyperlink interface" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: %s does not implement the hyperlink interface", obj,
+                               timestamp=True)
             return -1, -1
         except:
-            msg = "WEB: Exception getting hyperlink indices for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting hyperlink indices for %s", obj,
+                               timestamp=True)
             return -1, -1
 
         return start, end
@@ -3183,18 +3408,24 @@ class Utilities(script_utilities.Utilities):
         try:
             hypertext = obj.queryHypertext()
         except NotImplementedError:
-            msg = "WEB: %s does not implement the hypertext interface" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: %s does not implement the hypertext interface", obj,
+                               timestamp=True)
             return -1
         except:
-            msg = "WEB: Exception querying hypertext interface for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception querying hypertext interface for %s", obj,
+                               timestamp=True)
             return -1
 
         return hypertext.getLinkIndex(offset)
 
     def getChildAtOffset(self, obj, offset):
-        index = self.getChildIndex(obj, offset)
+        snapshot = self.getTextSnapshot(obj)
+        if snapshot:
+            index = snapshot.getChildIndex(offset)
+        else:
+            index = self.getChildIndex(obj, offset)
         if index == -1:
             return None
 
@@ -3210,10 +3441,10 @@ class Utilities(script_utilities.Utilities):
             return super().getError(obj)
 
         try:
-            state = obj.getState()
+            state = accessible_cache.getState(obj)
         except:
-            msg = "ERROR: Exception getting state for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "ERROR: Exception getting state for %s", obj, timestamp=True)
             return False
 
         if not state.contains(pyatspi.STATE_INVALID_ENTRY):
@@ -3285,8 +3516,8 @@ class Utilities(script_utilities.Utilities):
         try:
             childCount = obj.childCount
         except:
-            msg = "WEB: Exception getting childCount for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting childCount for %s", obj, timestamp=True)
             return True
         if not childCount or self.isParentOfNullChild(obj):
             return True
@@ -3297,7 +3528,7 @@ class Utilities(script_utilities.Utilities):
         if self.isNonNavigableEmbeddedDocument(obj):
             return True
 
-        role = obj.getRole()
+        role = accessible_cache.getRole(obj)
         if role == pyatspi.ROLE_LINK \
            and (self.hasExplicitName(obj) or self.hasUselessCanvasDescendant(obj)):
             return True
@@ -3427,7 +3658,7 @@ class Utilities(script_utilities.Utilities):
         path, oldRole, oldName = self._getCaretContextPathRoleAndName(documentFrame)
         obj = self.getObjectFromPath(path)
         if obj and matchRole:
-            if obj.getRole() != oldRole:
+            if accessible_cache.getRole(obj) != oldRole:
                 obj = None
         if obj and matchName:
             if obj.name != oldName:
@@ -3436,8 +3667,8 @@ class Utilities(script_utilities.Utilities):
             return None, -1
 
         obj, offset = self.findFirstCaretContext(obj, 0)
-        msg = "WEB: Context replicant is %s, %i" % (obj, offset)
-        debug.println(debug.LEVEL_INFO, msg, True)
+        debug.printMessage(debug.LEVEL_INFO,
+                           "WEB: Context replicant is %s, %i", obj, offset, timestamp=True)
         return obj, offset
 
     def getPriorContext(self, documentFrame=None):
@@ -3459,8 +3690,8 @@ class Utilities(script_utilities.Utilities):
         try:
             rv = pyatspi.getPath(obj)
         except:
-            msg = "WEB: Exception getting path for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting path for %s", obj, timestamp=True)
             rv = [-1]
 
         self._paths[hash(obj)] = rv
@@ -3478,11 +3709,11 @@ class Utilities(script_utilities.Utilities):
 
         path = self._getPath(obj)
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
             name = obj.name
         except:
-            msg = "WEB: Exception getting role and name for %s" % obj
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting role and name for %s", obj, timestamp=True)
             role = None
             name = None
 
@@ -3490,10 +3721,11 @@ class Utilities(script_utilities.Utilities):
 
     def findFirstCaretContext(self, obj, offset):
         try:
-            role = obj.getRole()
+            role = accessible_cache.getRole(obj)
         except:
-            msg = "WEB: Exception getting first caret context for %s %i" % (obj, offset)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Exception getting first caret context for %s %i", obj, offset,
+                               timestamp=True)
             return None, -1
 
         lookInChild = [pyatspi.ROLE_LIST,
@@ -3501,8 +3733,9 @@ class Utilities(script_utilities.Utilities):
                        pyatspi.ROLE_TABLE,
                        pyatspi.ROLE_TABLE_ROW]
         if role in lookInChild and obj.childCount and not self.treatAsDiv(obj, offset):
-            msg = "WEB: First caret context for %s, %i will look in child %s" % (obj, offset, obj[0])
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: First caret context for %s, %i will look in child %s", obj,
+                               offset, obj[0], timestamp=True)
             return self.findFirstCaretContext(obj[0], 0)
 
         text = self.queryNonEmptyText(obj)
@@ -3511,30 +3744,36 @@ class Utilities(script_utilities.Utilities):
                and (self.isTextBlockElement(obj) or self.isEmptyAnchor(obj)):
                 nextObj, nextOffset = self.nextContext(obj, offset)
                 if nextObj:
-                    msg = "WEB: First caret context for %s, %i is %s, %i" % (obj, offset, nextObj, nextOffset)
-                    debug.println(debug.LEVEL_INFO, msg, True)
+                    debug.printMessage(debug.LEVEL_INFO,
+                                       "WEB: First caret context for %s, %i is %s, %i", obj, offset,
+                                       nextObj, nextOffset, timestamp=True)
                     return nextObj, nextOffset
 
-            msg = "WEB: First caret context for %s, %i is %s, %i" % (obj, offset, obj, 0)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: First caret context for %s, %i is %s, %i", obj, offset, obj, 0,
+                               timestamp=True)
             return obj, 0
 
-        if offset >= text.characterCount:
-            msg = "WEB: First caret context for %s, %i is %s, %i" % (obj, offset, obj, text.characterCount)
-            debug.println(debug.LEVEL_INFO, msg, True)
-            return obj, text.characterCount
+        snapshot = self.getTextSnapshot(obj)
+        if offset >= snapshot.characterCount:
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: First caret context for %s, %i is %s, %i", obj, offset, obj,
+                               snapshot.characterCount, timestamp=True)
+            return obj, snapshot.characterCount
 
-        allText = text.getText(0, -1)
+        allText = snapshot.string
         offset = max (0, offset)
         if allText[offset] != self.EMBEDDED_OBJECT_CHARACTER:
-            msg = "WEB: First caret context for %s, %i is %s, %i" % (obj, offset, obj, offset)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: First caret context for %s, %i is %s, %i", obj, offset, obj,
+                               offset, timestamp=True)
             return obj, offset
 
         child = self.getChildAtOffset(obj, offset)
         if not child:
-            msg = "WEB: First caret context for %s, %i is %s, %i" % (obj, offset, None, -1)
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: First caret context for %s, %i is %s, %i", obj, offset, None,
+                               -1, timestamp=True)
             return None, -1
 
         return self.findFirstCaretContext(child, 0)
@@ -3547,9 +3786,9 @@ class Utilities(script_utilities.Utilities):
             return None, -1
 
         if not (self.isHidden(obj) or self.isOffScreenLabel(obj) or self.isNonNavigablePopup(obj)):
-            text = self.queryNonEmptyText(obj)
-            if text:
-                allText = text.getText(0, -1)
+            snapshot = self.getTextSnapshot(obj)
+            if snapshot:
+                allText = snapshot.string
                 for i in range(offset + 1, len(allText)):
                     child = self.getChildAtOffset(obj, i)
                     if child and not self.isZombie(child) and not self.isEmptyAnchor(child) \
@@ -3588,12 +3827,13 @@ class Utilities(script_utilities.Utilities):
             if start + 1 == end and 0 <= start < end <= length:
                 return self.findNextCaretInOrder(parent, start)
 
-            index = obj.getIndexInParent() + 1
+            index = accessible_cache.getIndexInParent(obj) + 1
             try:
                 parentChildCount = parent.childCount
             except:
-                msg = "WEB: Exception getting childCount for %s" % parent
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "WEB: Exception getting childCount for %s", parent,
+                                   timestamp=True)
             else:
                 if 0 < index < parentChildCount:
                     return self.findNextCaretInOrder(parent[index], -1)
@@ -3609,9 +3849,9 @@ class Utilities(script_utilities.Utilities):
             return None, -1
 
         if not (self.isHidden(obj) or self.isOffScreenLabel(obj) or self.isNonNavigablePopup(obj)):
-            text = self.queryNonEmptyText(obj)
-            if text:
-                allText = text.getText(0, -1)
+            snapshot = self.getTextSnapshot(obj)
+            if snapshot:
+                allText = snapshot.string
                 if offset == -1 or offset > len(allText):
                     offset = len(allText)
                 for i in range(offset - 1, -1, -1):
@@ -3652,12 +3892,13 @@ class Utilities(script_utilities.Utilities):
             if start + 1 == end and 0 <= start < end <= length:
                 return self.findPreviousCaretInOrder(parent, start)
 
-            index = obj.getIndexInParent() - 1
+            index = accessible_cache.getIndexInParent(obj) - 1
             try:
                 parentChildCount = parent.childCount
             except:
-                msg = "WEB: Exception getting childCount for %s" % parent
-                debug.println(debug.LEVEL_INFO, msg, True)
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "WEB: Exception getting childCount for %s", parent,
+                                   timestamp=True)
             else:
                 if 0 <= index < parentChildCount:
                     return self.findPreviousCaretInOrder(parent[index], -1)
@@ -3680,24 +3921,17 @@ class Utilities(script_utilities.Utilities):
                   'unvisitedLinks': 0}
 
         docframe = self.documentFrame(obj)
-        col = docframe.queryCollection()
-        stateset = pyatspi.StateSet()
         roles = [pyatspi.ROLE_HEADING,
                  pyatspi.ROLE_LINK,
                  pyatspi.ROLE_TABLE,
                  pyatspi.ROLE_FORM,
                  pyatspi.ROLE_SECTION, # We can nuke this when Firefox correcly maps landmarks
                  pyatspi.ROLE_LANDMARK]
-        rule = col.createMatchRule(stateset.raw(), col.MATCH_NONE,
-                                   "", col.MATCH_NONE,
-                                   roles, col.MATCH_ANY,
-                                   "", col.MATCH_NONE,
-                                   False)
-
-        matches = col.getMatches(rule, col.SORT_ORDER_CANONICAL, 0, True)
-        col.freeMatchRule(rule)
-        for obj in matches:
-            role = obj.getRole()
+
+        # The structural navigation objects are located in the same query.
+        objects = self._script.structuralNavigation.scanDocument(docframe, roles)
+        matches = [(x, role) for role in roles for x in objects.get(role, [])]
+        for obj, role in matches:
             if role == pyatspi.ROLE_HEADING:
                 result['headings'] += 1
             elif role == pyatspi.ROLE_FORM:
@@ -3706,7 +3940,7 @@ class Utilities(script_utilities.Utilities):
                 result['tables'] += 1
             elif role == pyatspi.ROLE_LINK:
                 if self.isLink(obj):
-                    if obj.getState().contains(pyatspi.STATE_VISITED):
+                    if accessible_cache.getState(obj).contains(pyatspi.STATE_VISITED):
                         result['visitedLinks'] += 1
                     else:
                         result['unvisitedLinks'] += 1
@@ -3748,8 +3982,9 @@ class Utilities(script_utilities.Utilities):
             return False
 
         if 'Action' in pyatspi.listInterfaces(orca_state.locusOfFocus):
-            msg = "WEB: Treating %s as source of copy" % orca_state.locusOfFocus
-            debug.println(debug.LEVEL_INFO, msg, True)
+            debug.printMessage(debug.LEVEL_INFO,
+                               "WEB: Treating %s as source of copy", orca_state.locusOfFocus,
+                               timestamp=True)
             return True
 
         return False
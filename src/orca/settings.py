@@ -176,6 +176,9 @@ CAPITALIZATION_STYLE_NONE  = "none"
 CAPITALIZATION_STYLE_SPELL = "spell"
 CAPITALIZATION_STYLE_ICON = "icon"
 
+EVENT_OVERFLOW_DROP_OLDEST = "drop-oldest"
+EVENT_OVERFLOW_DROP_NEWEST = "drop-newest"
+
 SAYALL_STYLE_LINE     = 0
 SAYALL_STYLE_SENTENCE = 1
 
@@ -396,6 +399,78 @@ brailleBindingsMap      = {}
 timeoutTime             = 10   # a value of 0 means don't do hang checking
 timeoutCallback         = None # Set by orca.py:init to orca.timeout
 
+# Flood control for object events. Pending events which are superseded
+# by newer ones (e.g. caret moves in the same object) are dropped, bursts
+# of contiguous text insertions are merged, and each application may have
+# at most eventQueueMaxPerApp pending object events. When an application
+# exceeds that limit, eventQueueOverflowPolicy determines which of its
+# background events is discarded; focus and window events are always kept.
+# A value of 0 means no limit.
+coalesceEvents = True
+eventQueueMaxPerApp = 500
+eventQueueOverflowPolicy = EVENT_OVERFLOW_DROP_OLDEST
+
+# Pending input events are processed before focus and window events, which
+# are processed before all other object events, unless the older event has
+# been waiting for longer than eventLaneMaxWait seconds. When the active
+# application changes, the pending background events of the types listed
+# in eventTypesCancelledOnFocusChange from the previous one are discarded.
+# Children-changed and caret-moved events are kept, because scripts update
+# their caches and caret context from them.
+eventLaneMaxWait = 0.5
+eventTypesCancelledOnFocusChange = ["object:text-selection-changed",
+                                    "object:selection-changed",
+                                    "object:bounds-changed",
+                                    "object:visible-data-changed"]
+
+# Whether to record how long events wait and take to process, and how long
+# each generator method takes, so that they can be dumped for analysis.
+# See the metrics module.
+enablePerformanceMetrics = True
+
+# Whether to count and time the calls made to the application for each
+# key press, and the number of calls beyond which a key press is reported
+# in the debug output as too costly. See the atspi_profiler module.
+enableAtspiProfiling = False
+atspiCallBudget = 200
+
+# The number of lines of web content whose contents are cached, so that
+# moving among recently-visited and prefetched lines does not require
+# rebuilding them from the accessibility tree.
+lineCacheSize = 20
+
+# Whether flat review obtains the text and word extents of each zone once,
+# when the zone is first examined, rather than every time it is examined.
+# The text of zones whose objects emit text-changed events is updated.
+flatReviewSnapshot = True
+
+# The number of scripts for applications other than the active one which
+# are kept. When there are more, the least recently used are discarded and
+# created again if their applications are used.
+maxInactiveScripts = 10
+
+# The number of Say All utterances, including the one being spoken, which
+# are kept queued with the speech server, so that there is no pause between
+# utterances while the next one is generated.
+sayAllLookAhead = 3
+
+# The output of a command run in a terminal is collected for
+# terminalOutputBatchTime milliseconds and then presented at once, though
+# not sooner than terminalOutputInterval milliseconds after the previous
+# output was presented. A batch time of 0 presents each insertion as it
+# arrives, and an interval of 0 does not limit how often output is
+# presented. When a batch has more than terminalOutputBurstLines lines,
+# e.g. because a command is flooding the terminal, only their number and
+# the last terminalOutputMaxLines of them are presented; a burst size of 0
+# always presents all of them. The last terminalBufferSize characters of
+# each terminal are mirrored from its events so that the inserted lines
+# can be found without querying it.
+terminalOutputBatchTime = 100
+terminalOutputInterval = 0
+terminalOutputBurstLines = 100
+terminalOutputMaxLines = 3
+terminalBufferSize = 65536
+
 structNavTriggersFocusMode = False
 caretNavTriggersFocusMode = False
 
@@ -31,6 +31,7 @@ __license__   = "LGPL"
 import imp
 import importlib
 import os
+import weakref
 from gi.repository import Gio, GLib
 
 from . import debug
@@ -107,6 +108,14 @@ class SettingsManager(object):
         self._appPronunciations = {}
         self._appKeybindings = {}
 
+        # The names of the settings whose runtime values have changed since
+        # getChangedSettings() was last called, so that only those changes
+        # need to be applied.
+        #
+        self._changedSettings = set()
+        self._appliedPronunciations = None
+        self._appliedKeybindings = weakref.WeakKeyDictionary()
+
         if not self._loadBackend():
             raise Exception('SettingsManager._loadBackend failed.')
 
@@ -354,11 +363,14 @@ class SettingsManager(object):
         and updated the current settings with them."""
 
         oldVoiceLocale = self.getVoiceLocale('default')
+        oldKeybindings = self.profileKeybindings
 
         self.profile = profile
         self._loadProfileSettings(profile)
         self._mergeSettings()
         self._setSettingsRuntime(self.general)
+        if self.profileKeybindings != oldKeybindings:
+            self._changedSettings.add('keybindings')
 
         if not updateLocale:
             return
@@ -370,18 +382,40 @@ class SettingsManager(object):
             orca_i18n.setLocaleForGUI(newVoiceLocale)
 
     def _setSettingsRuntime(self, settingsDict):
+        missing = object()
+        oldValues = {}
         for key, value in settingsDict.items():
-            setattr(settings, str(key), value)
+            key = str(key)
+            oldValues.setdefault(key, getattr(settings, key, missing))
+            setattr(settings, key, value)
         self._getCustomizedSettings()
         for key, value in self.customizedSettings.items():
-            setattr(settings, str(key), value)
+            key = str(key)
+            oldValues.setdefault(key, getattr(settings, key, missing))
+            setattr(settings, key, value)
+
+        changed = set(k for k, v in oldValues.items() if getattr(settings, k) != v)
+        self._changedSettings.update(changed)
+        return changed
 
     def _setPronunciationsRuntime(self, pronunciationsDict):
+        if pronunciationsDict == self._appliedPronunciations:
+            return
+
+        self._appliedPronunciations = pronunciationsDict.copy()
         pronunciation_dict.pronunciation_dict = {}
         for key, value in pronunciationsDict.values():
             if key and value:
                 pronunciation_dict.setPronunciation(key, value)
 
+    def getChangedSettings(self):
+        """Returns the names of the settings whose values have changed since
+        this method was last called, and forgets them. The name 'keybindings'
+        is included if changing the profile changed the key bindings."""
+
+        changed, self._changedSettings = self._changedSettings, set()
+        return changed
+
     def getGeneralSettings(self, profile='default'):
         """Return the current general settings.
         Those settings comes from updating the default settings
@@ -563,7 +597,14 @@ class SettingsManager(object):
         self._mergeSettings()
         self._setSettingsRuntime(self.general)
         self._setPronunciationsRuntime(self.pronunciations)
+
+        # Only rebuild the script's key bindings if the overrides differ
+        # from those it was last given.
+        if self._appliedKeybindings.get(script) == self.profileKeybindings:
+            return
+
         script.keyBindings = self.overrideKeyBindings(script, script.getKeyBindings())
+        self._appliedKeybindings[script] = self.profileKeybindings.copy()
 
 _manager = SettingsManager()
 
@@ -29,6 +29,7 @@ __license__   = "LGPL"
 import importlib
 import time
 
+from . import atspi_profiler
 from . import debug
 from . import logger
 from . import orca_state
@@ -144,6 +145,7 @@ def sayAll(utteranceIterator, progressCallback):
         return
     if _speechserver:
         _speechserver.sayAll(utteranceIterator, progressCallback)
+        atspi_profiler.outputPresented()
     else:
         for [context, acss] in utteranceIterator:
             logLine = "SPEECH OUTPUT: '" + context.utterance + "'"
@@ -172,6 +174,7 @@ def _speak(text, acss, interrupt):
         except:
             pass
         _speechserver.speak(text, __resolveACSS(voice), interrupt)
+        atspi_profiler.outputPresented()
 
 def speak(content, acss=None, interrupt=True):
     """Speaks the given content.  The content can be either a simple
@@ -246,6 +249,7 @@ def speakKeyEvent(event, acss=None):
 
     if _speechserver:
         _speechserver.speakKeyEvent(event, acss)
+        atspi_profiler.outputPresented()
 
 def speakCharacter(character, acss=None):
     """Speaks a single character immediately.
@@ -268,6 +272,7 @@ def speakCharacter(character, acss=None):
 
     if _speechserver:
         _speechserver.speakCharacter(character, acss=acss)
+        atspi_profiler.outputPresented()
 
 def isSpeaking():
     """Returns True if the system is currently speaking."""
@@ -36,6 +36,7 @@ __copyright__ = "Copyright (c) 2006-2008 Brailcom, o.p.s."
 __license__   = "LGPL"
 
 from gi.repository import GLib
+import collections
 import re
 import time
 
@@ -66,8 +67,50 @@ else:
         _speechd_version_ok = True
 
 PUNCTUATION = re.compile(r'[^\w\s]', re.UNICODE)
+
+# The punctuation symbols which Orca, rather than Speech Dispatcher, speaks
+# the names of. See _getVerbalizedSymbolsRE().
+#
+_verbalizedSymbolsRE = None
 ELLIPSIS = re.compile('(\342\200\246|(?<!\\.)\\.{3,4}(?=(\\s|\\Z)))')
 
+def _getVerbalizedSymbolsRE():
+    """Returns a regular expression matching the punctuation symbols whose
+    names Orca speaks itself, i.e. those at LEVEL_NONE, so that all of them
+    can be replaced in a single pass."""
+
+    global _verbalizedSymbolsRE
+    if _verbalizedSymbolsRE is None:
+        symbols = []
+        for symbol, info in punctuation_settings.punctuation.items():
+            if len(symbol) == 1 and PUNCTUATION.match(symbol) \
+               and info[0] == punctuation_settings.LEVEL_NONE:
+                symbols.append(re.escape(symbol))
+        _verbalizedSymbolsRE = re.compile('[%s]' % ''.join(symbols) or '(?!)')
+
+    return _verbalizedSymbolsRE
+
+def _getVerbalizedSymbol(match):
+    symbol = match.group(0)
+    level, action = punctuation_settings.getPunctuationInfo(symbol)
+    charName = " %s " % chnames.getCharacterName(symbol)
+    if action == punctuation_settings.PUNCTUATION_INSERT:
+        charName += symbol
+
+    return charName
+
+class _SayAll:
+    """The progress of one Say All: the iterator producing its utterances,
+    the contexts of those which have been sent to Speech Dispatcher but not
+    yet spoken, and whether it has been interrupted."""
+
+    def __init__(self, iterator, callback):
+        self.iterator = iterator
+        self.callback = callback
+        self.pending = collections.deque()
+        self.exhausted = False
+        self.interrupted = False
+
 class SpeechServer(speechserver.SpeechServer):
     # See the parent class for documentation.
 
@@ -121,6 +164,7 @@ class SpeechServer(speechserver.SpeechServer):
         super(SpeechServer, self).__init__()
         self._id = serverId
         self._client = None
+        self._sayAll = None
         self._current_voice_properties = {}
         self._acss_manipulators = (
             (ACSS.RATE, self._set_rate),
@@ -318,22 +362,10 @@ class SpeechServer(speechserver.SpeechServer):
 
         spokenEllipsis = messages.SPOKEN_ELLIPSIS + " "
         newText = re.sub(ELLIPSIS, spokenEllipsis, oldText)
-        symbols = set(re.findall(PUNCTUATION, newText))
-        for symbol in symbols:
-            try:
-                level, action = punctuation_settings.getPunctuationInfo(symbol)
-            except:
-                continue
-
-            if level != punctuation_settings.LEVEL_NONE:
-                # Speech Dispatcher should handle it.
-                #
-                continue
 
-            charName = " %s " % chnames.getCharacterName(symbol)
-            if action == punctuation_settings.PUNCTUATION_INSERT:
-                charName += symbol
-            newText = re.sub(symbol, charName, newText)
+        # Symbols at other levels are handled by Speech Dispatcher.
+        #
+        newText = _getVerbalizedSymbolsRE().sub(_getVerbalizedSymbol, newText)
 
         if orca_state.activeScript:
             newText = orca_state.activeScript.utilities.adjustForDigits(newText)
@@ -363,34 +395,86 @@ class SpeechServer(speechserver.SpeechServer):
         self._send_command(self._client.speak, text, **kwargs)
 
     def _say_all(self, iterator, orca_callback):
-        """Process another sayAll chunk.
+        """Starts a sayAll. Called by the gidle thread."""
 
-        Called by the gidle thread.
+        self._sayAll = _SayAll(iterator, orca_callback)
+        self._queueSayAllUtterances(self._sayAll)
+        return False # to indicate, that we don't want to be called again.
 
-        """
-        try:
-            context, acss = next(iterator)
-        except StopIteration:
-            pass
-        else:
-            def callback(callbackType, index_mark=None):
-                # This callback is called in Speech Dispatcher listener thread.
-                # No subsequent Speech Dispatcher interaction is allowed here,
-                # so we pass the calls to the gidle thread.
-                t = self._CALLBACK_TYPE_MAP[callbackType]
-                if t == speechserver.SayAllContext.PROGRESS:
-                    if index_mark:
-                        context.currentOffset = int(index_mark)
-                    else:
-                        context.currentOffset = context.startOffset
-                elif t == speechserver.SayAllContext.COMPLETED:
-                    context.currentOffset = context.endOffset
-                GLib.idle_add(orca_callback, context, t)
-                if t == speechserver.SayAllContext.COMPLETED:
-                    GLib.idle_add(self._say_all, iterator, orca_callback)
-            self._speak(context.utterance, acss, callback=callback,
+    def _queueSayAllUtterances(self, sayAll):
+        """Gets utterances from the sayAll's iterator and sends them to
+        Speech Dispatcher until settings.sayAllLookAhead of them are queued,
+        so that the next one is already generated and queued when the
+        current one has been spoken. Called by the gidle thread."""
+
+        if sayAll is not self._sayAll or sayAll.interrupted:
+            return
+
+        lookAhead = max(1, settings.sayAllLookAhead)
+        while not sayAll.exhausted and len(sayAll.pending) < lookAhead:
+            try:
+                context, acss = next(sayAll.iterator)
+            except StopIteration:
+                sayAll.exhausted = True
+                break
+
+            sayAll.pending.append(context)
+            self._speak(context.utterance, acss,
+                        callback=self._getSayAllCallback(sayAll, context),
                         event_types=list(self._CALLBACK_TYPE_MAP.keys()))
-        return False # to indicate, that we don't want to be called again.
+
+    def _getSayAllCallback(self, sayAll, context):
+        def callback(callbackType, index_mark=None):
+            # This callback is called in Speech Dispatcher listener thread.
+            # No subsequent Speech Dispatcher interaction is allowed here,
+            # so we pass the calls to the gidle thread.
+            t = self._CALLBACK_TYPE_MAP[callbackType]
+            if t == speechserver.SayAllContext.PROGRESS:
+                if index_mark:
+                    context.currentOffset = int(index_mark)
+                else:
+                    context.currentOffset = context.startOffset
+            elif t == speechserver.SayAllContext.COMPLETED:
+                context.currentOffset = context.endOffset
+            GLib.idle_add(self._sayAllProgress, sayAll, context, t)
+
+        return callback
+
+    def _sayAllProgress(self, sayAll, context, progressType):
+        """Passes the progress of the sayAll on to its callback. Called by
+        the gidle thread."""
+
+        # Cancelling speech cancels each of the queued utterances. Only the
+        # one being spoken, i.e. the first not yet completed, is reported
+        # as interrupted.
+        #
+        if sayAll.interrupted:
+            return False
+
+        if progressType == speechserver.SayAllContext.INTERRUPTED:
+            sayAll.interrupted = True
+            if sayAll.pending:
+                context = sayAll.pending[0]
+            sayAll.callback(context, progressType)
+            return False
+
+        if progressType == speechserver.SayAllContext.COMPLETED:
+            try:
+                sayAll.pending.remove(context)
+            except ValueError:
+                pass
+
+            # The next utterances are generated before the completion is
+            # reported. The script only learns that context is its last
+            # one when the iterator is exhausted, which, when only one
+            # utterance is queued at a time, is after it has been spoken.
+            #
+            self._queueSayAllUtterances(sayAll)
+            sayAll.callback(context, progressType)
+            return False
+
+        sayAll.callback(context, progressType)
+        return False
 
     def _cancel(self):
         self._send_command(self._client.cancel)
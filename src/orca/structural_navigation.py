@@ -27,7 +27,10 @@ __copyright__ = "Copyright (c) 2005-2009 Sun Microsystems Inc." \
                 "Copyright (c) 2010-2013 The Orca Team"
 __license__   = "LGPL"
 
+import bisect
+import functools
 import pyatspi
+import sys
 
 from . import cmdnames
 from . import debug
@@ -116,6 +119,55 @@ class MatchCriteria:
         for state in states:
             self.states.add(state)
 
+    def isRoleBased(self):
+        """Returns True if only objects with one of the roles in these
+        criteria can match, and the remaining criteria can be checked via
+        matches(). Such criteria can be satisfied from a single collection
+        query for the roles of several structural navigation objects."""
+
+        if not self.roles or self.invert or self.interfaces:
+            return False
+
+        col = self.collection
+        supported = [col.MATCH_ALL, col.MATCH_ANY, col.MATCH_NONE]
+        if self.matchStates not in supported or self.matchObjAttrs not in supported:
+            return False
+
+        return self.matchRoles == col.MATCH_ANY or len(self.roles) == 1
+
+    def _matchesAll(self, matchType, wanted, contains):
+        if not wanted:
+            return True
+        if matchType == self.collection.MATCH_ALL:
+            return all(map(contains, wanted))
+        if matchType == self.collection.MATCH_ANY:
+            return any(map(contains, wanted))
+        return not any(map(contains, wanted))
+
+    def matches(self, role, getState, getAttributes):
+        """Returns True if an object satisfies role-based criteria.
+
+        Arguments:
+        - role: the role of the object
+        - getState: a method which returns the state set of the object
+        - getAttributes: a method which returns the object attributes of
+          the object as a list of "name:value" strings
+        """
+
+        if role not in self.roles:
+            return False
+
+        states = self.states.getStates()
+        if states and not self._matchesAll(self.matchStates, states,
+                                           getState().contains):
+            return False
+
+        if self.objAttrs and not self._matchesAll(self.matchObjAttrs, self.objAttrs,
+                                                  getAttributes().__contains__):
+            return False
+
+        return True
+
 ###########################################################################
 #                                                                         #
 # StructuralNavigationObject                                              #
@@ -524,6 +576,142 @@ class StructuralNavigationObject:
              and direction == "Last":
             return goLastLiveRegion
 
+#############################################################################
+#                                                                           #
+# MatchIndex                                                                #
+#                                                                           #
+#############################################################################
+
+class MatchIndex:
+    """The matches for a StructuralNavigationObject in a document, kept in
+    document order along with their paths so that the match before or after
+    a given object can be found with a binary search, and so that the matches
+    in a subtree which has changed can be replaced without re-querying the
+    entire document."""
+
+    def __init__(self, criteria):
+        self.criteria = criteria
+        self.paths = []
+        self.objects = []
+        self.dirty = {}
+
+    def __len__(self):
+        return len(self.objects)
+
+    @staticmethod
+    def getPath(obj, paths=None):
+        """Returns the path of obj, like pyatspi.utils.getPath, using and
+        updating paths (a dictionary of already-known paths keyed by the
+        hash of the accessible) to avoid asking for the index in parent of
+        ancestors shared by several matches. Raises LookupError if obj is
+        not in the tree."""
+
+        if paths is None:
+            paths = {}
+
+        key = hash(obj)
+        path = paths.get(key)
+        if path is not None:
+            return path
+
+        parent = obj.parent
+        if parent is None:
+            path = []
+        else:
+            index = obj.getIndexInParent()
+            if index < 0:
+                raise LookupError
+            path = MatchIndex.getPath(parent, paths) + [index]
+
+        paths[key] = path
+        return path
+
+    @staticmethod
+    def getMatches(root, criteria):
+        """Returns the accessibles beneath root which satisfy criteria, in
+        canonical (i.e. document) order."""
+
+        col = root.queryCollection()
+        rule = col.createMatchRule(criteria.states.raw(),
+                                   criteria.matchStates,
+                                   criteria.objAttrs,
+                                   criteria.matchObjAttrs,
+                                   criteria.roles,
+                                   criteria.matchRoles,
+                                   criteria.interfaces,
+                                   criteria.matchInterfaces,
+                                   criteria.invert)
+        matches = col.getMatches(rule, col.SORT_ORDER_CANONICAL, 0, True)
+        col.freeMatchRule(rule)
+        return matches
+
+    @staticmethod
+    def _sorted(matches, paths):
+        entries = []
+        for obj in matches:
+            try:
+                entries.append((MatchIndex.getPath(obj, paths), obj))
+            except:
+                continue
+
+        # Collection returns the matches in canonical order, in which case
+        # this is cheap. But we rely upon the order for the binary search.
+        entries.sort(key=lambda x: x[0])
+        return [x[0] for x in entries], [x[1] for x in entries]
+
+    def populate(self, matches):
+        """Replaces the contents of the index with matches."""
+
+        self.paths, self.objects = self._sorted(matches, {})
+
+    def find(self, path):
+        """Returns the index of the match whose path is path, or -1."""
+
+        i = bisect.bisect_left(self.paths, path)
+        if i < len(self.paths) and self.paths[i] == path:
+            return i
+        return -1
+
+    def findAncestorOrSelf(self, path):
+        """Returns the index of the match which is the deepest ancestor of,
+        or the same as, the object whose path is path; or -1."""
+
+        for length in range(len(path), -1, -1):
+            i = self.find(path[:length])
+            if i >= 0:
+                return i
+        return -1
+
+    def subtreeRange(self, path):
+        """Returns the start and end indices of the matches which are
+        descendants of the object whose path is path."""
+
+        start = bisect.bisect_right(self.paths, path)
+        end = bisect.bisect_left(self.paths, path + [sys.maxsize], start)
+        return start, end
+
+    def isStale(self, i):
+        """Returns True if the i-th match is no longer in the tree, or no
+        longer at the path it was found at."""
+
+        try:
+            return self.getPath(self.objects[i]) != self.paths[i]
+        except:
+            return True
+
+    def updateSubtree(self, root):
+        """Replaces the matches which are descendants of root with the
+        current matches beneath root."""
+
+        paths = {}
+        rootPath = self.getPath(root, paths)
+        newPaths, newObjects = self._sorted(self.getMatches(root, self.criteria), paths)
+        descendants = [i for i, path in enumerate(newPaths) if len(path) > len(rootPath)]
+        start, end = self.subtreeRange(rootPath)
+        self.paths[start:end] = [newPaths[i] for i in descendants]
+        self.objects[start:end] = [newObjects[i] for i in descendants]
+        return end - start, len(descendants)
+
 #############################################################################
 #                                                                           #
 # StructuralNavigation                                                      #
@@ -538,6 +726,10 @@ class StructuralNavigation:
     enabled.
     """
 
+    # The number of changed subtrees of a document beyond which its cached
+    # matches are discarded rather than updated.
+    MAX_DIRTY_SUBTREES = 50
+
     # The available object types.
     #
     # Convenience methods have been put into place whereby one can
@@ -670,6 +862,61 @@ class StructuralNavigation:
         else:
             self._objectCache = {}
 
+    def updateCache(self, document, obj):
+        """Marks the cached matches in document beneath obj as out of date,
+        e.g. because the children of obj changed, leaving the rest of the
+        cache intact. They are updated when next needed, so that a flood of
+        changes costs no more than a single update per changed subtree.
+
+        Arguments:
+        - document: the document containing obj
+        - obj: the root of the subtree which changed
+        """
+
+        cache = self._objectCache.get(hash(document))
+        if not cache:
+            return
+
+        if obj == document:
+            self.clearCache(document)
+            return
+
+        for index in cache.values():
+            index.dirty[hash(obj)] = obj
+            if len(index.dirty) > self.MAX_DIRTY_SUBTREES:
+                self.clearCache(document)
+                return
+
+    def _updateIndex(self, cache, key):
+        """Updates the subtrees of the cached MatchIndex for key which have
+        changed, returning the index, or None if it could not be updated."""
+
+        index = cache[key]
+        while index.dirty:
+            obj = index.dirty.pop(next(iter(index.dirty)))
+            try:
+                removed, added = index.updateSubtree(obj)
+            except:
+                debug.printMessage(debug.LEVEL_INFO,
+                                   "STRUCTURAL NAVIGATION: Dropping %s matches: " \
+                                   "could not update subtree of %s", key, obj, timestamp=True)
+                del cache[key]
+                return None
+
+            debug.printMessage(debug.LEVEL_INFO,
+                               "STRUCTURAL NAVIGATION: Updated %s matches beneath %s " \
+                               "(%i removed, %i added)", key, obj, removed, added, timestamp=True)
+
+        return index
+
+    def _dropIndex(self, structuralNavigationObject, arg=None):
+        """Discards the cached matches for structuralNavigationObject in the
+        current document, so that they are located again when next needed."""
+
+        document = self._script.utilities.documentFrame()
+        cache = self._objectCache.get(hash(document), {})
+        cache.pop("%s:%s" % (structuralNavigationObject.objType, arg), None)
+
     def structuralNavigationObjectCreator(self, name):
         """This convenience method creates a StructuralNavigationObject
         with the specified name and associated characteristics. (See the
@@ -854,36 +1101,111 @@ class StructuralNavigation:
             arg = [rowDiff, colDiff, oldRowHeaders, oldColHeaders]
             structuralNavigationObject.present(cell, arg)
 
-    def _getAll(self, structuralNavigationObject, arg=None):
-        """Returns all the instances of structuralNavigationObject."""
+    def _getIndex(self, structuralNavigationObject, arg=None):
+        """Returns the MatchIndex of all the instances of
+        structuralNavigationObject in the current document, or None if
+        structuralNavigationObject cannot be located via collection."""
+
         if not structuralNavigationObject.criteria:
-            return [], None
+            return None
 
         document = self._script.utilities.documentFrame()
-        cache = self._objectCache.get(hash(document), {})
+        if not self._objectCache.get(hash(document)):
+            self.scanDocument(document)
+
+        cache = self._objectCache.setdefault(hash(document), {})
         key = "%s:%s" % (structuralNavigationObject.objType, arg)
-        matches, criteria = cache.get(key, ([], None))
-        if matches:
-            return matches.copy(), criteria
+        if key in cache:
+            index = self._updateIndex(cache, key)
+            if index is not None:
+                return index
 
         col = document.queryCollection()
         criteria = structuralNavigationObject.criteria(col, arg)
-        rule = col.createMatchRule(criteria.states.raw(),
-                                   criteria.matchStates,
-                                   criteria.objAttrs,
-                                   criteria.matchObjAttrs,
-                                   criteria.roles,
-                                   criteria.matchRoles,
-                                   criteria.interfaces,
-                                   criteria.matchInterfaces,
-                                   criteria.invert)
+        index = MatchIndex(criteria)
+        index.populate(MatchIndex.getMatches(document, criteria))
+        cache[key] = index
+        return index
+
+    def scanDocument(self, document, roles=[]):
+        """Locates, in a single collection query, all the instances in
+        document of the enabled structural navigation objects whose criteria
+        are role-based, and caches them. This is much faster than a query
+        per object type for large documents.
+
+        Arguments:
+        - document: the document to scan
+        - roles: additional roles of interest to the caller
+
+        Returns a dictionary of the objects with the additional roles, in
+        document order, keyed by role.
+        """
+
+        col = document.queryCollection()
+        indices = {}
+        for objType, structuralNavigationObject in self.enabledObjects.items():
+            if not structuralNavigationObject.criteria:
+                continue
+            criteria = structuralNavigationObject.criteria(col, None)
+            if criteria.isRoleBased():
+                indices["%s:%s" % (objType, None)] = MatchIndex(criteria)
+
+        allRoles = set(roles)
+        for index in indices.values():
+            allRoles.update(index.criteria.roles)
+        if not allRoles:
+            return {}
+
+        stateset = pyatspi.StateSet()
+        rule = col.createMatchRule(stateset.raw(), col.MATCH_NONE,
+                                   "", col.MATCH_NONE,
+                                   list(allRoles), col.MATCH_ANY,
+                                   "", col.MATCH_NONE,
+                                   False)
         matches = col.getMatches(rule, col.SORT_ORDER_CANONICAL, 0, True)
         col.freeMatchRule(rule)
 
-        rv = matches.copy(), criteria
-        cache[key] = matches, criteria
-        self._objectCache[hash(document)] = cache
-        return rv
+        buckets = {key: [] for key in indices}
+        result = {role: [] for role in roles}
+        for obj in matches:
+            try:
+                role = obj.getRole()
+            except:
+                continue
+
+            if role in result:
+                result[role].append(obj)
+
+            getState = functools.lru_cache(maxsize=None)(obj.getState)
+            getAttributes = functools.lru_cache(maxsize=None)(obj.getAttributes)
+            for key, index in indices.items():
+                try:
+                    if index.criteria.matches(role, getState, getAttributes):
+                        buckets[key].append(obj)
+                except:
+                    continue
+
+        cache = self._objectCache.setdefault(hash(document), {})
+        for key, index in indices.items():
+            index.populate(buckets[key])
+            cache[key] = index
+
+        if debug.isEnabled(debug.LEVEL_INFO):
+            counts = ", ".join(["%s: %i" % (key, len(x)) for key, x in sorted(indices.items())])
+            msg = "STRUCTURAL NAVIGATION: Scanned %s (%i matches). %s" % \
+                (document, len(matches), counts)
+            debug.println(debug.LEVEL_INFO, msg, True)
+
+        return result
+
+    def _getAll(self, structuralNavigationObject, arg=None):
+        """Returns all the instances of structuralNavigationObject."""
+
+        index = self._getIndex(structuralNavigationObject, arg)
+        if index is None:
+            return [], None
+
+        return index.objects.copy(), index.criteria
 
     def goEdge(self, structuralNavigationObject, isStart, container=None, arg=None):
         if container is None:
@@ -934,13 +1256,48 @@ class StructuralNavigation:
           is needed and passed in as arg.
         """
 
-        matches, criteria = list(self._getAll(structuralNavigationObject, arg))
-        if not matches:
+        index = self._getIndex(structuralNavigationObject, arg)
+        if not index:
             structuralNavigationObject.present(None, arg)
             return
 
-        if not isNext:
-            matches.reverse()
+        offset = 0
+        if not obj:
+            obj, offset = self._script.utilities.getCaretContext()
+
+        i, wrapped = self._findObject(structuralNavigationObject, index, isNext, obj, offset)
+
+        # The removal of document content is not reported to us, so a match
+        # which has since been removed or moved is only noticed when we land
+        # on it. In that case, the matches are located again.
+        if i >= 0 and index.isStale(i):
+            debug.printMessage(debug.LEVEL_INFO,
+                               "STRUCTURAL NAVIGATION: %s is stale. Locating matches again.",
+                               index.objects[i], timestamp=True)
+            self._dropIndex(structuralNavigationObject, arg)
+            index = self._getIndex(structuralNavigationObject, arg)
+            i, wrapped = -1, False
+            if index:
+                i, wrapped = self._findObject(structuralNavigationObject, index,
+                                              isNext, obj, offset)
+
+        if wrapped and not isNext:
+            self._script.presentMessage(messages.WRAPPING_TO_BOTTOM)
+        elif wrapped:
+            self._script.presentMessage(messages.WRAPPING_TO_TOP)
+
+        if i < 0:
+            structuralNavigationObject.present(None, arg)
+            return
+
+        structuralNavigationObject.present(index.objects[i], arg)
+
+    def _findObject(self, structuralNavigationObject, index, isNext, obj, offset):
+        """Returns (i, wrapped), where i is the index in index of the next
+        or previous valid match relative to offset in obj, or -1, and wrapped
+        is True if the search wrapped around the document."""
+
+        criteria = index.criteria
 
         def _isValidMatch(obj):
             if self._script.utilities.isHidden(obj) or self._script.utilities.isEmpty(obj):
@@ -949,54 +1306,52 @@ class StructuralNavigation:
                 return True
             return structuralNavigationObject.predicate(obj)
 
-        def _getMatchingObjAndIndex(obj):
-            while obj:
-                if obj in matches:
-                    return obj, matches.index(obj)
-                obj = obj.parent
-
-            return None, -1
-
-        if not obj:
-            obj, offset = self._script.utilities.getCaretContext()
-        thisObj, index = _getMatchingObjAndIndex(obj)
-        if thisObj:
-            matches = matches[index:]
-            obj = thisObj
-
-        currentPath = pyatspi.utils.getPath(obj)
-        for i, match in enumerate(matches):
-            if not _isValidMatch(match):
-                continue
-
-            if match.parent == obj:
+        try:
+            currentPath = pyatspi.utils.getPath(obj)
+        except:
+            currentPath = None
+
+        # The matches are in document order, so the candidates are the ones
+        # after (or before) the current object. If the current object is
+        # inside a match, we move relative to that match. Otherwise, the
+        # children of the current object which are embedded after (or before)
+        # the caret are candidates too.
+        if currentPath is None:
+            candidates = range(len(index)) if isNext else range(len(index) - 1, -1, -1)
+        else:
+            i = index.findAncestorOrSelf(currentPath)
+            if i >= 0:
+                currentPath = index.paths[i]
+                start, end = i, i
+            else:
+                start, end = index.subtreeRange(currentPath)
+            if isNext:
+                candidates = range(start, len(index))
+            else:
+                candidates = range(end - 1, -1, -1)
+
+        for i in candidates:
+            match = index.objects[i]
+            path = index.paths[i]
+            if currentPath is None:
+                comparison = 1 if isNext else -1
+            elif path[:-1] == currentPath:
                 comparison = self._script.utilities.characterOffsetInParent(match) - offset
             else:
-                path = pyatspi.utils.getPath(match)
                 comparison = self._script.utilities.pathComparison(path, currentPath)
             if (comparison > 0 and isNext) or (comparison < 0 and not isNext):
-                structuralNavigationObject.present(match, arg)
-                return
+                if _isValidMatch(match):
+                    return i, False
 
         if not settings.wrappedStructuralNavigation:
-            structuralNavigationObject.present(None, arg)
-            return
+            return -1, False
 
-        if not isNext:
-            self._script.presentMessage(messages.WRAPPING_TO_BOTTOM)
-        else:
-            self._script.presentMessage(messages.WRAPPING_TO_TOP)
-
-        matches, criteria = list(self._getAll(structuralNavigationObject, arg))
-        if not isNext:
-            matches.reverse()
-
-        for match in matches:
-            if _isValidMatch(match):
-                structuralNavigationObject.present(match, arg)
-                return
+        candidates = range(len(index)) if isNext else range(len(index) - 1, -1, -1)
+        for i in candidates:
+            if _isValidMatch(index.objects[i]):
+                return i, True
 
-        structuralNavigationObject.present(None, arg)
+        return -1, True
 
     #########################################################################
     #                                                                       #
@@ -0,0 +1,993 @@
+"""An in-process stand-in for AT-SPI: a tree of fake accessible objects,
+built from recorded (or generated) node descriptions, and a registry which
+delivers events and keystrokes to the listeners Orca registers. It lets
+Orca be driven without a desktop, applications or an accessibility bus."""
+
+import collections
+import re
+
+import pyatspi
+
+# The size of a character and a line of text, for objects whose text has no
+# recorded extents.
+CHAR_WIDTH = 8
+LINE_HEIGHT = 20
+
+EMBEDDED_OBJECT_CHARACTER = '\ufffc'
+
+BoundingBox = collections.namedtuple('BoundingBox', ['x', 'y', 'width', 'height'])
+
+def constant(name):
+    """Returns the pyatspi constant (e.g. ROLE_HEADING) with the given name."""
+
+    return getattr(pyatspi, name)
+
+def constantNames(prefix):
+    """Returns a dictionary of the names of the pyatspi constants with the
+    given prefix (e.g. 'ROLE_'), keyed by the constant."""
+
+    names = {}
+    for name in dir(pyatspi):
+        if name.startswith(prefix):
+            try:
+                names[getattr(pyatspi, name)] = name
+            except TypeError:
+                continue
+    return names
+
+class Relation:
+
+    def __init__(self, relationType, targets):
+        self._type = relationType
+        self._targets = targets
+
+    def getRelationType(self):
+        return self._type
+
+    def getNTargets(self):
+        return len(self._targets)
+
+    def getTarget(self, i):
+        return self._targets[i]
+
+class _Interface:
+    """The base class of the interfaces of a fake accessible object."""
+
+    def __init__(self, obj):
+        self._obj = obj
+
+    @property
+    def _node(self):
+        return self._obj._node
+
+class Component(_Interface):
+
+    def getExtents(self, coordType):
+        return BoundingBox(*self._obj._getExtents())
+
+    def getPosition(self, coordType):
+        return self._obj._getExtents()[:2]
+
+    def getSize(self):
+        return self._obj._getExtents()[2:]
+
+    def getLayer(self):
+        return pyatspi.LAYER_WIDGET
+
+    def getMDIZOrder(self):
+        return 0
+
+    def grabFocus(self):
+        return True
+
+    def contains(self, x, y, coordType):
+        ex, ey, width, height = self._obj._getExtents()
+        return ex <= x < ex + width and ey <= y < ey + height
+
+    def getAccessibleAtPoint(self, x, y, coordType):
+        for child in self._obj:
+            if child and child.queryComponent().contains(x, y, coordType):
+                return child
+        return None
+
+class Text(_Interface):
+
+    _PATTERNS = {'word': re.compile(r'\S+\s*'),
+                 'line': re.compile(r'[^\n]*\n|[^\n]+$'),
+                 'sentence': re.compile(r'[^.!?\n]*(?:[.!?]+\s*|\n|$)')}
+
+    @property
+    def _text(self):
+        return self._node.get('text', '')
+
+    @property
+    def characterCount(self):
+        return len(self._text)
+
+    @property
+    def caretOffset(self):
+        return self._node.get('caretOffset', 0)
+
+    def setCaretOffset(self, offset):
+        self._obj._tree._setNodeValue(self._obj, 'caretOffset', offset)
+        return True
+
+    def getText(self, start, end):
+        if end == -1:
+            end = None
+        return self._text[start:end]
+
+    def _getRanges(self, boundary):
+        kind = 'line'
+        if boundary in (pyatspi.TEXT_BOUNDARY_WORD_START, pyatspi.TEXT_BOUNDARY_WORD_END):
+            kind = 'word'
+        elif boundary in (pyatspi.TEXT_BOUNDARY_SENTENCE_START,
+                          pyatspi.TEXT_BOUNDARY_SENTENCE_END):
+            kind = 'sentence'
+
+        ranges = [m.span() for m in self._PATTERNS[kind].finditer(self._text) if m.end() > m.start()]
+        if ranges and ranges[0][0] > 0:
+            ranges[0] = 0, ranges[0][1]
+        return ranges
+
+    def _getRangeAt(self, offset, boundary):
+        text = self._text
+        if boundary == pyatspi.TEXT_BOUNDARY_CHAR:
+            if 0 <= offset < len(text):
+                return offset, offset + 1
+            return None
+
+        for start, end in self._getRanges(boundary):
+            if start <= offset < end:
+                return start, end
+        return None
+
+    def getTextAtOffset(self, offset, boundary):
+        span = self._getRangeAt(offset, boundary)
+        if span is None:
+            return '', offset, offset
+        return self._text[span[0]:span[1]], span[0], span[1]
+
+    def getTextBeforeOffset(self, offset, boundary):
+        span = self._getRangeAt(offset, boundary)
+        start = span[0] if span else min(offset, len(self._text))
+        if start <= 0:
+            return '', 0, 0
+        return self.getTextAtOffset(start - 1, boundary)
+
+    def getTextAfterOffset(self, offset, boundary):
+        span = self._getRangeAt(offset, boundary)
+        if span is None:
+            return '', offset, offset
+        return self.getTextAtOffset(span[1], boundary)
+
+    def getNSelections(self):
+        return len(self._node.get('selections', []))
+
+    def getSelection(self, i):
+        return tuple(self._node.get('selections', [])[i])
+
+    def addSelection(self, start, end):
+        selections = list(self._node.get('selections', [])) + [[start, end]]
+        self._obj._tree._setNodeValue(self._obj, 'selections', selections)
+        return True
+
+    def removeSelection(self, i):
+        selections = list(self._node.get('selections', []))
+        if not 0 <= i < len(selections):
+            return False
+        del selections[i]
+        self._obj._tree._setNodeValue(self._obj, 'selections', selections)
+        return True
+
+    def setSelection(self, i, start, end):
+        selections = list(self._node.get('selections', []))
+        if not 0 <= i < len(selections):
+            return False
+        selections[i] = [start, end]
+        self._obj._tree._setNodeValue(self._obj, 'selections', selections)
+        return True
+
+    def _getLineAndColumn(self, offset):
+        text = self._text
+        line = text.count('\n', 0, offset)
+        column = offset - (text.rfind('\n', 0, offset) + 1)
+        return line, column
+
+    def getCharacterExtents(self, offset, coordType):
+        x, y = self._obj._getExtents()[:2]
+        line, column = self._getLineAndColumn(offset)
+        return x + column * CHAR_WIDTH, y + line * LINE_HEIGHT, CHAR_WIDTH, LINE_HEIGHT
+
+    def getRangeExtents(self, start, end, coordType):
+        if end <= start:
+            x, y, width, height = self.getCharacterExtents(start, coordType)
+            return x, y, 0, height
+
+        x, y, width = self._obj._getExtents()[:3]
+        firstLine, firstColumn = self._getLineAndColumn(start)
+        lastLine, lastColumn = self._getLineAndColumn(end - 1)
+        if firstLine == lastLine:
+            return (x + firstColumn * CHAR_WIDTH, y + firstLine * LINE_HEIGHT,
+                    (lastColumn - firstColumn + 1) * CHAR_WIDTH, LINE_HEIGHT)
+        return x, y + firstLine * LINE_HEIGHT, width, \
+            (lastLine - firstLine + 1) * LINE_HEIGHT
+
+    def getOffsetAtPoint(self, x, y, coordType):
+        ex, ey = self._obj._getExtents()[:2]
+        line = max(0, (y - ey) // LINE_HEIGHT)
+        column = max(0, (x - ex) // CHAR_WIDTH)
+        lines = self._text.split('\n')
+        if line >= len(lines):
+            return -1
+        return sum(len(l) + 1 for l in lines[:line]) + min(column, len(lines[line]))
+
+    def getAttributeRun(self, offset, includeDefaults=True):
+        return [], 0, len(self._text)
+
+    def getAttributes(self, offset):
+        return '', 0, len(self._text)
+
+    def getDefaultAttributes(self):
+        return ''
+
+    def getDefaultAttributeSet(self):
+        return []
+
+    def getBoundedRanges(self, x, y, width, height, coordType, xClipType, yClipType):
+        return []
+
+class Hypertext(_Interface):
+
+    def _getLinks(self):
+        links = self._node.get('links')
+        if links is not None:
+            return links
+
+        # Otherwise, as in web content, each embedded object character stands
+        # for the next child.
+        text = self._node.get('text', '')
+        offsets = [i for i, char in enumerate(text) if char == EMBEDDED_OBJECT_CHARACTER]
+        children = self._node.get('children', [])
+        return [[child, offset, offset + 1] for child, offset in zip(children, offsets)]
+
+    def getNLinks(self):
+        return len(self._getLinks())
+
+    def getLink(self, i):
+        links = self._getLinks()
+        if not 0 <= i < len(links):
+            return None
+        return self._obj._tree.get(links[i][0]).queryHyperlink()
+
+    def getLinkIndex(self, offset):
+        for i, (child, start, end) in enumerate(self._getLinks()):
+            if start <= offset < end:
+                return i
+        return -1
+
+class Hyperlink(_Interface):
+
+    def _getSpan(self):
+        parent = self._obj.parent
+        if parent is None:
+            return -1, -1
+        for child, start, end in Hypertext(parent)._getLinks():
+            if child == self._node['id']:
+                return start, end
+        return -1, -1
+
+    @property
+    def startIndex(self):
+        return self._getSpan()[0]
+
+    @property
+    def endIndex(self):
+        return self._getSpan()[1]
+
+    @property
+    def nAnchors(self):
+        return 1
+
+    def getObject(self, i):
+        return self._obj
+
+    def getURI(self, i):
+        return self._node.get('attributes', {}).get('href', '')
+
+    def isValid(self):
+        return True
+
+class Table(_Interface):
+
+    @property
+    def _table(self):
+        return self._node.get('table', {})
+
+    @property
+    def nRows(self):
+        return self._table.get('rows', 0)
+
+    @property
+    def nColumns(self):
+        return self._table.get('columns', 0)
+
+    @property
+    def caption(self):
+        return None
+
+    @property
+    def summary(self):
+        return None
+
+    @property
+    def nSelectedRows(self):
+        return 0
+
+    @property
+    def nSelectedColumns(self):
+        return 0
+
+    def getIndexAt(self, row, column):
+        return row * self.nColumns + column
+
+    def getRowAtIndex(self, index):
+        return index // max(1, self.nColumns)
+
+    def getColumnAtIndex(self, index):
+        return index % max(1, self.nColumns)
+
+    def getAccessibleAt(self, row, column):
+        if not (0 <= row < self.nRows and 0 <= column < self.nColumns):
+            return None
+        return self._obj.getChildAtIndex(self.getIndexAt(row, column))
+
+    def getRowExtentAt(self, row, column):
+        return 1
+
+    def getColumnExtentAt(self, row, column):
+        return 1
+
+    def getRowColumnExtentsAtIndex(self, index):
+        return True, self.getRowAtIndex(index), self.getColumnAtIndex(index), 1, 1, False
+
+    def getRowHeader(self, row):
+        return None
+
+    def getColumnHeader(self, column):
+        return None
+
+    def getRowDescription(self, row):
+        return ''
+
+    def getColumnDescription(self, column):
+        return ''
+
+    def getSelectedRows(self):
+        return []
+
+    def getSelectedColumns(self):
+        return []
+
+    def isSelected(self, row, column):
+        return False
+
+class Selection(_Interface):
+
+    def _getSelected(self):
+        return [child for child in self._obj
+                if child and 'STATE_SELECTED' in child._node.get('states', [])]
+
+    @property
+    def nSelectedChildren(self):
+        return len(self._getSelected())
+
+    def getSelectedChild(self, i):
+        selected = self._getSelected()
+        if not 0 <= i < len(selected):
+            return None
+        return selected[i]
+
+    def isChildSelected(self, i):
+        child = self._obj.getChildAtIndex(i)
+        return bool(child) and child in self._getSelected()
+
+    def selectChild(self, i):
+        return True
+
+    def deselectChild(self, i):
+        return True
+
+class Value(_Interface):
+
+    def _getValue(self, i):
+        return self._node.get('value', [0, 0, 0, 0])[i]
+
+    currentValue = property(lambda self: self._getValue(0))
+    minimumValue = property(lambda self: self._getValue(1))
+    maximumValue = property(lambda self: self._getValue(2))
+    minimumIncrement = property(lambda self: self._getValue(3))
+
+class Action(_Interface):
+
+    @property
+    def nActions(self):
+        return len(self._node.get('actions', []))
+
+    def getName(self, i):
+        return self._node['actions'][i]
+
+    def getLocalizedName(self, i):
+        return self.getName(i)
+
+    def getDescription(self, i):
+        return ''
+
+    def getKeyBinding(self, i):
+        return ''
+
+    def doAction(self, i):
+        return True
+
+class Image(_Interface):
+
+    @property
+    def imageDescription(self):
+        return self._node.get('imageDescription', '')
+
+    def getImageExtents(self, coordType):
+        return BoundingBox(*self._obj._getExtents())
+
+    def getImageSize(self):
+        return tuple(self._obj._getExtents()[2:])
+
+class Document(_Interface):
+
+    def getAttributes(self):
+        return ['%s:%s' % item for item in self._node.get('documentAttributes', {}).items()]
+
+    def getAttributeValue(self, name):
+        return self._node.get('documentAttributes', {}).get(name, '')
+
+    def getLocale(self):
+        return self._node.get('locale', '')
+
+class Collection(_Interface):
+
+    MATCH_INVALID = 0
+    MATCH_ALL = 1
+    MATCH_ANY = 2
+    MATCH_NONE = 3
+    MATCH_EMPTY = 4
+
+    SORT_ORDER_INVALID = 0
+    SORT_ORDER_CANONICAL = 1
+    SORT_ORDER_FLOW = 2
+    SORT_ORDER_TAB = 3
+    SORT_ORDER_REVERSE_CANONICAL = 4
+    SORT_ORDER_REVERSE_FLOW = 5
+    SORT_ORDER_REVERSE_TAB = 6
+
+    @staticmethod
+    def _asStates(states):
+        if hasattr(states, 'getStates'):
+            return list(states.getStates())
+        if isinstance(states, int):
+            return [s for s in constantNames('STATE_') if states & (1 << int(s))]
+        return list(states or [])
+
+    @staticmethod
+    def _asAttributes(attributes):
+        if isinstance(attributes, dict):
+            return attributes
+        result = {}
+        for attribute in re.split(r'(?<!\\);', attributes or ''):
+            key, sep, value = attribute.partition(':')
+            if sep:
+                result[key.strip()] = value.strip()
+        return result
+
+    @staticmethod
+    def _asList(values):
+        if isinstance(values, str):
+            return [x for x in values.split(';') if x]
+        return list(values or [])
+
+    def createMatchRule(self, states, matchStates, attributes, matchAttributes,
+                        roles, matchRoles, interfaces, matchInterfaces, invert):
+        return (self._asStates(states), matchStates,
+                self._asAttributes(attributes), matchAttributes,
+                self._asList(roles), matchRoles,
+                self._asList(interfaces), matchInterfaces,
+                invert)
+
+    def freeMatchRule(self, rule):
+        pass
+
+    @classmethod
+    def _matches(cls, found, wanted, match):
+        if not wanted or match in (cls.MATCH_INVALID, cls.MATCH_EMPTY):
+            return True
+        hits = [x for x in wanted if x in found]
+        if match == cls.MATCH_ALL:
+            return len(hits) == len(wanted)
+        if match == cls.MATCH_ANY:
+            return bool(hits)
+        if match == cls.MATCH_NONE:
+            return not hits
+        return True
+
+    def _ruleApplies(self, obj, rule):
+        states, matchStates, attributes, matchAttributes, \
+            roles, matchRoles, interfaces, matchInterfaces, invert = rule
+
+        objAttributes = obj._node.get('attributes', {})
+        foundAttributes = [k for k, v in attributes.items() if objAttributes.get(k) == v]
+        result = self._matches(obj.getState().getStates(), states, matchStates) \
+            and self._matches(foundAttributes, list(attributes), matchAttributes) \
+            and self._matches([obj.getRole()], roles, matchRoles) \
+            and self._matches(obj.get_interfaces(), interfaces, matchInterfaces)
+        return result != bool(invert)
+
+    def _descendants(self, obj):
+        for child in obj:
+            if child is None:
+                continue
+            yield child
+            yield from self._descendants(child)
+
+    def getMatches(self, rule, sortBy, count, traverse):
+        matches = []
+        for obj in self._descendants(self._obj):
+            if self._ruleApplies(obj, rule):
+                matches.append(obj)
+                if count and len(matches) >= count:
+                    break
+        if sortBy in (self.SORT_ORDER_REVERSE_CANONICAL, self.SORT_ORDER_REVERSE_FLOW):
+            matches.reverse()
+        return matches
+
+    def getMatchesFrom(self, current, rule, sortBy, tree, count, traverse):
+        matches = self.getMatches(rule, self.SORT_ORDER_CANONICAL, 0, traverse)
+        if current in matches:
+            matches = matches[matches.index(current) + 1:]
+        return matches[:count or None]
+
+    def getMatchesTo(self, current, rule, sortBy, tree, limitScope, count, traverse):
+        matches = self.getMatches(rule, self.SORT_ORDER_CANONICAL, 0, traverse)
+        if current in matches:
+            matches = matches[:matches.index(current)]
+        return matches[-count:] if count else matches
+
+_INTERFACES = {'Action': Action,
+               'Collection': Collection,
+               'Component': Component,
+               'Document': Document,
+               'Hyperlink': Hyperlink,
+               'Hypertext': Hypertext,
+               'Image': Image,
+               'Selection': Selection,
+               'Table': Table,
+               'Text': Text,
+               'Value': Value}
+
+class Accessible:
+    """A fake accessible object. Its properties are those of the node with
+    the same id in its tree, so they change when the tree is updated."""
+
+    def __init__(self, tree, nodeId):
+        self._tree = tree
+        self._id = nodeId
+
+    def __repr__(self):
+        node = self._node
+        return '[%s | %s]' % (self.getRoleName(), node.get('name', ''))
+
+    def __bool__(self):
+        return True
+
+    def __len__(self):
+        return self.childCount
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.childCount
+        return self.getChildAtIndex(i)
+
+    def __iter__(self):
+        for i in range(self.childCount):
+            yield self.getChildAtIndex(i)
+
+    @property
+    def _node(self):
+        return self._tree.nodes[self._id]
+
+    def _getExtents(self):
+        return self._node.get('extents') or [0, 0, 0, 0]
+
+    def _query(self, name):
+        if name not in self._node.get('interfaces', []):
+            raise NotImplementedError(name)
+        return _INTERFACES[name](self)
+
+    @property
+    def id(self):
+        return self._tree.getNumber(self._id)
+
+    @property
+    def name(self):
+        return self._node.get('name', '')
+
+    @property
+    def description(self):
+        return self._node.get('description', '')
+
+    @property
+    def parent(self):
+        parent = self._node.get('parent')
+        if parent is None:
+            return self._tree.desktop if self._node.get('role') == 'ROLE_APPLICATION' else None
+        return self._tree.get(parent)
+
+    @property
+    def childCount(self):
+        node = self._node
+        if 'childCount' in node:
+            return node['childCount']
+        return len(node.get('children', []))
+
+    @property
+    def toolkitName(self):
+        return self.getApplication()._node.get('toolkitName', '')
+
+    @property
+    def toolkitVersion(self):
+        return self.getApplication()._node.get('toolkitVersion', '')
+
+    def get_process_id(self):
+        return self.getApplication()._node.get('pid', -1)
+
+    def get_interfaces(self):
+        return list(self._node.get('interfaces', []))
+
+    def setCacheMask(self, mask):
+        pass
+
+    def clearCache(self):
+        pass
+
+    def getRole(self):
+        return constant(self._node.get('role', 'ROLE_UNKNOWN'))
+
+    def getRoleName(self):
+        return self._node.get('role', 'ROLE_UNKNOWN')[5:].lower().replace('_', ' ')
+
+    def getLocalizedRoleName(self):
+        return self.getRoleName()
+
+    def getState(self):
+        stateSet = pyatspi.StateSet()
+        for state in self._node.get('states', []):
+            stateSet.add(constant(state))
+        return stateSet
+
+    def getAttributes(self):
+        return ['%s:%s' % item for item in self._node.get('attributes', {}).items()]
+
+    def getRelationSet(self):
+        relations = []
+        for name, targets in self._node.get('relations', {}).items():
+            objects = [self._tree.get(x) for x in targets if x in self._tree.nodes]
+            relations.append(Relation(constant(name), objects))
+        return relations
+
+    def getChildAtIndex(self, i):
+        node = self._node
+        children = node.get('children')
+        if children is not None and 0 <= i < len(children):
+            return self._tree.get(children[i])
+        if 'childCount' in node and 0 <= i < node['childCount']:
+            return self._tree.getCell(self._id, i)
+        return None
+
+    def getIndexInParent(self):
+        node = self._node
+        if 'index' in node:
+            return node['index']
+        parentId = node.get('parent')
+        if parentId is None:
+            if node.get('role') == 'ROLE_APPLICATION':
+                return self._tree.getApplications().index(self._id)
+            return -1
+        siblings = self._tree.nodes[parentId].get('children', [])
+        try:
+            return siblings.index(self._id)
+        except ValueError:
+            return -1
+
+    def getApplication(self):
+        obj = self
+        while obj is not None and obj._node.get('role') != 'ROLE_APPLICATION':
+            parentId = obj._node.get('parent')
+            obj = self._tree.get(parentId) if parentId is not None else None
+        return obj
+
+    def queryAction(self):
+        return self._query('Action')
+
+    def queryCollection(self):
+        return self._query('Collection')
+
+    def queryComponent(self):
+        return self._query('Component')
+
+    def queryDocument(self):
+        return self._query('Document')
+
+    def queryHyperlink(self):
+        return self._query('Hyperlink')
+
+    def queryHypertext(self):
+        return self._query('Hypertext')
+
+    def queryImage(self):
+        return self._query('Image')
+
+    def querySelection(self):
+        return self._query('Selection')
+
+    def queryTable(self):
+        return self._query('Table')
+
+    def queryText(self):
+        return self._query('Text')
+
+    def queryValue(self):
+        return self._query('Value')
+
+    def queryEditableText(self):
+        raise NotImplementedError('EditableText')
+
+    def queryTableCell(self):
+        raise NotImplementedError('TableCell')
+
+class Desktop(Accessible):
+    """The root of the tree, whose children are the applications."""
+
+    def __init__(self, tree):
+        super().__init__(tree, None)
+
+    @property
+    def _node(self):
+        return {'role': 'ROLE_DESKTOP_FRAME', 'name': 'main',
+                'children': self._tree.getApplications()}
+
+    @property
+    def parent(self):
+        return None
+
+    def getApplication(self):
+        return None
+
+    def getIndexInParent(self):
+        return -1
+
+class Tree:
+    """The accessible objects of the stand-in, described by nodes, which are
+    dictionaries with the keys below. All but 'id' are optional.
+
+    - id: a string identifying the object
+    - role: the name of a pyatspi role constant, e.g. 'ROLE_HEADING'
+    - name, description: strings
+    - states: a list of names of pyatspi state constants
+    - attributes: a dictionary of object attributes
+    - parent: the id of the parent; applications have none
+    - children: the ids of the children, in order
+    - childCount: the number of children, for tables whose cells are not
+      all listed; the cells not listed are created when asked for
+    - index: the index in parent, if not that in the parent's children
+    - interfaces: names, e.g. 'Text', of the interfaces other than Accessible
+    - extents: [x, y, width, height] in desktop coordinates
+    - text, caretOffset, selections: the contents of the Text interface
+    - links: [[childId, startOffset, endOffset]] for the Hypertext interface;
+      by default each embedded object character is the next child
+    - table: {'rows': n, 'columns': m}
+    - value: [current, minimum, maximum, increment]
+    - actions: the names of the actions
+    - relations: {relationName: [target ids]}
+    - imageDescription, documentAttributes, locale
+    - toolkitName, toolkitVersion, pid: for applications
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self._objects = {}
+        self._numbers = {}
+        self._applications = None
+        self.desktop = Desktop(self)
+
+    def update(self, nodes):
+        """Adds the given nodes, or updates the values of existing ones."""
+
+        for node in nodes:
+            nodeId = node['id']
+            existing = self.nodes.get(nodeId)
+            if existing is None:
+                self.nodes[nodeId] = dict(node)
+            else:
+                existing.update(node)
+            if node.get('role') == 'ROLE_APPLICATION' or 'parent' in node:
+                self._applications = None
+
+    def _setNodeValue(self, obj, key, value):
+        self.nodes[obj._id][key] = value
+
+    def get(self, nodeId):
+        """Returns the fake accessible object for nodeId, or None."""
+
+        if nodeId is None:
+            return None
+        obj = self._objects.get(nodeId)
+        if obj is None:
+            if nodeId not in self.nodes:
+                return None
+            obj = Accessible(self, nodeId)
+            self._objects[nodeId] = obj
+        return obj
+
+    def getNumber(self, nodeId):
+        return self._numbers.setdefault(nodeId, len(self._numbers) + 1)
+
+    def getApplications(self):
+        if self._applications is None:
+            self._applications = [nodeId for nodeId, node in self.nodes.items()
+                                  if node.get('role') == 'ROLE_APPLICATION'
+                                  and node.get('parent') is None]
+        return self._applications
+
+    def getCell(self, tableId, index):
+        """Returns the child of the table at index, creating it if it was not
+        recorded. Such cells are empty."""
+
+        cellId = '%s:%d' % (tableId, index)
+        if cellId not in self.nodes:
+            table = self.nodes[tableId]
+            columns = max(1, table.get('table', {}).get('columns', 1))
+            row, column = divmod(index, columns)
+            x, y = (table.get('extents') or [0, 0, 0, 0])[:2]
+            self.nodes[cellId] = {
+                'id': cellId,
+                'role': 'ROLE_TABLE_CELL',
+                'parent': tableId,
+                'index': index,
+                'states': ['STATE_ENABLED', 'STATE_FOCUSABLE', 'STATE_SELECTABLE',
+                           'STATE_SENSITIVE', 'STATE_SHOWING', 'STATE_TRANSIENT',
+                           'STATE_VISIBLE'],
+                'interfaces': ['Component', 'Text'],
+                'extents': [x + column * 100, y + row * LINE_HEIGHT, 100, LINE_HEIGHT],
+                'text': ''}
+        return self.get(cellId)
+
+    def getValue(self, value):
+        """Returns the event detail value, replacing references to nodes
+        (dictionaries of the form {'id': nodeId}) with their objects."""
+
+        if isinstance(value, dict) and 'id' in value:
+            nodeId = value['id']
+            if isinstance(nodeId, str) and nodeId not in self.nodes:
+                tableId, sep, index = nodeId.rpartition(':')
+                if sep and tableId in self.nodes and index.isdigit():
+                    return self.getCell(tableId, int(index))
+            return self.get(nodeId)
+        return value
+
+class Event:
+    """An AT-SPI object event."""
+
+    def __init__(self, eventType, source, detail1=0, detail2=0, any_data=None):
+        self.type = eventType
+        self.source = source
+        self.detail1 = detail1
+        self.detail2 = detail2
+        self.any_data = any_data
+        self.host_application = source.getApplication() if source else None
+        self.sender = self.host_application
+
+    def __str__(self):
+        return '%s(%s, %s, %s) for %s' \
+            % (self.type, self.detail1, self.detail2, self.any_data, self.source)
+
+class DeviceEvent:
+    """An AT-SPI keyboard event."""
+
+    def __init__(self, pressed, keyval, hw_code, modifiers, event_string,
+                 is_text, timestamp):
+        self.type = pyatspi.KEY_PRESSED_EVENT if pressed else pyatspi.KEY_RELEASED_EVENT
+        self.id = keyval
+        self.hw_code = hw_code
+        self.modifiers = modifiers
+        self.event_string = event_string
+        self.is_text = is_text
+        self.timestamp = timestamp
+
+class Registry:
+    """Stands in for pyatspi.Registry, delivering events to the listeners
+    registered for them."""
+
+    def __init__(self, tree):
+        self._tree = tree
+        self._listeners = collections.defaultdict(list)
+        self._keystrokeListeners = []
+        self.generatedKeyboardEvents = []
+
+    def getDesktop(self, i):
+        return self._tree.desktop
+
+    def getDesktopCount(self):
+        return 1
+
+    def registerEventListener(self, client, *names):
+        for name in names:
+            if client not in self._listeners[name]:
+                self._listeners[name].append(client)
+
+    def deregisterEventListener(self, client, *names):
+        for name in names:
+            if client in self._listeners.get(name, []):
+                self._listeners[name].remove(client)
+
+    def registerKeystrokeListener(self, client, key_set=[], mask=0, kind=(),
+                                  synchronous=True, preemptive=True, global_=False):
+        if client not in self._keystrokeListeners:
+            self._keystrokeListeners.append(client)
+
+    def deregisterKeystrokeListener(self, client, key_set=[], mask=0, kind=()):
+        if client in self._keystrokeListeners:
+            self._keystrokeListeners.remove(client)
+
+    def generateKeyboardEvent(self, keycode, keysym, kind):
+        self.generatedKeyboardEvents.append((keycode, keysym, kind))
+
+    def generateMouseEvent(self, x, y, name):
+        pass
+
+    def pumpQueuedEvents(self, *args):
+        pass
+
+    def start(self, *args, **kwargs):
+        pass
+
+    def stop(self, *args, **kwargs):
+        pass
+
+    def isListenedFor(self, eventType):
+        """Returns True if a listener is registered for eventType, or for one
+        of the types it is a subtype of."""
+
+        return any(self._listeners.get(name) for name in self._getTypes(eventType))
+
+    @staticmethod
+    def _getTypes(eventType):
+        parts = eventType.split(':')
+        return [':'.join(parts[:i]) for i in range(1, len(parts) + 1)] \
+            + [eventType + ':']
+
+    def dispatchEvent(self, event):
+        """Delivers event to the listeners registered for it. Returns True if
+        there were any."""
+
+        clients = []
+        for name in self._getTypes(event.type):
+            clients.extend(c for c in self._listeners.get(name, []) if c not in clients)
+        for client in clients:
+            client(event)
+        return bool(clients)
+
+    def dispatchKeyboardEvent(self, event):
+        """Delivers event to the keystroke listeners. Returns True if one of
+        them consumed it."""
+
+        consumed = False
+        for client in list(self._keystrokeListeners):
+            consumed = client(event) or consumed
+        return consumed
@@ -0,0 +1,314 @@
+#!/usr/bin/python3
+
+"""Benchmarks Orca by replaying generated sessions (see replay.py) which
+exercise browse-mode line navigation and say all in web content,
+structural navigation, flat review and spreadsheet navigation. Sessions
+recorded with eventrecorder.py can be included too. Runs without a
+desktop, so performance regressions can be caught on any machine."""
+
+import argparse
+import collections
+import json
+import os
+import sys
+
+import replay
+
+EOC = '\ufffc'
+
+BASE_STATES = ['STATE_ENABLED', 'STATE_SENSITIVE', 'STATE_SHOWING', 'STATE_VISIBLE']
+
+# The keys used by the generated sessions: (keysym, keyval, keycode, text)
+# as for a US keyboard under X.
+KEYS = {'Down': ('Down', 0xff54, 116, False),
+        'h': ('h', 0x68, 43, True),
+        'KP_Add': ('KP_Add', 0xffab, 86, False),
+        'KP_Subtract': ('KP_Subtract', 0xffad, 82, False),
+        'KP_9': ('KP_9', 0xffb9, 81, False)}
+
+LINE_HEIGHT = 20
+
+class SessionBuilder:
+    """Generates the records of a session: a tree of nodes, described as in
+    atspistandin.Tree, followed by events, keystrokes and node updates."""
+
+    def __init__(self):
+        self._nodes = collections.OrderedDict()
+        self._records = []
+        self._states = {}
+        self._timestamp = 1000
+
+    def node(self, role, parent=None, nodeId=None, states=(), interfaces=(), **values):
+        nodeId = nodeId or 'n%d' % (len(self._nodes) + 1)
+        node = {'id': nodeId,
+                'role': role,
+                'states': BASE_STATES + list(states),
+                'interfaces': list(interfaces),
+                'children': []}
+        if parent is not None:
+            node['parent'] = parent
+            parentNode = self._nodes[parent]
+            if 'childCount' not in parentNode:
+                parentNode['children'].append(nodeId)
+        node.update(values)
+        self._nodes[nodeId] = node
+        return nodeId
+
+    def get(self, nodeId):
+        return self._nodes[nodeId]
+
+    def _getStates(self, nodeId):
+        return self._states.get(nodeId, self._nodes[nodeId]['states'])
+
+    def update(self, nodeId, **values):
+        values['id'] = nodeId
+        self._records.append({'type': 'nodes', 'nodes': [values]})
+
+    def event(self, eventType, source, detail1=0, detail2=0, anyData=None):
+        if isinstance(anyData, str) and anyData in self._nodes:
+            anyData = {'id': anyData}
+        self._records.append({'type': 'event',
+                              'event': eventType,
+                              'source': source,
+                              'detail1': detail1,
+                              'detail2': detail2,
+                              'anyData': anyData})
+
+    def key(self, name, handler=None, modifiers=0):
+        keysym, keyval, keycode, isText = KEYS[name]
+        for pressed in [True, False]:
+            self._timestamp += 1000
+            self._records.append({'type': 'key',
+                                  'pressed': pressed,
+                                  'keysym': keysym,
+                                  'keyval': keyval,
+                                  'hwCode': keycode,
+                                  'modifiers': modifiers,
+                                  'eventString': keysym,
+                                  'isText': isText,
+                                  'timestamp': self._timestamp,
+                                  'handler': handler if pressed else None})
+
+    def focus(self, nodeId, previous=None):
+        """Adds the node updates and events for nodeId gaining focus."""
+
+        if previous:
+            states = [s for s in self._getStates(previous) if s != 'STATE_FOCUSED']
+            self._states[previous] = states
+            self.update(previous, states=states)
+            self.event('object:state-changed:focused', previous, 0)
+
+        states = self._getStates(nodeId) + ['STATE_FOCUSED']
+        self._states[nodeId] = states
+        self.update(nodeId, states=states)
+        self.event('object:state-changed:focused', nodeId, 1)
+
+    def build(self):
+        return [{'type': 'nodes', 'nodes': list(self._nodes.values())}] + self._records
+
+def _addApplication(builder, name, toolkit, title, pid):
+    app = builder.node('ROLE_APPLICATION', name=name, toolkitName=toolkit,
+                       toolkitVersion='1.0', pid=pid)
+    frame = builder.node('ROLE_FRAME', app, name=title,
+                         states=['STATE_ACTIVE', 'STATE_RESIZABLE'],
+                         interfaces=['Component'], extents=[0, 0, 1024, 8192])
+    return app, frame
+
+def _webDocument(sections, paragraphs):
+    """Returns a builder for a web page with the given number of sections,
+    each having a heading, paragraphs containing a link, and a list."""
+
+    builder = SessionBuilder()
+    app, frame = _addApplication(builder, 'Firefox', 'Gecko',
+                                 'Benchmark - Mozilla Firefox', 1001)
+    extents = [0, 0, 1024, 8192]
+    internal = builder.node('ROLE_INTERNAL_FRAME', frame, interfaces=['Component'],
+                            extents=extents)
+    document = builder.node('ROLE_DOCUMENT_WEB', internal, name='Benchmark',
+                            states=['STATE_FOCUSABLE', 'STATE_READ_ONLY'],
+                            interfaces=['Collection', 'Component', 'Document',
+                                        'Hypertext', 'Text'],
+                            attributes={'tag': 'body'},
+                            documentAttributes={'DocURL': 'file:///benchmark.html',
+                                                'MimeType': 'text/html'},
+                            extents=extents)
+
+    textInterfaces = ['Component', 'Hyperlink', 'Hypertext', 'Text']
+    y = 0
+    def _block(role, parent, text, attributes, lines=1, **values):
+        nonlocal y
+        nodeId = builder.node(role, parent, interfaces=textInterfaces, text=text,
+                              attributes=attributes,
+                              extents=[0, y, 1000, lines * LINE_HEIGHT], **values)
+        y += lines * LINE_HEIGHT
+        return nodeId
+
+    for i in range(sections):
+        _block('ROLE_HEADING', document, 'Section %d' % (i + 1),
+               {'tag': 'h2', 'level': '2'})
+        for j in range(paragraphs):
+            paragraph = _block('ROLE_PARAGRAPH', document,
+                               'Paragraph %d of section %d has some text, then %s, '
+                               'and then some more text to end it.' % (j + 1, i + 1, EOC),
+                               {'tag': 'p'})
+            builder.node('ROLE_LINK', paragraph,
+                         states=['STATE_FOCUSABLE', 'STATE_LINKED'],
+                         interfaces=textInterfaces + ['Action'],
+                         text='link %d' % (j + 1), actions=['jump'],
+                         attributes={'tag': 'a', 'href': '#s%dp%d' % (i, j)},
+                         extents=builder.get(paragraph)['extents'])
+        items = ['Item %d of the list in section %d' % (k + 1, i + 1) for k in range(3)]
+        lst = builder.node('ROLE_LIST', document, interfaces=textInterfaces,
+                           text=EOC * len(items), attributes={'tag': 'ul'},
+                           extents=[0, y, 1000, len(items) * LINE_HEIGHT])
+        for item in items:
+            _block('ROLE_LIST_ITEM', lst, item, {'tag': 'li'})
+
+    builder.get(document)['text'] = EOC * len(builder.get(document)['children'])
+    builder.event('window:activate', frame)
+    builder.focus(document)
+    builder.event('object:document:load-complete', document)
+    return builder, document
+
+def webLineNavigation(size):
+    """Moves down through a web page line by line in browse mode."""
+
+    builder, document = _webDocument(size, 3)
+    for i in range(size * 8):
+        builder.key('Down', 'next_line')
+    return builder.build()
+
+def sayAll(size):
+    """Reads a web page with say all."""
+
+    builder, document = _webDocument(size, 3)
+    builder.key('KP_Add', 'sayAllHandler')
+    return builder.build()
+
+def structuralNavigation(size):
+    """Moves through the headings of a web page."""
+
+    builder, document = _webDocument(size, 3)
+    for i in range(size):
+        builder.key('h', 'headingGoNext')
+    return builder.build()
+
+def flatReview(size):
+    """Reviews a text editor's window line by line with flat review."""
+
+    builder = SessionBuilder()
+    app, frame = _addApplication(builder, 'gedit', 'GTK', 'benchmark.txt - gedit', 1002)
+    lines = ['Line %d of the file being reviewed, with a few words on it.' % (i + 1)
+             for i in range(size * 10)]
+    extents = [0, 0, 1024, len(lines) * LINE_HEIGHT]
+    filler = builder.node('ROLE_FILLER', frame, interfaces=['Component'], extents=extents)
+    scrollPane = builder.node('ROLE_SCROLL_PANE', filler, interfaces=['Component'],
+                              extents=extents)
+    text = builder.node('ROLE_TEXT', scrollPane,
+                        states=['STATE_EDITABLE', 'STATE_FOCUSABLE', 'STATE_MULTI_LINE'],
+                        interfaces=['Component', 'Text'], text='\n'.join(lines),
+                        caretOffset=0, extents=extents)
+
+    builder.event('window:activate', frame)
+    builder.focus(text)
+    builder.key('KP_Subtract', 'toggleFlatReviewModeHandler')
+    for i in range(len(lines)):
+        builder.key('KP_9', 'reviewNextLineHandler')
+    builder.key('KP_Subtract', 'toggleFlatReviewModeHandler')
+    return builder.build()
+
+def spreadsheetNavigation(size):
+    """Moves down a spreadsheet column, as the application reports it."""
+
+    builder = SessionBuilder()
+    app, frame = _addApplication(builder, 'soffice', 'VCL',
+                                 'Untitled 1 - LibreOffice Calc', 1003)
+    extents = [0, 0, 1024, 8192]
+    panel = builder.node('ROLE_PANEL', frame, interfaces=['Component'], extents=extents)
+    spreadsheet = builder.node('ROLE_DOCUMENT_SPREADSHEET', panel, name='Sheet1',
+                               states=['STATE_FOCUSABLE'], interfaces=['Component'],
+                               extents=extents)
+    rows, columns = 1048576, 1024
+    table = builder.node('ROLE_TABLE', spreadsheet, name='Sheet Sheet1',
+                         states=['STATE_FOCUSABLE', 'STATE_MANAGES_DESCENDANTS',
+                                 'STATE_MULTISELECTABLE'],
+                         interfaces=['Component', 'Selection', 'Table'],
+                         table={'rows': rows, 'columns': columns},
+                         childCount=rows * columns, extents=extents)
+
+    cells = []
+    for row in range(size * 10):
+        for column in range(3):
+            index = row * columns + column
+            cell = builder.node('ROLE_TABLE_CELL', table, '%s:%d' % (table, index),
+                                states=['STATE_FOCUSABLE', 'STATE_SELECTABLE',
+                                        'STATE_TRANSIENT'],
+                                interfaces=['Component', 'Text'],
+                                name=str((row + 1) * (column + 1)),
+                                text=str((row + 1) * (column + 1)), index=index,
+                                extents=[column * 100, row * LINE_HEIGHT, 100, LINE_HEIGHT])
+            if column == 0:
+                cells.append(cell)
+
+    builder.event('window:activate', frame)
+    builder.focus(cells[0])
+    builder.event('object:active-descendant-changed', table, anyData=cells[0])
+    for previous, cell in zip(cells, cells[1:]):
+        builder.key('Down')
+        builder.focus(cell, previous)
+        builder.event('object:active-descendant-changed', table, anyData=cell)
+    return builder.build()
+
+SCENARIOS = collections.OrderedDict([
+    ('web-line-navigation', webLineNavigation),
+    ('say-all', sayAll),
+    ('structural-navigation', structuralNavigation),
+    ('flat-review', flatReview),
+    ('spreadsheet-navigation', spreadsheetNavigation),
+])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('scenarios', nargs='*', default=list(SCENARIOS),
+                        help='scenarios to run (default: all): %s' % ', '.join(SCENARIOS))
+    parser.add_argument('--size', type=int, default=10,
+                        help='the size of the generated documents (default: 10)')
+    parser.add_argument('--session', action='append', default=[],
+                        help='also replay this recorded session file')
+    parser.add_argument('--save-sessions', action='store',
+                        help='write the generated sessions to this directory')
+    parser.add_argument('--json', action='store', help='also write the results to this file')
+    args = parser.parse_args()
+
+    sessions = collections.OrderedDict()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error('unknown scenario: %s' % name)
+        sessions[name] = SCENARIOS[name](args.size)
+    for filename in args.session:
+        sessions[os.path.basename(filename)] = replay.readSession(filename)
+
+    if args.save_sessions:
+        os.makedirs(args.save_sessions, exist_ok=True)
+        for name in args.scenarios:
+            with open(os.path.join(args.save_sessions, '%s.jsonl' % name), 'w') as f:
+                f.writelines(json.dumps(record) + '\n' for record in sessions[name])
+
+    results = collections.OrderedDict()
+    for name, records in sessions.items():
+        replayer = replay.Replayer()
+        replayer.setUp()
+        try:
+            results[name] = replayer.replay(records)
+        finally:
+            replayer.tearDown()
+
+    replay.printResults(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
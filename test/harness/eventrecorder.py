@@ -0,0 +1,313 @@
+#!/usr/bin/python3
+
+"""Runs Orca, recording the events and keystrokes it receives, along with
+the properties of the accessible objects involved, to a session file which
+replay.py can play back without a desktop. Recording stops when Orca quits.
+
+The session file has one JSON record per line:
+
+- {"type": "nodes", "nodes": [...]}: the properties of accessible objects,
+  described as in atspistandin.Tree, which are new or have changed
+- {"type": "event", "event": type, "source": id, "detail1": n,
+  "detail2": n, "anyData": value}: an object event; accessible values are
+  of the form {"id": id}
+- {"type": "key", "pressed": bool, "keysym": name, "keyval": n,
+  "hwCode": n, "modifiers": n, "eventString": s, "isText": bool,
+  "timestamp": n, "handler": name}: a keystroke, and the name of the
+  Orca input event handler it triggered, if any
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import gi
+gi.require_version("Gdk", "3.0")
+from gi.repository import Gdk
+
+import pyatspi
+
+from orca import event_manager
+from orca import input_event
+from orca import orca
+
+from atspistandin import constantNames
+
+# The roles of the objects whose whole subtree is recorded when they gain
+# focus, because Orca examines the whole of them (e.g. in say all).
+FULL_SUBTREE_ROLES = [pyatspi.ROLE_DOCUMENT_FRAME,
+                      pyatspi.ROLE_DOCUMENT_WEB,
+                      pyatspi.ROLE_DOCUMENT_TEXT,
+                      pyatspi.ROLE_DOCUMENT_SPREADSHEET,
+                      pyatspi.ROLE_DOCUMENT_PRESENTATION]
+
+_INTERFACES = ['Action', 'Collection', 'Component', 'Document', 'Hyperlink',
+               'Hypertext', 'Image', 'Selection', 'Table', 'Text', 'Value']
+
+class Recorder:
+
+    def __init__(self, filename, maxNodes=20000, maxChildren=1000):
+        self._file = open(filename, 'w', encoding='utf-8')
+        self._maxNodes = maxNodes
+        self._maxChildren = maxChildren
+        self._ids = {}
+        self._written = {}
+        self._roles = constantNames('ROLE_')
+        self._states = constantNames('STATE_')
+        self._relations = constantNames('RELATION_')
+
+    def _write(self, record):
+        record['time'] = time.time()
+        self._file.write(json.dumps(record) + '\n')
+        self._file.flush()
+
+    def _getId(self, obj):
+        key = hash(obj)
+        nodeId = self._ids.get(key)
+        if nodeId is None:
+            nodeId = 'n%d' % (len(self._ids) + 1)
+            self._ids[key] = nodeId
+        return nodeId
+
+    def _snapshot(self, obj):
+        """Returns the node describing obj. Properties which cannot be
+        obtained are omitted."""
+
+        node = {'id': self._getId(obj)}
+
+        def _get(key, function):
+            try:
+                node[key] = function()
+            except Exception:
+                pass
+
+        _get('role', lambda: self._roles.get(obj.getRole(), 'ROLE_UNKNOWN'))
+        _get('name', lambda: obj.name or '')
+        _get('description', lambda: obj.description or '')
+        _get('states', lambda: sorted(self._states[s] for s in obj.getState().getStates()
+                                      if s in self._states))
+        _get('attributes', lambda: dict(a.split(':', 1) for a in obj.getAttributes()
+                                        if ':' in a))
+        _get('interfaces', lambda: [x for x in pyatspi.listInterfaces(obj)
+                                    if x in _INTERFACES])
+        _get('index', obj.getIndexInParent)
+
+        try:
+            parent = obj.parent
+            if parent and parent.getRole() != pyatspi.ROLE_DESKTOP_FRAME:
+                node['parent'] = self._getId(parent)
+        except Exception:
+            pass
+
+        try:
+            childCount = obj.childCount
+            if childCount > self._maxChildren:
+                node['childCount'] = childCount
+            else:
+                node['children'] = [self._getId(child) for child in obj if child]
+        except Exception:
+            pass
+
+        interfaces = node.get('interfaces', [])
+        if 'Component' in interfaces:
+            _get('extents', lambda: list(obj.queryComponent().getExtents(pyatspi.DESKTOP_COORDS)))
+        if 'Text' in interfaces:
+            text = obj.queryText()
+            _get('text', lambda: text.getText(0, -1))
+            _get('caretOffset', lambda: text.caretOffset)
+            _get('selections', lambda: [list(text.getSelection(i))
+                                        for i in range(text.getNSelections())])
+        if 'Hypertext' in interfaces:
+            def _links():
+                hypertext = obj.queryHypertext()
+                links = []
+                for i in range(hypertext.getNLinks()):
+                    link = hypertext.getLink(i)
+                    links.append([self._getId(link.getObject(0)),
+                                  link.startIndex, link.endIndex])
+                return links
+            _get('links', _links)
+        if 'Table' in interfaces:
+            table = obj.queryTable()
+            _get('table', lambda: {'rows': table.nRows, 'columns': table.nColumns})
+        if 'Value' in interfaces:
+            value = obj.queryValue()
+            _get('value', lambda: [value.currentValue, value.minimumValue,
+                                   value.maximumValue, value.minimumIncrement])
+        if 'Action' in interfaces:
+            action = obj.queryAction()
+            _get('actions', lambda: [action.getName(i) for i in range(action.nActions)])
+        if 'Image' in interfaces:
+            _get('imageDescription', lambda: obj.queryImage().imageDescription)
+        if 'Document' in interfaces:
+            document = obj.queryDocument()
+            _get('documentAttributes', lambda: dict(a.split(':', 1) for a in document.getAttributes()
+                                                    if ':' in a))
+            _get('locale', document.getLocale)
+
+        def _relations():
+            relations = {}
+            for relation in obj.getRelationSet():
+                name = self._relations.get(relation.getRelationType())
+                if name:
+                    relations[name] = [self._getId(relation.getTarget(i))
+                                       for i in range(relation.getNTargets())]
+            return relations
+        _get('relations', _relations)
+
+        if node.get('role') == 'ROLE_APPLICATION':
+            _get('toolkitName', lambda: obj.toolkitName)
+            _get('toolkitVersion', lambda: obj.toolkitVersion)
+            _get('pid', obj.get_process_id)
+
+        return node
+
+    def _add(self, obj, nodes):
+        if obj is None or len(nodes) >= self._maxNodes:
+            return
+        key = hash(obj)
+        if key not in nodes:
+            nodes[key] = self._snapshot(obj)
+
+    def _addAncestors(self, obj, nodes):
+        try:
+            while obj and obj.getRole() != pyatspi.ROLE_DESKTOP_FRAME:
+                self._add(obj, nodes)
+                obj = obj.parent
+        except Exception:
+            pass
+
+    def _addChildren(self, obj, nodes):
+        try:
+            if obj.childCount <= self._maxChildren:
+                for child in obj:
+                    self._add(child, nodes)
+        except Exception:
+            pass
+
+    def _addSubtree(self, obj, nodes):
+        stack = [obj]
+        while stack and len(nodes) < self._maxNodes:
+            obj = stack.pop()
+            self._add(obj, nodes)
+            try:
+                if obj.childCount <= self._maxChildren:
+                    stack.extend(reversed([child for child in obj if child]))
+            except Exception:
+                continue
+
+    def _flush(self, nodes):
+        changed = []
+        for node in nodes.values():
+            if self._written.get(node['id']) != node:
+                self._written[node['id']] = node
+                changed.append(node)
+        if changed:
+            self._write({'type': 'nodes', 'nodes': changed})
+
+    def _getValue(self, value):
+        if isinstance(value, pyatspi.Accessible):
+            return {'id': self._getId(value)}
+        try:
+            json.dumps(value)
+        except TypeError:
+            return str(value)
+        return value
+
+    def recordEvent(self, event):
+        nodes = {}
+        source = event.source
+        self._addAncestors(source, nodes)
+        self._addChildren(source, nodes)
+
+        try:
+            role = source.getRole()
+        except Exception:
+            role = None
+        if event.type.startswith('window:activate') \
+           or event.type.startswith('object:document:load-complete') \
+           or (event.type.startswith('object:state-changed:focused')
+               and role in FULL_SUBTREE_ROLES):
+            self._addSubtree(source, nodes)
+
+        if isinstance(event.any_data, pyatspi.Accessible):
+            self._addAncestors(event.any_data, nodes)
+            self._addChildren(event.any_data, nodes)
+
+        self._flush(nodes)
+        self._write({'type': 'event',
+                     'event': event.type,
+                     'source': self._getId(source),
+                     'detail1': event.detail1,
+                     'detail2': event.detail2,
+                     'anyData': self._getValue(event.any_data)})
+
+    def recordKey(self, keyboardEvent):
+        handler = None
+        script = keyboardEvent._script
+        if keyboardEvent._handler and script:
+            for name, candidate in script.inputEventHandlers.items():
+                if candidate == keyboardEvent._handler:
+                    handler = name
+                    break
+
+        self._write({'type': 'key',
+                     'pressed': keyboardEvent.isPressedKey(),
+                     'keysym': Gdk.keyval_name(keyboardEvent.id),
+                     'keyval': keyboardEvent.id,
+                     'hwCode': keyboardEvent.hw_code,
+                     'modifiers': keyboardEvent.modifiers,
+                     'eventString': keyboardEvent.event_string,
+                     'isText': keyboardEvent.is_text,
+                     'timestamp': keyboardEvent.timestamp,
+                     'handler': handler})
+
+    def close(self):
+        self._file.close()
+
+def install(recorder):
+    """Makes Orca's event manager and keyboard events report to recorder.
+    This must be done before the event manager is activated, because that
+    is when it registers its listeners."""
+
+    enqueue = event_manager.EventManager._enqueue
+    def _enqueue(self, e):
+        if not isinstance(e, (input_event.KeyboardEvent, input_event.BrailleEvent)):
+            try:
+                recorder.recordEvent(e)
+            except Exception as error:
+                print('Could not record %s: %s' % (e, error), file=sys.stderr)
+        return enqueue(self, e)
+    event_manager.EventManager._enqueue = _enqueue
+
+    process = input_event.KeyboardEvent.process
+    def _process(self):
+        result = process(self)
+        if not self.is_duplicate:
+            recorder.recordKey(self)
+        return result
+    input_event.KeyboardEvent.process = _process
+
+def main():
+    sys.argv[0] = 'orca'
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-o", "--output", action="store", required=True)
+    parser.add_argument("-u", "--user-prefs", action="store")
+    parser.add_argument("--max-nodes", action="store", type=int, default=20000)
+    args = parser.parse_args()
+
+    manager = orca.getSettingsManager()
+    manager.activate(args.user_prefs)
+    sys.path.insert(0, manager.getPrefsDir())
+
+    recorder = Recorder(args.output, args.max_nodes)
+    install(recorder)
+    try:
+        return orca.main()
+    finally:
+        recorder.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
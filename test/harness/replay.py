@@ -0,0 +1,323 @@
+#!/usr/bin/python3
+
+"""Plays back a session recorded by eventrecorder.py, or generated by
+benchmarks.py, into Orca's event manager against the AT-SPI stand-in, and
+reports how quickly Orca handled it: the number of object events processed
+per second and the latency of each keystroke, i.e. the time from the key
+press until the last speech output it caused. No desktop is needed."""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from gi.repository import GLib
+
+from orca import accessible_cache
+from orca import debug
+from orca import event_manager
+from orca import keybindings
+from orca import metrics
+from orca import orca_state
+from orca import script_manager
+from orca import script_utilities
+from orca import settings
+from orca import settings_manager
+from orca import speech
+
+import atspistandin
+
+# How long to let the main loop run after each record so that the timeouts
+# and idle handlers Orca adds (e.g. to run keyboard command handlers) run,
+# and the longest time to wait for them to stop being added.
+QUIET_TIME = 0.005
+MAX_SETTLE_TIME = 2.0
+
+_harnessDir = os.path.dirname(os.path.abspath(__file__))
+
+def readSession(filename):
+    """Returns the list of records in the session file."""
+
+    with open(filename, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+class _KeycodeCache(dict):
+    """Stands in for keybindings' cache of the keycodes of keysyms when
+    there is no display to get a keymap from. Keysyms which are not in it
+    resolve to no keycode."""
+
+    def __contains__(self, keysym):
+        return True
+
+    def __missing__(self, keysym):
+        return 0
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+class Replayer:
+    """Sets up Orca to use the stand-in and plays back sessions into it."""
+
+    def __init__(self):
+        self.tree = atspistandin.Tree()
+        self.registry = atspistandin.Registry(self.tree)
+        self._prefsDir = None
+        self._outputs = 0
+        self._lastOutputTime = None
+        self._speechFunctions = {}
+        self._boundKeys = set()
+
+    def _writeSettings(self, prefsDir):
+        with open(os.path.join(_harnessDir, 'user-settings.conf.in')) as f:
+            prefs = json.load(f)
+
+        # No speech server or braille display is used; the output is still
+        # generated, and logged, as it would be for them.
+        prefs['general'].update({'enableSpeech': True,
+                                 'enableBraille': False,
+                                 'enableSound': False,
+                                 'speechServerFactory': ''})
+        for profile in prefs['profiles'].values():
+            profile['speechServerFactory'] = ''
+
+        with open(os.path.join(prefsDir, 'user-settings.conf'), 'w') as f:
+            json.dump(prefs, f, indent=4)
+
+    def _onOutput(self, function):
+        def _output(*args, **kwargs):
+            self._outputs += 1
+            self._lastOutputTime = time.perf_counter()
+            return function(*args, **kwargs)
+        return _output
+
+    def setUp(self):
+        """Activates Orca's settings, script manager and event manager as
+        orca.loadUserSettings() would, but without initializing any output
+        devices or the keyboard map, and with the stand-in as the registry."""
+
+        self._prefsDir = tempfile.mkdtemp(prefix='orca-replay-')
+        self._writeSettings(self._prefsDir)
+
+        # Objects from earlier replays may have had the same hashes.
+        accessible_cache.clear()
+        orca_state.locusOfFocus = None
+        orca_state.activeWindow = None
+
+        eventManager = event_manager.getManager()
+        scriptManager = script_manager.getManager()
+        eventManager.registry = self.registry
+        eventManager._desktop = self.tree.desktop
+        eventManager._asyncMode = False
+        scriptManager._desktop = self.tree.desktop
+        script_utilities.Utilities._desktop = self.tree.desktop
+
+        if not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+            keybindings._keycodeCache = _KeycodeCache(keybindings._keycodeCache)
+
+        for name in ['speak', 'sayAll', 'speakCharacter', 'speakKeyEvent']:
+            function = getattr(speech, name)
+            self._speechFunctions[name] = function
+            setattr(speech, name, self._onOutput(function))
+
+        settings.enablePerformanceMetrics = True
+        manager = settings_manager.getManager()
+        manager.activate(self._prefsDir)
+        script = scriptManager.getDefaultScript()
+        manager.loadAppSettings(script)
+        manager.getChangedSettings()
+        scriptManager.activate()
+        eventManager.activate()
+
+    def tearDown(self):
+        event_manager.getManager().deactivate()
+        script_manager.getManager().deactivate()
+        for name, function in self._speechFunctions.items():
+            setattr(speech, name, function)
+        self._speechFunctions = {}
+        if self._prefsDir:
+            shutil.rmtree(self._prefsDir, ignore_errors=True)
+            self._prefsDir = None
+
+    def settle(self):
+        """Runs the main loop until nothing has been dispatched for a while.
+        Returns the time of the last dispatch."""
+
+        context = GLib.MainContext.default()
+        start = lastDispatch = time.perf_counter()
+        while True:
+            now = time.perf_counter()
+            if context.iteration(False):
+                lastDispatch = now
+            elif now - lastDispatch > QUIET_TIME or now - start > MAX_SETTLE_TIME:
+                return lastDispatch
+            else:
+                time.sleep(0.0002)
+
+    def _bindKey(self, record):
+        """Makes the keystroke trigger the handler it triggered when recorded,
+        because the keycodes of the active script's bindings may not be
+        known (e.g. when there is no display) or may differ."""
+
+        script = orca_state.activeScript
+        name = record.get('handler')
+        if not (script and name and record.get('keysym')):
+            return
+
+        key = script, record['hwCode'], record['modifiers'], name
+        if key in self._boundKeys:
+            return
+
+        handler = script.inputEventHandlers.get(name)
+        if not handler:
+            return
+
+        modifiers = record['modifiers'] & keybindings.defaultModifierMask
+        binding = keybindings.KeyBinding(record['keysym'],
+                                         keybindings.defaultModifierMask,
+                                         modifiers,
+                                         handler)
+        binding.keycode = record['hwCode']
+        script.keyBindings.add(binding)
+        self._boundKeys.add(key)
+
+    def _replayRecord(self, record):
+        kind = record['type']
+        if kind == 'nodes':
+            self.tree.update(record['nodes'])
+        elif kind == 'event':
+            source = self.tree.getValue({'id': record['source']})
+            if source is None:
+                return False
+            event = atspistandin.Event(record['event'],
+                                       source,
+                                       record.get('detail1', 0),
+                                       record.get('detail2', 0),
+                                       self.tree.getValue(record.get('anyData')))
+            return self.registry.dispatchEvent(event)
+        elif kind == 'key':
+            if record['pressed']:
+                self._bindKey(record)
+            event = atspistandin.DeviceEvent(record['pressed'],
+                                             record.get('keyval', 0),
+                                             record['hwCode'],
+                                             record['modifiers'],
+                                             record['eventString'],
+                                             record.get('isText', False),
+                                             record['timestamp'])
+            self.registry.dispatchKeyboardEvent(event)
+        return False
+
+    def replay(self, records):
+        """Plays back records, returning a dictionary of results."""
+
+        metrics.reset()
+        self._outputs = 0
+        keystrokes = []
+        current = None
+        events = 0
+
+        start = time.perf_counter()
+        for record in records:
+            if record['type'] == 'key' and record['pressed']:
+                if current:
+                    keystrokes.append(current)
+                current = {'key': record.get('keysym') or record['eventString'],
+                           'handler': record.get('handler'),
+                           'start': time.perf_counter(),
+                           'outputs': self._outputs}
+                self._lastOutputTime = None
+
+            if self._replayRecord(record):
+                events += 1
+            lastDispatch = self.settle()
+
+            if current:
+                current['end'] = lastDispatch
+                current['lastOutput'] = self._lastOutputTime
+        if current:
+            keystrokes.append(current)
+        duration = time.perf_counter() - start
+
+        return self._getResults(events, duration, keystrokes)
+
+    def _getResults(self, events, duration, keystrokes):
+        eventTime = 0.0
+        eventsProcessed = 0
+        for histogram in metrics.getMetrics().get(metrics.EVENT_TIME, {}).values():
+            eventTime += histogram['total']
+            eventsProcessed += histogram['count']
+
+        latencies = []
+        for keystroke in keystrokes:
+            end = keystroke['lastOutput'] or keystroke['end']
+            latencies.append(max(0.0, end - keystroke['start']))
+
+        return {'eventsDelivered': events,
+                'eventsProcessed': eventsProcessed,
+                'eventProcessingTime': eventTime,
+                'eventsPerSecond': eventsProcessed / eventTime if eventTime else None,
+                'keystrokes': len(keystrokes),
+                'latencyMean': sum(latencies) / len(latencies) if latencies else None,
+                'latencyP50': percentile(latencies, 0.5),
+                'latencyP95': percentile(latencies, 0.95),
+                'latencyMax': max(latencies) if latencies else None,
+                'outputs': self._outputs,
+                'duration': duration,
+                'eventQueue': event_manager.getManager().getQueueStatistics()}
+
+def printResults(results):
+    """Prints the results of one or more replays, keyed by name, as a table."""
+
+    def _format(value, scale=1.0, fmt='%.2f'):
+        if value is None:
+            return '-'
+        return fmt % (value * scale)
+
+    print('%-24s %8s %10s %8s %10s %10s %10s %8s'
+          % ('SESSION', 'EVENTS', 'EVENTS/S', 'KEYS', 'P50 MS', 'P95 MS', 'MAX MS', 'OUTPUTS'))
+    for name, result in results.items():
+        print('%-24s %8d %10s %8d %10s %10s %10s %8d'
+              % (name,
+                 result['eventsProcessed'],
+                 _format(result['eventsPerSecond'], fmt='%.0f'),
+                 result['keystrokes'],
+                 _format(result['latencyP50'], 1000),
+                 _format(result['latencyP95'], 1000),
+                 _format(result['latencyMax'], 1000),
+                 result['outputs']))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('sessions', nargs='+', help='session files to replay')
+    parser.add_argument('--json', action='store', help='also write the results to this file')
+    parser.add_argument('--debug-file', action='store', help='write Orca\'s debug output here')
+    args = parser.parse_args()
+
+    if args.debug_file:
+        debug.debugFile = open(args.debug_file, 'w')
+        debug.debugLevel = debug.LEVEL_ALL
+
+    results = {}
+    for filename in args.sessions:
+        replayer = Replayer()
+        replayer.setUp()
+        try:
+            results[os.path.basename(filename)] = replayer.replay(readSession(filename))
+        finally:
+            replayer.tearDown()
+
+    printResults(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())